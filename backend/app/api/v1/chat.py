@@ -1,7 +1,8 @@
 import asyncio
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from app.schemas.chat import ChatRequest, ChatResponse
 from app.services.chat_services import build_history, generate_chat_reply
+from app.services.service_container import ServiceContainer, get_services
 
 router = APIRouter()
 
@@ -11,11 +12,20 @@ router = APIRouter()
     response_model=ChatResponse,
     status_code=200,
     )
-async def chat(req: ChatRequest):
+async def chat(
+    req: ChatRequest,
+    services: ServiceContainer = Depends(get_services),
+):
     if not req.message.strip():
         raise HTTPException(status_code=400, detail="Request content is missing.")
     try:
-        reply = await generate_chat_reply(req.message, req.history, req.dataset_id, req.session_id)
+        reply = await generate_chat_reply(
+            req.message,
+            req.history,
+            req.dataset_id,
+            req.session_id,
+            upload_service=services.upload_service,
+        )
         return ChatResponse(reply=reply)
     except RuntimeError as e:
         raise HTTPException(status_code=429, detail=str(e))
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+
+from app.api.v1 import upload as upload_module
+from app.services.chat_services import dataset_context_cache
+from app.services.service_container import ServiceContainer, get_services
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", status_code=200)
+def get_metrics(services: ServiceContainer = Depends(get_services)) -> dict[str, object]:
+    storage_service = services.storage_service
+    object_cache = getattr(storage_service, "object_cache", None)
+    compression_stats = getattr(storage_service, "compression_stats", None)
+    async_metastore = services.upload_service.async_metastore_service
+    return {
+        "object_cache": object_cache.stats() if object_cache is not None else None,
+        "object_compression": compression_stats() if compression_stats is not None else None,
+        "frame_cache": services.upload_service.frame_cache.stats(),
+        "metastore_pool": services.metastore_service.pool_stats(),
+        "metastore_async_pool": (
+            async_metastore.pool_stats() if async_metastore is not None else None
+        ),
+        "metastore_write_behind": services.metastore_service.write_behind_stats(),
+        "descriptor_cache": services.metastore_service.descriptor_cache.stats(),
+        "chat_context_cache": dataset_context_cache.stats(),
+        "expiry_sweeper": services.expiry_sweeper.stats(),
+        "single_flight": {
+            "frames": services.upload_service.single_flight.stats(),
+            "descriptor": services.metastore_service.descriptor_flight.stats(),
+            "profile": upload_module.profile_flight.stats(),
+        },
+    }
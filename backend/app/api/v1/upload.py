@@ -1,35 +1,115 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+from typing import Literal
 from uuid import uuid4
 
-from fastapi import APIRouter, File, Form, Query, UploadFile
-
-from app.core.config import DATABASE_URL, DEFAULT_PREVIEW_ROWS
+from fastapi import APIRouter, Depends, File, Form, Header, Query, Response, UploadFile
+
+from app.core.compression import strip_etag_coding
+from app.core.config import (
+    AGGREGATE_MAX_GROUPS,
+    BATCH_DELETE_MAX_IDS,
+    CHART_MAX_POINTS,
+    DEFAULT_PREVIEW_ROWS,
+    HTTP_CACHE_MAX_AGE_SECONDS,
+    SQL_QUERY_MAX_ROWS,
+    SQL_QUERY_TIMEOUT_MS,
+)
 from app.errors import APIError
 from app.schemas.upload import (
     ColumnSchema,
+    DatasetAggregateRequest,
+    DatasetAggregateResponse,
+    DatasetBatchDeleteRequest,
+    DatasetBatchDeleteResponse,
+    DatasetBatchDeleteResult,
+    DatasetChartDataRequest,
+    DatasetChartDataResponse,
     DatasetContentResponse,
     DatasetDeleteResponse,
     DatasetMetadataResponse,
     DatasetPreviewResponse,
+    DatasetQueryRequest,
+    DatasetQueryResponse,
     DatasetSchemaResponse,
+    DatasetStatsResponse,
     FileMeta,
     Shape,
+    SessionDatasetsResponse,
     SourceType,
     UploadResponse,
 )
-from app.services.metastore_service import MetastoreService
-from app.services.upload_service import UploadService
+from app.services.downsampling import build_chart_points
+from app.services.frame_query import (
+    aggregate,
+    apply_query,
+    parse_columns,
+    parse_filters,
+    referenced_columns,
+    sorted_page,
+)
+from app.services.profile_service import approximate_quantiles
+from app.services.service_container import ServiceContainer, get_services
+from app.services.single_flight import SingleFlight
+from app.services.sql_query import run_query
 from app.services.upload_validator import UploadValidator
 
 
 router = APIRouter()
-upload_service = UploadService()
 upload_validator = UploadValidator()
-metastore_service = MetastoreService(database_url=DATABASE_URL)
+# Bursts of /stats reads for one dataset share a single profile query; the
+# other reads are coalesced by the metastore's descriptor lookup.
+profile_flight = SingleFlight()
+
+
+def _build_etag(*parts: object) -> str:
+    digest = hashlib.sha256(
+        "\x1f".join(str(part) for part in parts).encode("utf-8")
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _cache_control(parse_status: str) -> str:
+    if parse_status != "ready":
+        return "no-cache"
+    return f"private, max-age={HTTP_CACHE_MAX_AGE_SECONDS}"
+
+
+def _matching_etag(if_none_match: str | None, etag: str) -> str | None:
+    """The ``If-None-Match`` tag that matches ``etag``, or ``None``.
+
+    Compressed responses carry ``etag`` with a coding suffix, so that form
+    matches too; the 304 echoes it back so the client's copy stays valid.
+    """
+    if not if_none_match:
+        return None
+    for candidate in if_none_match.split(","):
+        tag = candidate.strip().removeprefix("W/")
+        if tag == "*":
+            return etag
+        if strip_etag_coding(tag) == etag:
+            return tag
+    return None
+
+
+def _not_modified_response(*, etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
 
 
-def _get_dataset_preview_source_record(dataset_id: str):
+def _set_cache_headers(response: Response, *, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def _get_dataset_preview_source_record(services: ServiceContainer, dataset_id: str):
     try:
-        record = metastore_service.get_dataset_preview_source(dataset_id)
+        record = services.metastore_service.get_dataset_preview_source(dataset_id)
     except Exception as exc:
         raise APIError(
             status_code=500,
@@ -51,22 +131,92 @@ def _get_dataset_preview_source_record(dataset_id: str):
     return record
 
 
-def _get_dataset_storage_content(storage_key: str) -> bytes:
+def _build_metadata_response(record) -> DatasetMetadataResponse:
+    return DatasetMetadataResponse(
+        dataset_id=record.dataset_id,
+        status=record.parse_status,
+        session_id=record.session_id,
+        file_meta=FileMeta(
+            original_filename=record.original_filename,
+            extension=record.extension,
+            mime_type=record.mime_type,
+            size_bytes=record.size_bytes,
+        ),
+        shape=Shape(rows=record.row_count, columns=record.column_count),
+        created_at=record.created_at,
+        updated_at=record.updated_at,
+    )
+
+
+def _encode_session_cursor(created_at: datetime, dataset_id: str) -> str:
+    payload = json.dumps({"t": created_at.isoformat(), "d": dataset_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_session_cursor(cursor: str) -> tuple[datetime, str]:
     try:
-        return upload_service.storage_service.get_object(key=storage_key)
-    except Exception as exc:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(payload["t"])
+        dataset_id = str(payload["d"])
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeError) as exc:
         raise APIError(
-            status_code=500,
-            code="STORAGE_ERROR",
-            message="Failed to read object from storage backend.",
-            details={"reason": str(exc)[:200]},
+            status_code=400,
+            code="INVALID_CURSOR",
+            message="Cursor is malformed.",
+            details={"cursor": cursor[:64]},
             request_id=f"req_{uuid4().hex[:8]}",
         ) from exc
+    return created_at, dataset_id
+
+
+def _load_dataset_rows(
+    services: ServiceContainer,
+    record,
+    *,
+    columns: str | None,
+    filters: list[str],
+    limit: int | None = None,
+    offset: int = 0,
+    sort_by: str | None = None,
+    order: str = "asc",
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    selected_columns = parse_columns(columns)
+    row_filters = parse_filters(filters)
+    needed_columns = referenced_columns(selected_columns, row_filters)
+    if needed_columns is not None and sort_by is not None and sort_by not in needed_columns:
+        needed_columns.append(sort_by)
+
+    dataset = services.upload_service.load_dataset(
+        storage_key=record.storage_key_raw,
+        extension=record.extension,
+        columns=needed_columns,
+    )
+    if sort_by is None:
+        dataframe = apply_query(
+            dataset.dataframe, columns=selected_columns, filters=row_filters
+        )
+        rows = services.upload_service.build_frame_rows(dataframe, limit=limit, offset=offset)
+        return rows, None
+
+    page, next_cursor = sorted_page(
+        dataset,
+        columns=selected_columns,
+        filters=row_filters,
+        sort_by=sort_by,
+        order=order,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+    return services.upload_service.build_frame_rows(page), next_cursor
 
 
-def _delete_dataset_storage_object(storage_key: str) -> None:
+def _delete_dataset_storage_object(services: ServiceContainer, storage_key: str) -> None:
+    services.upload_service.frame_cache.invalidate(storage_key)
     try:
-        upload_service.storage_service.delete_object(key=storage_key)
+        services.upload_service.storage_service.delete_object(key=storage_key)
     except Exception as exc:
         raise APIError(
             status_code=500,
@@ -87,11 +237,12 @@ async def upload_dataset(
     session_id: str | None = Form(default=None, max_length=128),
     source: SourceType = Form(default="user_upload"),
     preview_rows: int = Form(default=DEFAULT_PREVIEW_ROWS),
+    services: ServiceContainer = Depends(get_services),
 ) -> UploadResponse:
     await upload_validator.validate(file=file, preview_rows=preview_rows)
 
     _ = source
-    return await upload_service.handle_upload(
+    return await services.upload_service.handle_upload(
         file=file,
         session_id=session_id,
         preview_rows=preview_rows,
@@ -103,9 +254,14 @@ async def upload_dataset(
     response_model=DatasetMetadataResponse,
     status_code=200,
 )
-def get_dataset(dataset_id: str) -> DatasetMetadataResponse:
+def get_dataset(
+    dataset_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetMetadataResponse | Response:
     try:
-        record = metastore_service.get_dataset_metadata(dataset_id)
+        record = services.metastore_service.get_dataset_metadata(dataset_id)
     except Exception as exc:
         raise APIError(
             status_code=500,
@@ -124,19 +280,50 @@ def get_dataset(dataset_id: str) -> DatasetMetadataResponse:
             request_id=f"req_{uuid4().hex[:8]}",
         )
 
-    return DatasetMetadataResponse(
-        dataset_id=record.dataset_id,
-        status=record.parse_status,
-        session_id=record.session_id,
-        file_meta=FileMeta(
-            original_filename=record.original_filename,
-            extension=record.extension,
-            mime_type=record.mime_type,
-            size_bytes=record.size_bytes,
-        ),
-        shape=Shape(rows=record.row_count, columns=record.column_count),
-        created_at=record.created_at,
-        updated_at=record.updated_at,
+    etag = _build_etag(record.dataset_id, record.parse_status, record.updated_at.isoformat())
+    cache_control = _cache_control(record.parse_status)
+    matched_etag = _matching_etag(if_none_match, etag)
+    if matched_etag is not None:
+        return _not_modified_response(etag=matched_etag, cache_control=cache_control)
+    _set_cache_headers(response, etag=etag, cache_control=cache_control)
+
+    return _build_metadata_response(record)
+
+
+@router.get(
+    "/sessions/{session_id}/datasets",
+    response_model=SessionDatasetsResponse,
+    status_code=200,
+)
+def list_session_datasets(
+    session_id: str,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None, max_length=512),
+    services: ServiceContainer = Depends(get_services),
+) -> SessionDatasetsResponse:
+    after = _decode_session_cursor(cursor) if cursor is not None else None
+    try:
+        # One extra row tells whether another page exists.
+        records = services.metastore_service.list_session_datasets(
+            session_id, limit=limit + 1, after=after
+        )
+    except Exception as exc:
+        raise APIError(
+            status_code=500,
+            code="METASTORE_ERROR",
+            message="Failed to read metadata from metastore backend.",
+            details={"reason": str(exc)[:200]},
+            request_id=f"req_{uuid4().hex[:8]}",
+        ) from exc
+
+    page = records[:limit]
+    next_cursor = None
+    if len(records) > limit:
+        next_cursor = _encode_session_cursor(page[-1].created_at, page[-1].dataset_id)
+    return SessionDatasetsResponse(
+        session_id=session_id,
+        datasets=[_build_metadata_response(record) for record in page],
+        next_cursor=next_cursor,
     )
 
 
@@ -145,12 +332,14 @@ def get_dataset(dataset_id: str) -> DatasetMetadataResponse:
     response_model=DatasetDeleteResponse,
     status_code=200,
 )
-def delete_dataset(dataset_id: str) -> DatasetDeleteResponse:
-    record = _get_dataset_preview_source_record(dataset_id)
-    _delete_dataset_storage_object(record.storage_key_raw)
+def delete_dataset(
+    dataset_id: str, services: ServiceContainer = Depends(get_services)
+) -> DatasetDeleteResponse:
+    record = _get_dataset_preview_source_record(services, dataset_id)
+    _delete_dataset_storage_object(services, record.storage_key_raw)
 
     try:
-        deleted = metastore_service.delete_dataset_metadata(dataset_id)
+        deleted = services.metastore_service.delete_dataset_metadata(dataset_id)
     except Exception as exc:
         raise APIError(
             status_code=500,
@@ -176,14 +365,120 @@ def delete_dataset(dataset_id: str) -> DatasetDeleteResponse:
     )
 
 
+@router.post(
+    "/datasets:batchDelete",
+    response_model=DatasetBatchDeleteResponse,
+    status_code=200,
+)
+def batch_delete_datasets(
+    request: DatasetBatchDeleteRequest,
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetBatchDeleteResponse:
+    dataset_ids = list(dict.fromkeys(request.dataset_ids))
+    if len(dataset_ids) > BATCH_DELETE_MAX_IDS:
+        raise APIError(
+            status_code=400,
+            code="INVALID_REQUEST",
+            message=f"At most {BATCH_DELETE_MAX_IDS} dataset_ids can be deleted at once.",
+            details={"field": "dataset_ids", "max": BATCH_DELETE_MAX_IDS},
+            request_id=f"req_{uuid4().hex[:8]}",
+        )
+
+    try:
+        owners = services.metastore_service.get_dataset_owners(dataset_ids)
+    except Exception as exc:
+        raise APIError(
+            status_code=500,
+            code="METASTORE_ERROR",
+            message="Failed to read metadata from metastore backend.",
+            details={"reason": str(exc)[:200]},
+            request_id=f"req_{uuid4().hex[:8]}",
+        ) from exc
+
+    results: dict[str, DatasetBatchDeleteResult] = {}
+    owned = []
+    for dataset_id in dataset_ids:
+        owner = owners.get(dataset_id)
+        if owner is None:
+            results[dataset_id] = DatasetBatchDeleteResult(
+                dataset_id=dataset_id, status="not_found", message="Dataset not found."
+            )
+        elif owner.session_id != request.session_id:
+            results[dataset_id] = DatasetBatchDeleteResult(
+                dataset_id=dataset_id,
+                status="forbidden",
+                message="Dataset belongs to another session.",
+            )
+        else:
+            owned.append(owner)
+
+    for owner in owned:
+        services.upload_service.frame_cache.invalidate(owner.storage_key_raw)
+    # Objects go first: a row whose object survives is kept, so the id can
+    # simply be retried.
+    failed_keys: set[str] = set()
+    storage_error = "Failed to delete object from storage backend."
+    if owned:
+        try:
+            failed_keys = set(
+                services.upload_service.storage_service.delete_objects(
+                    keys=[owner.storage_key_raw for owner in owned]
+                )
+            )
+        except Exception as exc:
+            failed_keys = {owner.storage_key_raw for owner in owned}
+            storage_error = f"{storage_error} {str(exc)[:200]}"
+
+    removable = []
+    for owner in owned:
+        if owner.storage_key_raw in failed_keys:
+            results[owner.dataset_id] = DatasetBatchDeleteResult(
+                dataset_id=owner.dataset_id, status="failed", message=storage_error
+            )
+        else:
+            removable.append(owner.dataset_id)
+
+    try:
+        deleted = set(services.metastore_service.delete_datasets_metadata(removable))
+    except Exception as exc:
+        raise APIError(
+            status_code=500,
+            code="METASTORE_ERROR",
+            message="Failed to delete metadata from metastore backend.",
+            details={"reason": str(exc)[:200]},
+            request_id=f"req_{uuid4().hex[:8]}",
+        ) from exc
+
+    for dataset_id in removable:
+        if dataset_id in deleted:
+            results[dataset_id] = DatasetBatchDeleteResult(
+                dataset_id=dataset_id, status="deleted"
+            )
+        else:
+            # Removed by a concurrent request between the two statements.
+            results[dataset_id] = DatasetBatchDeleteResult(
+                dataset_id=dataset_id, status="not_found", message="Dataset not found."
+            )
+
+    return DatasetBatchDeleteResponse(
+        results=[results[dataset_id] for dataset_id in dataset_ids],
+        deleted_count=len(deleted),
+    )
+
+
 @router.get(
     "/datasets/{dataset_id}/schema",
     response_model=DatasetSchemaResponse,
     status_code=200,
 )
-def get_dataset_schema(dataset_id: str) -> DatasetSchemaResponse:
+def get_dataset_schema(
+    dataset_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetSchemaResponse | Response:
     try:
-        record = metastore_service.get_dataset_schema(dataset_id)
+        record = services.metastore_service.get_dataset_schema(dataset_id)
     except Exception as exc:
         raise APIError(
             status_code=500,
@@ -202,6 +497,15 @@ def get_dataset_schema(dataset_id: str) -> DatasetSchemaResponse:
             request_id=f"req_{uuid4().hex[:8]}",
         )
 
+    etag = _build_etag(
+        record.dataset_id, json.dumps(record.schema_json, sort_keys=True, default=str)
+    )
+    cache_control = _cache_control(record.parse_status)
+    matched_etag = _matching_etag(if_none_match, etag)
+    if matched_etag is not None:
+        return _not_modified_response(etag=matched_etag, cache_control=cache_control)
+    _set_cache_headers(response, etag=etag, cache_control=cache_control)
+
     return DatasetSchemaResponse(
         dataset_id=record.dataset_id,
         schema_=[ColumnSchema(**column) for column in record.schema_json],
@@ -213,14 +517,26 @@ def get_dataset_schema(dataset_id: str) -> DatasetSchemaResponse:
     response_model=DatasetContentResponse,
     status_code=200,
 )
-def get_dataset_content(dataset_id: str) -> DatasetContentResponse:
-    record = _get_dataset_preview_source_record(dataset_id)
-    content = _get_dataset_storage_content(record.storage_key_raw)
-    rows = upload_service.build_content_rows(
-        content=content,
-        extension=record.extension,
+def get_dataset_content(
+    dataset_id: str,
+    response: Response,
+    columns: str | None = Query(default=None),
+    filters: list[str] = Query(default=[], alias="filter"),
+    if_none_match: str | None = Header(default=None),
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetContentResponse | Response:
+    record = _get_dataset_preview_source_record(services, dataset_id)
+    etag = _build_etag(
+        record.dataset_id, record.storage_key_raw, "content", columns, *filters
     )
+    cache_control = _cache_control(record.parse_status)
+    matched_etag = _matching_etag(if_none_match, etag)
+    if matched_etag is not None:
+        return _not_modified_response(etag=matched_etag, cache_control=cache_control)
+
+    rows, _ = _load_dataset_rows(services, record, columns=columns, filters=filters)
 
+    _set_cache_headers(response, etag=etag, cache_control=cache_control)
     return DatasetContentResponse(
         dataset_id=record.dataset_id,
         rows=rows,
@@ -230,26 +546,287 @@ def get_dataset_content(dataset_id: str) -> DatasetContentResponse:
 @router.get(
     "/datasets/{dataset_id}/preview",
     response_model=DatasetPreviewResponse,
+    response_model_exclude_none=True,
     status_code=200,
 )
 def get_dataset_preview(
     dataset_id: str,
+    response: Response,
     limit: int = Query(default=100, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
-) -> DatasetPreviewResponse:
-    record = _get_dataset_preview_source_record(dataset_id)
-    content = _get_dataset_storage_content(record.storage_key_raw)
-
-    rows = upload_service.build_preview_rows(
-        content=content,
-        extension=record.extension,
+    columns: str | None = Query(default=None),
+    filters: list[str] = Query(default=[], alias="filter"),
+    sort_by: str | None = Query(default=None, min_length=1),
+    order: Literal["asc", "desc"] = Query(default="asc"),
+    cursor: str | None = Query(default=None, max_length=512),
+    if_none_match: str | None = Header(default=None),
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetPreviewResponse | Response:
+    record = _get_dataset_preview_source_record(services, dataset_id)
+    if cursor is not None and sort_by is None:
+        raise APIError(
+            status_code=400,
+            code="INVALID_CURSOR",
+            message="cursor requires sort_by.",
+            details={"field": "cursor"},
+            request_id=f"req_{uuid4().hex[:8]}",
+        )
+    etag = _build_etag(
+        record.dataset_id,
+        record.storage_key_raw,
+        "preview",
+        limit,
+        offset,
+        columns,
+        sort_by,
+        order,
+        cursor,
+        *filters,
+    )
+    cache_control = _cache_control(record.parse_status)
+    matched_etag = _matching_etag(if_none_match, etag)
+    if matched_etag is not None:
+        return _not_modified_response(etag=matched_etag, cache_control=cache_control)
+
+    rows, next_cursor = _load_dataset_rows(
+        services,
+        record,
+        columns=columns,
+        filters=filters,
         limit=limit,
         offset=offset,
+        sort_by=sort_by,
+        order=order,
+        cursor=cursor,
     )
 
+    _set_cache_headers(response, etag=etag, cache_control=cache_control)
     return DatasetPreviewResponse(
         dataset_id=record.dataset_id,
         limit=limit,
         offset=offset,
         rows=rows,
+        next_cursor=next_cursor,
+    )
+
+
+@router.post(
+    "/datasets/{dataset_id}/aggregate",
+    response_model=DatasetAggregateResponse,
+    status_code=200,
+)
+def aggregate_dataset(
+    dataset_id: str,
+    request: DatasetAggregateRequest,
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetAggregateResponse:
+    record = _get_dataset_preview_source_record(services, dataset_id)
+    measures = [
+        (
+            measure.func,
+            measure.column,
+            measure.alias
+            or (measure.func if measure.column is None else f"{measure.func}_{measure.column}"),
+        )
+        for measure in request.measures
+    ]
+    row_filters = parse_filters(request.filters)
+    needed_columns = list(
+        dict.fromkeys(
+            [
+                *request.group_by,
+                *(column for _, column, _ in measures if column is not None),
+                *(row_filter.column for row_filter in row_filters),
+            ]
+        )
+    )
+
+    dataframe = services.upload_service.load_dataframe(
+        storage_key=record.storage_key_raw,
+        extension=record.extension,
+        columns=needed_columns,
+    )
+    dataframe = apply_query(dataframe, columns=None, filters=row_filters)
+    result, group_count = aggregate(
+        dataframe,
+        group_by=request.group_by,
+        measures=measures,
+        max_groups=AGGREGATE_MAX_GROUPS,
+    )
+
+    return DatasetAggregateResponse(
+        dataset_id=record.dataset_id,
+        group_by=request.group_by,
+        rows=services.upload_service.build_frame_rows(result),
+        group_count=group_count,
+        truncated=group_count > len(result),
+    )
+
+
+@router.post(
+    "/datasets/{dataset_id}/chart-data",
+    response_model=DatasetChartDataResponse,
+    status_code=200,
+)
+def get_dataset_chart_data(
+    dataset_id: str,
+    request: DatasetChartDataRequest,
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetChartDataResponse:
+    if request.max_points > CHART_MAX_POINTS:
+        raise APIError(
+            status_code=400,
+            code="INVALID_REQUEST",
+            message=f"max_points must be at most {CHART_MAX_POINTS}.",
+            details={"field": "max_points", "max": CHART_MAX_POINTS},
+            request_id=f"req_{uuid4().hex[:8]}",
+        )
+
+    record = _get_dataset_preview_source_record(services, dataset_id)
+    row_filters = parse_filters(request.filters)
+    needed_columns = list(
+        dict.fromkeys(
+            [
+                request.x,
+                *([request.y] if request.y is not None else []),
+                *(row_filter.column for row_filter in row_filters),
+            ]
+        )
+    )
+
+    dataframe = services.upload_service.load_dataframe(
+        storage_key=record.storage_key_raw,
+        extension=record.extension,
+        columns=needed_columns,
     )
+    dataframe = apply_query(dataframe, columns=None, filters=row_filters)
+    points, source_points = build_chart_points(
+        dataframe,
+        kind=request.kind,
+        x=request.x,
+        y=request.y,
+        max_points=request.max_points,
+        bins=request.bins,
+    )
+
+    return DatasetChartDataResponse(
+        dataset_id=record.dataset_id,
+        kind=request.kind,
+        source_points=source_points,
+        points=points,
+    )
+
+
+@router.post(
+    "/datasets/{dataset_id}/query",
+    response_model=DatasetQueryResponse,
+    status_code=200,
+)
+def query_dataset(
+    dataset_id: str,
+    request: DatasetQueryRequest,
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetQueryResponse:
+    if request.max_rows > SQL_QUERY_MAX_ROWS:
+        raise APIError(
+            status_code=400,
+            code="INVALID_REQUEST",
+            message=f"max_rows must be at most {SQL_QUERY_MAX_ROWS}.",
+            details={"field": "max_rows", "max": SQL_QUERY_MAX_ROWS},
+            request_id=f"req_{uuid4().hex[:8]}",
+        )
+
+    record = _get_dataset_preview_source_record(services, dataset_id)
+    dataset = services.upload_service.load_dataset(
+        storage_key=record.storage_key_raw,
+        extension=record.extension,
+    )
+    columns, rows, truncated = run_query(
+        dataset,
+        request.sql,
+        max_rows=request.max_rows,
+        timeout_ms=SQL_QUERY_TIMEOUT_MS,
+    )
+
+    return DatasetQueryResponse(
+        dataset_id=record.dataset_id,
+        columns=columns,
+        rows=[dict(zip(columns, row)) for row in rows],
+        row_count=len(rows),
+        truncated=truncated,
+    )
+
+
+@router.get(
+    "/datasets/{dataset_id}/stats",
+    response_model=DatasetStatsResponse,
+    status_code=200,
+)
+def get_dataset_stats(
+    dataset_id: str,
+    quantiles: list[float] = Query(default=[], alias="quantile"),
+    services: ServiceContainer = Depends(get_services),
+) -> DatasetStatsResponse:
+    invalid = [fraction for fraction in quantiles if not 0 <= fraction <= 1]
+    if invalid:
+        raise APIError(
+            status_code=400,
+            code="INVALID_REQUEST",
+            message="quantile values must be between 0 and 1.",
+            details={"field": "quantile", "values": invalid},
+            request_id=f"req_{uuid4().hex[:8]}",
+        )
+
+    try:
+        record = profile_flight.do(
+            ("profile", dataset_id),
+            lambda: services.metastore_service.get_dataset_profile(dataset_id),
+        )
+    except Exception as exc:
+        raise APIError(
+            status_code=500,
+            code="METASTORE_ERROR",
+            message="Failed to read metadata from metastore backend.",
+            details={"reason": str(exc)[:200]},
+            request_id=f"req_{uuid4().hex[:8]}",
+        ) from exc
+
+    if record is None:
+        raise APIError(
+            status_code=404,
+            code="DATASET_NOT_FOUND",
+            message="Dataset not found.",
+            details={"dataset_id": dataset_id},
+            request_id=f"req_{uuid4().hex[:8]}",
+        )
+
+    profile = record.profile_json
+    if profile is None:
+        # Datasets uploaded before profiles were stored are profiled on demand.
+        source = _get_dataset_preview_source_record(services, dataset_id)
+        profile = services.upload_service.build_profile(
+            services.upload_service.load_dataframe(
+                storage_key=source.storage_key_raw,
+                extension=source.extension,
+            )
+        )
+
+    columns = profile["columns"]
+    if quantiles:
+        columns = [_with_sketch_quantiles(column, quantiles) for column in columns]
+
+    return DatasetStatsResponse(
+        dataset_id=record.dataset_id,
+        row_count=profile["row_count"],
+        columns=columns,
+    )
+
+
+def _with_sketch_quantiles(
+    column: dict[str, object], fractions: list[float]
+) -> dict[str, object]:
+    values = approximate_quantiles(column.get("sketches") or {}, fractions)
+    if values is None:
+        return column
+    extra = {f"q{fraction:g}": value for fraction, value in zip(fractions, values)}
+    return {**column, "quantiles": {**(column.get("quantiles") or {}), **extra}}
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import zlib
+from collections.abc import Mapping
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the ``encoding``-coded body, e.g. ``"abc"`` -> ``"abc-gzip"``.
+
+    A strong ETag names exact bytes, so the coded body needs its own.
+    """
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_etag_coding(etag: str) -> str:
+    """Undo ``encoded_etag`` so a client's cached tag matches the identity one."""
+    for encoding in DEFAULT_LEVELS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return f'{etag[: -len(suffix)]}"'
+    return etag
+
+
+def available_encodings() -> list[str]:
+    encodings: list[str] = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, supported: list[str]) -> str | None:
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+
+    best: str | None = None
+    best_weight = 0.0
+    for encoding in supported:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """Compress responses with the best codec the client accepts.
+
+    Levels can be tuned per route template (for example
+    ``/api/v1/datasets/{dataset_id}/content``); streaming responses are
+    compressed chunk by chunk and flushed so clients still see progress.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        levels: Mapping[str, int] | None = None,
+        route_levels: Mapping[str, Mapping[str, int]] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.route_levels = route_levels or {}
+        self.supported = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.supported
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    def level_for(self, scope: Scope, encoding: str) -> int:
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or scope.get("path", "")
+        overrides = self.route_levels.get(route_path, {})
+        return overrides.get(encoding, self.levels[encoding])
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        scope: Scope,
+        send: Send,
+        encoding: str,
+    ) -> None:
+        self.middleware = middleware
+        self.scope = scope
+        self.downstream_send = send
+        self.encoding = encoding
+        self.start_message: Message | None = None
+        self.encoder: _GzipEncoder | _BrotliEncoder | _ZstdEncoder | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = not self._is_compressible(message["status"], headers)
+            if self.passthrough:
+                await self.downstream_send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream_send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                MutableHeaders(raw=self.start_message["headers"]).add_vary_header(
+                    "Accept-Encoding"
+                )
+                await self.downstream_send(self.start_message)
+                await self.downstream_send(message)
+                self.passthrough = True
+                return
+
+            self.encoder = self._build_encoder()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.downstream_send(self.start_message)
+                await self.downstream_send(
+                    {"type": "http.response.body", "body": compressed, "more_body": False}
+                )
+                return
+            await self.downstream_send(self.start_message)
+
+        chunk = self.encoder.compress(body) if body else b""
+        if not more_body:
+            chunk += self.encoder.finish()
+        await self.downstream_send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    def _is_compressible(self, status: int, headers: Headers) -> bool:
+        if status < 200 or status in {204, 304}:
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+    def _build_encoder(self) -> _GzipEncoder | _BrotliEncoder | _ZstdEncoder:
+        level = self.middleware.level_for(self.scope, self.encoding)
+        if self.encoding == "zstd":
+            return _ZstdEncoder(level)
+        if self.encoding == "br":
+            return _BrotliEncoder(level)
+        return _GzipEncoder(level)
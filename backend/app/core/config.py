@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -15,6 +16,13 @@ def _env_bool(name: str, default: bool) -> bool:
     return raw.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return int(raw)
+
+
 ALLOWED_EXTENSIONS = {"csv", "xlsx", "json"}
 ALLOWED_MIME_TYPES = {
     "text/csv",
@@ -31,6 +39,13 @@ MAX_FILE_SIZE_BYTES = 25 * 1024 * 1024
 ROW_CAP = 200000
 DEFAULT_PREVIEW_ROWS = 100
 MAX_PREVIEW_ROWS = 200
+AGGREGATE_MAX_GROUPS = _env_int("AGGREGATE_MAX_GROUPS", default=1000)
+CHART_MAX_POINTS = _env_int("CHART_MAX_POINTS", default=5000)
+SQL_QUERY_MAX_ROWS = _env_int("SQL_QUERY_MAX_ROWS", default=1000)
+SQL_QUERY_TIMEOUT_MS = _env_int("SQL_QUERY_TIMEOUT_MS", default=5000)
+SQL_QUERY_MEMORY_LIMIT_MB = _env_int("SQL_QUERY_MEMORY_LIMIT_MB", default=256)
+HTTP_CACHE_MAX_AGE_SECONDS = _env_int("HTTP_CACHE_MAX_AGE_SECONDS", default=300)
+COMPRESSION_MINIMUM_SIZE = _env_int("COMPRESSION_MINIMUM_SIZE", default=1024)
 
 MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://localhost:19000")
 MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
@@ -39,9 +54,66 @@ MINIO_RAW_BUCKET = os.getenv("MINIO_RAW_BUCKET", "thinkabit-raw")
 MINIO_SECURE = _env_bool("MINIO_SECURE", default=False)
 MINIO_AUTO_CREATE_BUCKET = _env_bool("MINIO_AUTO_CREATE_BUCKET", default=True)
 MINIO_UPLOAD_ENABLED = _env_bool("MINIO_UPLOAD_ENABLED", default=True)
+# "s3" talks to MinIO; "local" keeps objects under LOCAL_STORAGE_ROOT.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3").strip().lower()
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT") or str(
+    Path(tempfile.gettempdir()) / "thinkabit-storage"
+)
+MINIO_MAX_POOL_CONNECTIONS = _env_int("MINIO_MAX_POOL_CONNECTIONS", default=32)
+MINIO_CONNECT_TIMEOUT_SECONDS = _env_int("MINIO_CONNECT_TIMEOUT_SECONDS", default=5)
+MINIO_READ_TIMEOUT_SECONDS = _env_int("MINIO_READ_TIMEOUT_SECONDS", default=30)
+MINIO_MAX_ATTEMPTS = _env_int("MINIO_MAX_ATTEMPTS", default=3)
+MINIO_RETRY_MODE = os.getenv("MINIO_RETRY_MODE", "standard")
+MINIO_TCP_KEEPALIVE = _env_bool("MINIO_TCP_KEEPALIVE", default=True)
+# Codec for text objects written to MinIO: "zstd", "gzip" or "none".
+OBJECT_COMPRESSION = os.getenv("OBJECT_COMPRESSION", "none")
+OBJECT_COMPRESSION_LEVEL = _env_int("OBJECT_COMPRESSION_LEVEL", default=3)
+OBJECT_COMPRESSION_MIN_BYTES = _env_int("OBJECT_COMPRESSION_MIN_BYTES", default=1024)
+STORAGE_IO_WORKERS = _env_int("STORAGE_IO_WORKERS", default=MINIO_MAX_POOL_CONNECTIONS)
+
+OBJECT_CACHE_ENABLED = _env_bool("OBJECT_CACHE_ENABLED", default=False)
+OBJECT_CACHE_DIR = os.getenv("OBJECT_CACHE_DIR") or str(
+    Path(tempfile.gettempdir()) / "thinkabit-object-cache"
+)
+OBJECT_CACHE_MAX_BYTES = _env_int("OBJECT_CACHE_MAX_BYTES", default=512 * 1024 * 1024)
+
+FRAME_CACHE_MAX_ENTRIES = _env_int("FRAME_CACHE_MAX_ENTRIES", default=32)
+FRAME_CACHE_MAX_BYTES = _env_int("FRAME_CACHE_MAX_BYTES", default=512 * 1024 * 1024)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Embedded metastore used when DATABASE_URL is not set.
+METASTORE_SQLITE_PATH = os.getenv("METASTORE_SQLITE_PATH") or str(
+    Path(tempfile.gettempdir()) / "thinkabit-metastore.sqlite3"
+)
 METASTORE_INSERT_ENABLED = _env_bool("METASTORE_INSERT_ENABLED", default=True)
+METASTORE_ASYNC_ENABLED = _env_bool("METASTORE_ASYNC_ENABLED", default=False)
+METASTORE_POOL_MIN_SIZE = _env_int("METASTORE_POOL_MIN_SIZE", default=1)
+METASTORE_POOL_MAX_SIZE = _env_int("METASTORE_POOL_MAX_SIZE", default=10)
+METASTORE_POOL_TIMEOUT_SECONDS = _env_int("METASTORE_POOL_TIMEOUT_SECONDS", default=10)
+METASTORE_STATEMENT_TIMEOUT_MS = _env_int("METASTORE_STATEMENT_TIMEOUT_MS", default=5000)
+METASTORE_HEALTH_CHECK_INTERVAL_SECONDS = _env_int(
+    "METASTORE_HEALTH_CHECK_INTERVAL_SECONDS", default=30
+)
+METASTORE_WRITE_BEHIND_ENABLED = _env_bool("METASTORE_WRITE_BEHIND_ENABLED", default=False)
+METASTORE_WRITE_BEHIND_BATCH_SIZE = _env_int("METASTORE_WRITE_BEHIND_BATCH_SIZE", default=100)
+METASTORE_WRITE_BEHIND_FLUSH_MS = _env_int("METASTORE_WRITE_BEHIND_FLUSH_MS", default=200)
+METASTORE_WRITE_BEHIND_MAX_QUEUE = _env_int("METASTORE_WRITE_BEHIND_MAX_QUEUE", default=1000)
+METASTORE_WRITE_BEHIND_SPILL_PATH = os.getenv("METASTORE_WRITE_BEHIND_SPILL_PATH") or str(
+    Path(tempfile.gettempdir()) / "thinkabit-metadata-spill.jsonl"
+)
+BATCH_DELETE_MAX_IDS = _env_int("BATCH_DELETE_MAX_IDS", default=100)
+DATASET_EXPIRY_DAYS = _env_int("DATASET_EXPIRY_DAYS", default=7)
+EXPIRY_SWEEP_ENABLED = _env_bool("EXPIRY_SWEEP_ENABLED", default=False)
+EXPIRY_SWEEP_INTERVAL_SECONDS = _env_int("EXPIRY_SWEEP_INTERVAL_SECONDS", default=3600)
+EXPIRY_SWEEP_BATCH_SIZE = _env_int("EXPIRY_SWEEP_BATCH_SIZE", default=500)
+EXPIRY_SWEEP_MAX_BATCHES_PER_RUN = _env_int("EXPIRY_SWEEP_MAX_BATCHES_PER_RUN", default=20)
+EXPIRY_SWEEP_MAX_DELETES_PER_SECOND = _env_int(
+    "EXPIRY_SWEEP_MAX_DELETES_PER_SECOND", default=200
+)
+DESCRIPTOR_CACHE_TTL_SECONDS = _env_int("DESCRIPTOR_CACHE_TTL_SECONDS", default=30)
+DESCRIPTOR_CACHE_MAX_ENTRIES = _env_int("DESCRIPTOR_CACHE_MAX_ENTRIES", default=1024)
+CHAT_CONTEXT_CACHE_TTL_SECONDS = _env_int("CHAT_CONTEXT_CACHE_TTL_SECONDS", default=600)
+CHAT_CONTEXT_CACHE_MAX_ENTRIES = _env_int("CHAT_CONTEXT_CACHE_MAX_ENTRIES", default=256)
 
 # chatbot api key
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -1,16 +1,34 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.upload import router as upload_router
 from app.api.v1.chat import router as chat_router
+from app.api.v1.metrics import router as metrics_router
+from app.core.compression import CompressionMiddleware
+from app.core.config import COMPRESSION_MINIMUM_SIZE
 from app.errors import APIError, api_error_handler, request_validation_error_handler
+from app.services.service_container import get_service_container
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Routes get the container through app.state, never at import time.
+    services = get_service_container()
+    app.state.services = services
+    await services.startup()
+    yield
+    await services.shutdown()
 
 
 app = FastAPI(
     title="ThinkABit File Upload API",
     version="1.0.0",
     description="Sprint 1 backend skeleton for file upload.",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -23,8 +41,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    route_levels={
+        # Full row dumps are the largest payloads; favour throughput over ratio.
+        "/api/v1/datasets/{dataset_id}/content": {"zstd": 1, "br": 2, "gzip": 4},
+    },
+)
+
 app.include_router(upload_router, prefix="/api/v1")
 app.include_router(chat_router, prefix="/api/v1")
+app.include_router(metrics_router, prefix="/api/v1")
 
 app.add_exception_handler(APIError, api_error_handler)
 app.add_exception_handler(RequestValidationError, request_validation_error_handler)
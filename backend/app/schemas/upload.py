@@ -63,6 +63,12 @@ class DatasetMetadataResponse(BaseModel):
     updated_at: datetime
 
 
+class SessionDatasetsResponse(BaseModel):
+    session_id: str
+    datasets: list[DatasetMetadataResponse]
+    next_cursor: str | None = None
+
+
 class DatasetSchemaResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
@@ -75,6 +81,7 @@ class DatasetPreviewResponse(BaseModel):
     limit: int = Field(ge=1, le=200)
     offset: int = Field(ge=0)
     rows: list[dict[str, Any]]
+    next_cursor: str | None = None
 
 
 class DatasetContentResponse(BaseModel):
@@ -82,12 +89,121 @@ class DatasetContentResponse(BaseModel):
     rows: list[dict[str, Any]]
 
 
+class ColumnHistogram(BaseModel):
+    edges: list[float]
+    counts: list[int]
+
+
+class ColumnTopValue(BaseModel):
+    value: Any
+    count: int = Field(ge=0)
+
+
+class ColumnProfile(BaseModel):
+    name: str
+    dtype: DataType
+    count: int = Field(ge=0)
+    null_count: int = Field(ge=0)
+    distinct_count: int = Field(ge=0)
+    min: Any = None
+    max: Any = None
+    mean: float | None = None
+    std: float | None = None
+    quantiles: dict[str, float] | None = None
+    histogram: ColumnHistogram | None = None
+    top_values: list[ColumnTopValue] = Field(default_factory=list)
+
+
+class DatasetStatsResponse(BaseModel):
+    dataset_id: str
+    row_count: int = Field(ge=0)
+    columns: list[ColumnProfile]
+
+
+AggregateFunction = Literal["count", "sum", "mean", "min", "max", "median", "nunique"]
+
+
+class AggregateMeasure(BaseModel):
+    func: AggregateFunction
+    column: str | None = None
+    alias: str | None = Field(default=None, min_length=1, max_length=128)
+
+
+class DatasetAggregateRequest(BaseModel):
+    group_by: list[str] = Field(default_factory=list, max_length=8)
+    measures: list[AggregateMeasure] = Field(min_length=1, max_length=32)
+    filters: list[str] = Field(default_factory=list, alias="filter")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class DatasetAggregateResponse(BaseModel):
+    dataset_id: str
+    group_by: list[str]
+    rows: list[dict[str, Any]]
+    group_count: int = Field(ge=0)
+    truncated: bool
+
+
+class DatasetQueryRequest(BaseModel):
+    sql: str = Field(min_length=1, max_length=10000)
+    max_rows: int = Field(default=100, ge=1)
+
+
+class DatasetQueryResponse(BaseModel):
+    dataset_id: str
+    columns: list[str]
+    rows: list[dict[str, Any]]
+    row_count: int = Field(ge=0)
+    truncated: bool
+
+
+ChartKind = Literal["line", "scatter", "histogram"]
+
+
+class DatasetChartDataRequest(BaseModel):
+    kind: ChartKind
+    x: str
+    y: str | None = None
+    max_points: int = Field(default=1000, ge=2)
+    bins: int | None = Field(default=None, ge=1)
+    filters: list[str] = Field(default_factory=list, alias="filter")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class DatasetChartDataResponse(BaseModel):
+    dataset_id: str
+    kind: ChartKind
+    source_points: int = Field(ge=0)
+    points: list[dict[str, Any]]
+
+
 class DatasetDeleteResponse(BaseModel):
     dataset_id: str
     deleted: bool = True
     message: str
 
 
+class DatasetBatchDeleteRequest(BaseModel):
+    session_id: str = Field(min_length=1)
+    dataset_ids: list[str] = Field(min_length=1)
+
+
+DatasetBatchDeleteStatus = Literal["deleted", "not_found", "forbidden", "failed"]
+
+
+class DatasetBatchDeleteResult(BaseModel):
+    dataset_id: str
+    status: DatasetBatchDeleteStatus
+    message: str | None = None
+
+
+class DatasetBatchDeleteResponse(BaseModel):
+    results: list[DatasetBatchDeleteResult]
+    deleted_count: int = Field(ge=0)
+
+
 class ErrorBody(BaseModel):
     code: str
     message: str
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from app.core.config import (
+    METASTORE_POOL_MAX_SIZE,
+    METASTORE_POOL_TIMEOUT_SECONDS,
+    METASTORE_STATEMENT_TIMEOUT_MS,
+)
+from app.services.dataset_cache import TTLCache
+from app.services.db_pool import AsyncPostgresConnectionPool, wait_ready
+from app.services.metastore_service import (
+    DATASET_DESCRIPTOR_QUERY,
+    DATASET_PROFILE_QUERY,
+    DELETE_DATASET_QUERY,
+    INSERT_DATASET_QUERY,
+    DatasetDescriptorRecord,
+    DatasetInsertRecord,
+    DatasetMetadataRecord,
+    DatasetPreviewSourceRecord,
+    DatasetProfileRecord,
+    DatasetSchemaRecord,
+    build_descriptor_cache,
+)
+
+if TYPE_CHECKING:
+    from app.services.metadata_write_behind import MetadataWriteBehind
+
+
+class AsyncMetastoreService:
+    """Coroutine version of ``MetastoreService`` for async endpoints.
+
+    Runs the same statements over non-blocking connections, so awaiting a
+    metastore call yields the event loop instead of holding it. Pass the
+    sync service's ``descriptor_cache`` and ``write_behind`` so deletes and
+    queued inserts on either path are seen by both.
+    """
+
+    def __init__(
+        self,
+        *,
+        database_url: str | None,
+        pool: AsyncPostgresConnectionPool | None = None,
+        descriptor_cache: TTLCache[DatasetDescriptorRecord] | None = None,
+        write_behind: MetadataWriteBehind | None = None,
+    ) -> None:
+        self.database_url = database_url
+        self.pool = pool or AsyncPostgresConnectionPool(
+            database_url or "",
+            max_size=METASTORE_POOL_MAX_SIZE,
+            timeout=METASTORE_POOL_TIMEOUT_SECONDS,
+            statement_timeout_ms=METASTORE_STATEMENT_TIMEOUT_MS,
+        )
+        self.descriptor_cache = descriptor_cache or build_descriptor_cache()
+        self.write_behind = write_behind
+
+    def pool_stats(self) -> dict[str, int | float]:
+        return self.pool.stats()
+
+    async def insert_dataset_metadata(self, record: DatasetInsertRecord) -> None:
+        await self._execute(INSERT_DATASET_QUERY, record.to_params())
+
+    async def get_dataset_profile(self, dataset_id: str) -> DatasetProfileRecord | None:
+        pending = self.write_behind.pending(dataset_id) if self.write_behind else None
+        if pending is not None:
+            return DatasetProfileRecord(
+                dataset_id=pending.dataset_id, profile_json=pending.profile_json
+            )
+        row, _ = await self._execute(DATASET_PROFILE_QUERY, (dataset_id,), fetch=True)
+        if row is None:
+            return None
+        return DatasetProfileRecord(dataset_id=row[0], profile_json=row[1])
+
+    async def get_dataset_descriptor(
+        self, dataset_id: str
+    ) -> DatasetDescriptorRecord | None:
+        descriptor = self.descriptor_cache.get(dataset_id)
+        if descriptor is not None:
+            return descriptor
+
+        pending = self.write_behind.pending(dataset_id) if self.write_behind else None
+        if pending is not None:
+            return DatasetDescriptorRecord.from_insert_record(pending)
+
+        row, _ = await self._execute(DATASET_DESCRIPTOR_QUERY, (dataset_id,), fetch=True)
+        if row is None:
+            return None
+        descriptor = DatasetDescriptorRecord.from_row(row)
+        self.descriptor_cache.put(dataset_id, descriptor)
+        return descriptor
+
+    async def get_dataset_metadata(self, dataset_id: str) -> DatasetMetadataRecord | None:
+        descriptor = await self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_metadata_record() if descriptor is not None else None
+
+    async def get_dataset_schema(self, dataset_id: str) -> DatasetSchemaRecord | None:
+        descriptor = await self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_schema_record() if descriptor is not None else None
+
+    async def get_dataset_preview_source(
+        self, dataset_id: str
+    ) -> DatasetPreviewSourceRecord | None:
+        descriptor = await self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_preview_source_record() if descriptor is not None else None
+
+    async def delete_dataset_metadata(self, dataset_id: str) -> bool:
+        if self.write_behind is not None:
+            self.write_behind.discard(dataset_id)
+        _, deleted_count = await self._execute(DELETE_DATASET_QUERY, (dataset_id,))
+        self.descriptor_cache.invalidate(dataset_id)
+        return deleted_count > 0
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def _execute(
+        self, query: str, params: tuple[object, ...], *, fetch: bool = False
+    ) -> tuple[tuple | None, int]:
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not configured")
+
+        async with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query, params)
+                await wait_ready(connection)
+                row = cursor.fetchone() if fetch else None
+                return row, cursor.rowcount
+            finally:
+                cursor.close()
@@ -5,8 +5,15 @@ from google import genai
 from collections import deque
 
 from google.genai import types
-from app.core.config import GEMINI_API_KEY, GEMINI_MODEL, DATABASE_URL
-from app.services.metastore_service import MetastoreService
+from app.core.config import (
+    CHAT_CONTEXT_CACHE_MAX_ENTRIES,
+    CHAT_CONTEXT_CACHE_TTL_SECONDS,
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+)
+from app.services.dataset_cache import TTLCache
+from app.services.metastore_service import DatasetDescriptorRecord
+from app.services.service_container import get_service_container
 from app.services.upload_service import UploadService
 
 
@@ -16,6 +23,14 @@ rate_limit_lock = asyncio.Lock()
 request_times = deque()
 RPM_LIMIT = 10
 WINDOW_SECONDS = 60
+CHAT_PREVIEW_ROWS = 10
+
+# Keyed by storage key, which is unique per upload, so a cached context can
+# never describe a different file. Ownership is still checked per message.
+dataset_context_cache: TTLCache[dict] = TTLCache(
+    ttl_seconds=CHAT_CONTEXT_CACHE_TTL_SECONDS,
+    max_entries=CHAT_CONTEXT_CACHE_MAX_ENTRIES,
+)
 
 
 
@@ -47,7 +62,7 @@ async def rate_limit():
         await asyncio.sleep(max(sleep_for, 0))
 
 
-def _generate_chat_reply_sync(message: str, history: list[dict], dataset_id: str | None = None, session_id: str | None = None,) -> str:
+def _generate_chat_reply_sync(message: str, history: list[dict], dataset_id: str | None = None, session_id: str | None = None, upload_service: UploadService | None = None,) -> str:
     client = _get_client()
 
     system_prompt="""
@@ -78,7 +93,7 @@ Behavior rules:
     dataset_context = None
 
     if dataset_id:
-        dataset_context = inspect_uploaded_dataset(dataset_id, session_id)
+        dataset_context = inspect_uploaded_dataset(dataset_id, session_id, upload_service)
     
     dataset_section=""
     if dataset_context:
@@ -100,12 +115,12 @@ Behavior rules:
 
     return getattr(response, "text", None) or "Nothing is generated."
 
-async def generate_chat_reply (msg: str, history: list[dict], dataset_id: str | None = None, session_id: str  | None = None, max_retries: int=5) -> str:
+async def generate_chat_reply (msg: str, history: list[dict], dataset_id: str | None = None, session_id: str  | None = None, max_retries: int=5, upload_service: UploadService | None = None) -> str:
     for attempt in range(max_retries):
         await rate_limit()
 
         try:
-            return await run_in_threadpool(_generate_chat_reply_sync, msg, history, dataset_id, session_id)
+            return await run_in_threadpool(_generate_chat_reply_sync, msg, history, dataset_id, session_id, upload_service)
         
         except Exception as e:
             error_text = str(e)
@@ -122,45 +137,47 @@ async def generate_chat_reply (msg: str, history: list[dict], dataset_id: str |
     
     raise RuntimeError("Gemini API rate limit exceeded. Please try again later.")
     
-def inspect_uploaded_dataset(dataset_id: str | None, session_id: str | None) -> dict:
-    metastored = MetastoreService(database_url=DATABASE_URL)
-    upload_service = UploadService()
-
-    metadata = metastored.get_dataset_metadata(dataset_id)
-    if metadata is None:
+def inspect_uploaded_dataset(dataset_id: str | None, session_id: str | None, upload_service: UploadService | None = None) -> dict:
+    # Reuse the app's clients; building them per message costs a boto3
+    # client and a bucket check every time.
+    upload_service = upload_service or get_service_container().upload_service
+    descriptor = upload_service.metastore_service.get_dataset_descriptor(dataset_id)
+    if descriptor is None:
         raise ValueError("Dataset not found.")
     if session_id is None:
         raise PermissionError("Session id not found")
-    if metadata.session_id is not None and metadata.session_id != session_id:
+    if descriptor.session_id is not None and descriptor.session_id != session_id:
         raise PermissionError("You do not have access to this dataset.")
-    
-    source = metastored.get_dataset_preview_source(dataset_id)
-    if source is None:
-        raise ValueError("Dataset storage not found.")
-    
-    content = upload_service.storage_service.get_object(key=source.storage_key_raw)
 
-    preview_row = upload_service.build_preview_rows(
-        content = content,
-        extension = source.extension,
-        limit = 10,
-        offset = 0,
+    context = dataset_context_cache.get(descriptor.storage_key_raw)
+    if context is None:
+        context = _build_dataset_context(upload_service, descriptor)
+        dataset_context_cache.put(descriptor.storage_key_raw, context)
+    return context
+
+
+def _build_dataset_context(
+    upload_service: UploadService, descriptor: DatasetDescriptorRecord
+) -> dict:
+    # The schema was stored at upload time, and the sample rows come from the
+    # shared frame cache, so the file is downloaded and parsed at most once.
+    dataset = upload_service.load_dataset(
+        storage_key=descriptor.storage_key_raw,
+        extension=descriptor.extension,
     )
-
-    schema = upload_service.parse_dataset_bytes(
-        content=content,
-        extension=source.extension
-    )
-
-    schema_columns = upload_service._build_schema(schema)
+    schema = descriptor.schema_json or [
+        column.model_dump() for column in upload_service._build_schema(dataset.dataframe)
+    ]
 
     return {
-        "dataset_id": metadata.dataset_id,
-        "session_id": metadata.session_id,
-        "filename": metadata.original_filename,
-        "extension": metadata.extension,
-        "rows": metadata.row_count,
-        "columns": metadata.column_count,
-        "schema": [column.model_dump() for column in schema_columns],
-        "preview_rows": preview_row,
-    }
\ No newline at end of file
+        "dataset_id": descriptor.dataset_id,
+        "session_id": descriptor.session_id,
+        "filename": descriptor.original_filename,
+        "extension": descriptor.extension,
+        "rows": descriptor.row_count,
+        "columns": descriptor.column_count,
+        "schema": schema,
+        "preview_rows": upload_service.build_frame_rows(
+            dataset.dataframe, limit=CHAT_PREVIEW_ROWS
+        ),
+    }
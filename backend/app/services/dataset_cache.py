@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+import numpy as np
+import pandas as pd
+
+T = TypeVar("T")
+
+
+@dataclass
+class CachedDataset:
+    dataframe: pd.DataFrame
+    size_bytes: int
+    # Keyed by (column, order), plus a filter key for filtered orders.
+    sort_orders: dict[tuple, np.ndarray] = field(default_factory=dict)
+    # The names a column-projected parse was asked for; ``None`` for a full frame.
+    columns: frozenset[str] | None = None
+    # Set by the owning cache so derived data counts against its byte budget.
+    on_grow: Callable[[int], None] | None = field(default=None, repr=False)
+
+    def sort_order(self, column: str, order: str) -> np.ndarray:
+        """Row positions of the frame sorted by ``column``, nulls last.
+
+        The sort is stable, so ties keep upload order and every page of a
+        keyset walk is deterministic. Computed once per column and order.
+        """
+        key = (column, order)
+        positions = self.sort_orders.get(key)
+        if positions is None:
+            series = self.dataframe[column].reset_index(drop=True)
+            options = {"ascending": order == "asc", "kind": "stable", "na_position": "last"}
+            try:
+                ordered = series.sort_values(**options)
+            except TypeError:
+                # Mixed object columns (ints next to strings) have no natural
+                # order; sort them by their text instead.
+                ordered = series.sort_values(
+                    **options, key=lambda values: values.map(str, na_action="ignore")
+                )
+            positions = ordered.index.to_numpy()
+            if self.sort_orders.setdefault(key, positions) is positions:
+                self.grow(positions.nbytes)
+        return self.sort_orders[key]
+
+    def filtered_sort_order(
+        self,
+        column: str,
+        order: str,
+        *,
+        filter_key: tuple,
+        mask: Callable[[], np.ndarray],
+    ) -> np.ndarray:
+        """``sort_order`` restricted to the rows where ``mask()`` is true.
+
+        Cached under ``filter_key``, so paging through a filtered sort costs
+        one mask evaluation in total rather than one per page.
+        """
+        key = (column, order, filter_key)
+        positions = self.sort_orders.get(key)
+        if positions is None:
+            ordered = self.sort_order(column, order)
+            positions = ordered[mask()[ordered]]
+            if self.sort_orders.setdefault(key, positions) is positions:
+                self.grow(positions.nbytes)
+        return self.sort_orders[key]
+
+    def covers(self, columns: list[str] | None) -> bool:
+        if self.columns is None:
+            return True
+        return columns is not None and self.columns.issuperset(columns)
+
+    def grow(self, nbytes: int) -> None:
+        if self.on_grow is not None:
+            self.on_grow(nbytes)
+        else:
+            self.size_bytes += nbytes
+
+
+@dataclass
+class DatasetCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class DatasetFrameCache:
+    """In-process LRU of parsed dataset frames keyed by raw storage key.
+
+    Raw objects are write-once, so an entry never goes stale; it only leaves
+    the cache through eviction or an explicit ``invalidate`` on delete. An
+    entry may hold only some columns; lookups that ask for others miss.
+    """
+
+    def __init__(self, *, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedDataset] = OrderedDict()
+        self._size_bytes = 0
+        self._stats = DatasetCacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: str, columns: list[str] | None = None) -> CachedDataset | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.covers(columns):
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry
+
+    def peek(self, key: str) -> CachedDataset | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(
+        self, key: str, dataframe: pd.DataFrame, *, columns: list[str] | None = None
+    ) -> CachedDataset:
+        projected = frozenset(columns) if columns is not None else None
+        if not self.enabled:
+            return CachedDataset(dataframe=dataframe, size_bytes=0, columns=projected)
+        entry = CachedDataset(
+            dataframe=dataframe,
+            size_bytes=int(dataframe.memory_usage(deep=True).sum()),
+            columns=projected,
+        )
+        if entry.size_bytes > self.max_bytes:
+            return entry
+
+        entry.on_grow = lambda nbytes: self._grow(key, entry, nbytes)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous.size_bytes
+            self._entries[key] = entry
+            self._size_bytes += entry.size_bytes
+            self._evict()
+        return entry
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size_bytes -= entry.size_bytes
+
+    def _grow(self, key: str, entry: CachedDataset, nbytes: int) -> None:
+        with self._lock:
+            entry.size_bytes += nbytes
+            if self._entries.get(key) is entry:
+                self._size_bytes += nbytes
+                self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size_bytes -= evicted.size_bytes
+            self._stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self._stats.hits + self._stats.misses
+            return {
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "hit_ratio": (self._stats.hits / lookups) if lookups else 0.0,
+                "evictions": self._stats.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class TTLCache(Generic[T]):
+    """Small LRU whose entries also expire ``ttl_seconds`` after insertion.
+
+    Used for metastore rows, which can change in another worker; the TTL
+    bounds how long such a change goes unnoticed here.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        clock=time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, T]] = OrderedDict()
+        self._stats = DatasetCacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: str) -> T | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: T) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self._stats.hits + self._stats.misses
+            return {
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "hit_ratio": (self._stats.hits / lookups) if lookups else 0.0,
+                "evictions": self._stats.evictions,
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+
+import psycopg2
+from psycopg2 import extensions
+
+from app.core.config import (
+    METASTORE_HEALTH_CHECK_INTERVAL_SECONDS,
+    METASTORE_POOL_MAX_SIZE,
+    METASTORE_POOL_MIN_SIZE,
+    METASTORE_POOL_TIMEOUT_SECONDS,
+    METASTORE_STATEMENT_TIMEOUT_MS,
+)
+
+
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    connections_opened: int = 0
+    health_check_failures: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class PostgresConnectionPool:
+    """Thread-safe pool of psycopg2 connections.
+
+    Idle connections are reused most-recently-used first. A connection that
+    sat idle longer than ``health_check_interval`` is pinged before it is
+    handed out, and one that failed with a connection-level error is thrown
+    away instead of being returned to the pool.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        statement_timeout_ms: int = 0,
+        health_check_interval: float = 30.0,
+        connect: Callable[..., object] = psycopg2.connect,
+    ) -> None:
+        self.database_url = database_url
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.timeout = timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self.health_check_interval = health_check_interval
+        self._connect_fn = connect
+        self._idle: list[tuple[object, float]] = []
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._stats = PoolStats()
+        self._condition = threading.Condition()
+        self._warmed = False
+
+    @contextmanager
+    def connection(self) -> Iterator[object]:
+        """Check out a connection for one transaction.
+
+        Commits when the block succeeds and rolls back when it raises.
+        """
+        connection = self._checkout()
+        try:
+            yield connection
+            connection.commit()
+        except BaseException as exc:
+            self._release(connection, discard=not self._rollback(connection, exc))
+            raise
+        self._release(connection, discard=False)
+
+    def close(self) -> None:
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._condition:
+            checkouts = self._stats.checkouts
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": checkouts,
+                "timeouts": self._stats.timeouts,
+                "connections_opened": self._stats.connections_opened,
+                "health_check_failures": self._stats.health_check_failures,
+                "wait_ms_avg": (
+                    self._stats.wait_seconds_total / checkouts * 1000 if checkouts else 0.0
+                ),
+                "wait_ms_max": self._stats.wait_seconds_max * 1000,
+            }
+
+    def _checkout(self) -> object:
+        self._warm()
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        connection, idle_since = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        connection, idle_since = None, None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats.timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No metastore connection available within {self.timeout:g}s."
+                        )
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+            waited = time.monotonic() - started
+            self._stats.checkouts += 1
+            self._stats.wait_seconds_total += waited
+            self._stats.wait_seconds_max = max(self._stats.wait_seconds_max, waited)
+
+        try:
+            if connection is not None and not self._is_healthy(connection, idle_since):
+                self._close_quietly(connection)
+                connection = None
+            if connection is None:
+                connection = self._open()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        return connection
+
+    def _release(self, connection: object, *, discard: bool) -> None:
+        if discard or getattr(connection, "closed", False):
+            self._close_quietly(connection)
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            return
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._in_use -= 1
+            self._condition.notify()
+
+    def _warm(self) -> None:
+        if self._warmed:
+            return
+        with self._condition:
+            if self._warmed:
+                return
+            self._warmed = True
+            missing = max(self.min_size - self._size, 0)
+            self._size += missing
+        opened = []
+        try:
+            for _ in range(missing):
+                opened.append(self._open())
+        finally:
+            with self._condition:
+                self._size -= missing - len(opened)
+                now = time.monotonic()
+                self._idle.extend((connection, now) for connection in opened)
+                self._condition.notify(len(opened))
+
+    def _open(self) -> object:
+        kwargs = {}
+        if self.statement_timeout_ms > 0:
+            kwargs["options"] = f"-c statement_timeout={self.statement_timeout_ms}"
+        connection = self._connect_fn(self.database_url, **kwargs)
+        with self._condition:
+            self._stats.connections_opened += 1
+        return connection
+
+    def _is_healthy(self, connection: object, idle_since: float) -> bool:
+        if getattr(connection, "closed", False):
+            return False
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            with self._condition:
+                self._stats.health_check_failures += 1
+            return False
+
+    def _rollback(self, connection: object, exc: BaseException) -> bool:
+        if isinstance(exc, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            return False
+        try:
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _close_quietly(self, connection: object) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_shared_pools: dict[str, PostgresConnectionPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_shared_pool(database_url: str) -> PostgresConnectionPool:
+    """Process-wide pool per database URL, configured from settings."""
+    with _shared_pools_lock:
+        pool = _shared_pools.get(database_url)
+        if pool is None:
+            pool = PostgresConnectionPool(
+                database_url,
+                min_size=METASTORE_POOL_MIN_SIZE,
+                max_size=METASTORE_POOL_MAX_SIZE,
+                timeout=METASTORE_POOL_TIMEOUT_SECONDS,
+                statement_timeout_ms=METASTORE_STATEMENT_TIMEOUT_MS,
+                health_check_interval=METASTORE_HEALTH_CHECK_INTERVAL_SECONDS,
+            )
+            _shared_pools[database_url] = pool
+        return pool
+
+
+def close_shared_pools() -> None:
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+async def wait_ready(connection: object) -> None:
+    """Drive an ``async_=1`` psycopg2 connection until its operation completes.
+
+    Waits on the socket with the event loop's reader/writer callbacks, so no
+    thread is blocked while Postgres works.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        state = connection.poll()
+        if state == extensions.POLL_OK:
+            return
+
+        fileno = connection.fileno()
+        future = loop.create_future()
+
+        def ready() -> None:
+            if not future.done():
+                future.set_result(None)
+
+        if state == extensions.POLL_READ:
+            loop.add_reader(fileno, ready)
+            remove = loop.remove_reader
+        elif state == extensions.POLL_WRITE:
+            loop.add_writer(fileno, ready)
+            remove = loop.remove_writer
+        else:
+            raise psycopg2.OperationalError(f"Unexpected poll state {state}.")
+        try:
+            await future
+        finally:
+            remove(fileno)
+
+
+class AsyncPostgresConnectionPool:
+    """Pool of non-blocking psycopg2 connections for coroutine callers.
+
+    Async connections run in autocommit mode, so every statement is its own
+    transaction. The pool belongs to the event loop that first uses it.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        *,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        statement_timeout_ms: int = 0,
+        connect: Callable[..., object] = psycopg2.connect,
+    ) -> None:
+        self.database_url = database_url
+        self.max_size = max(max_size, 1)
+        self.timeout = timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self._connect_fn = connect
+        self._idle: list[object] = []
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._stats = PoolStats()
+        self._slots: asyncio.Semaphore | None = None
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[object]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_size)
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError as exc:
+            self._stats.timeouts += 1
+            raise PoolTimeoutError(
+                f"No metastore connection available within {self.timeout:g}s."
+            ) from exc
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self._stats.checkouts += 1
+        self._stats.wait_seconds_total += waited
+        self._stats.wait_seconds_max = max(self._stats.wait_seconds_max, waited)
+        self._in_use += 1
+        connection = None
+        try:
+            connection = await self._checkout()
+            yield connection
+        except BaseException:
+            # Any failure, cancellation included, can leave a statement in
+            # flight; handing the connection on would fail the next caller
+            # with "asynchronous query is underway".
+            if connection is not None:
+                self._discard(connection)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                self._idle.append(connection)
+            self._in_use -= 1
+            self._slots.release()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            self._discard(connection)
+
+    def stats(self) -> dict[str, int | float]:
+        checkouts = self._stats.checkouts
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "waiting": self._waiting,
+            "max_size": self.max_size,
+            "checkouts": checkouts,
+            "timeouts": self._stats.timeouts,
+            "connections_opened": self._stats.connections_opened,
+            "wait_ms_avg": (
+                self._stats.wait_seconds_total / checkouts * 1000 if checkouts else 0.0
+            ),
+            "wait_ms_max": self._stats.wait_seconds_max * 1000,
+        }
+
+    async def _checkout(self) -> object:
+        while self._idle:
+            connection = self._idle.pop()
+            if not getattr(connection, "closed", False):
+                return connection
+            self._discard(connection)
+
+        kwargs: dict[str, object] = {"async_": 1}
+        if self.statement_timeout_ms > 0:
+            kwargs["options"] = f"-c statement_timeout={self.statement_timeout_ms}"
+        connection = self._connect_fn(self.database_url, **kwargs)
+        self._size += 1
+        self._stats.connections_opened += 1
+        try:
+            await wait_ready(connection)
+        except BaseException:
+            self._discard(connection)
+            raise
+        return connection
+
+    def _discard(self, connection: object) -> None:
+        self._size -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import math
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+from app.errors import APIError
+
+
+def build_chart_points(
+    dataframe: pd.DataFrame,
+    *,
+    kind: str,
+    x: str,
+    y: str | None,
+    max_points: int,
+    bins: int | None = None,
+) -> tuple[list[dict[str, object]], int]:
+    """Reduce ``dataframe`` to at most ``max_points`` chart points.
+
+    Returns the points and the number of rows they summarise.
+    """
+    missing = [
+        name for name in (x, y) if name is not None and name not in dataframe.columns
+    ]
+    if missing:
+        raise _build_error(
+            message="Unknown column(s) requested.", details={"columns": missing}
+        )
+    if kind != "histogram" and y is None:
+        raise _build_error(
+            message=f"A '{kind}' chart requires y.", details={"kind": kind}
+        )
+
+    if kind == "histogram":
+        values = _numeric_values(dataframe[x].dropna(), x)
+        values = values[np.isfinite(values)]
+        counts, edges = histogram(values, bins, max_points)
+        points = [
+            {
+                "x0": float(edges[index]),
+                "x1": float(edges[index + 1]),
+                "count": int(count),
+            }
+            for index, count in enumerate(counts)
+        ]
+        return points, int(len(values))
+
+    # x and y may name the same column; select it once so labels stay unique.
+    frame = dataframe[list(dict.fromkeys((x, y)))].dropna()
+    x_values = _numeric_values(frame[x], x)
+    y_values = _numeric_values(frame[y], y)
+    # Infinite values have no place on an axis and break the binning.
+    rows = np.isfinite(x_values) & np.isfinite(y_values)
+    if kind == "line":
+        rows = np.flatnonzero(rows)
+        rows = rows[np.argsort(x_values[rows], kind="stable")]
+    frame, x_values, y_values = frame.iloc[rows], x_values[rows], y_values[rows]
+
+    if kind == "line":
+        keep = lttb_indices(x_values, y_values, max_points)
+        sampled = frame.iloc[keep]
+        points = [
+            {"x": _to_json_value(x_value), "y": _to_json_value(y_value)}
+            for x_value, y_value in zip(sampled[x].tolist(), sampled[y].tolist())
+        ]
+        return points, int(len(frame))
+
+    if len(frame) <= max_points:
+        points = [
+            {"x": _to_json_value(x_value), "y": _to_json_value(y_value), "count": 1}
+            for x_value, y_value in zip(frame[x].tolist(), frame[y].tolist())
+        ]
+        return points, int(len(frame))
+
+    x_centres, y_centres, counts = bin_2d(x_values, y_values, max_points)
+    x_output = _restore_axis(x_centres, frame[x])
+    y_output = _restore_axis(y_centres, frame[y])
+    points = [
+        {"x": x_value, "y": y_value, "count": int(count)}
+        for x_value, y_value, count in zip(x_output, y_output, counts)
+    ]
+    return points, int(len(frame))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Pick ``threshold`` points with largest-triangle-three-buckets.
+
+    ``x`` must be sorted ascending. The first and last points are always
+    kept; every bucket in between contributes the point forming the largest
+    triangle with the previously kept point and the next bucket's average.
+    """
+    n = len(x)
+    if threshold >= n or n <= 2:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1][:threshold], dtype=np.int64)
+
+    x = x.astype(np.float64, copy=False)
+    y = y.astype(np.float64, copy=False)
+    every = (n - 2) / (threshold - 2)
+    sampled = np.empty(threshold, dtype=np.int64)
+    sampled[0] = 0
+    anchor = 0
+
+    for bucket in range(threshold - 2):
+        avg_start = int(math.floor((bucket + 1) * every)) + 1
+        avg_end = min(int(math.floor((bucket + 2) * every)) + 1, n)
+        avg_x = x[avg_start:avg_end].mean()
+        avg_y = y[avg_start:avg_end].mean()
+
+        range_start = int(math.floor(bucket * every)) + 1
+        range_end = int(math.floor((bucket + 1) * every)) + 1
+        xs = x[range_start:range_end]
+        ys = y[range_start:range_end]
+
+        areas = np.abs(
+            (x[anchor] - avg_x) * (ys - y[anchor]) - (x[anchor] - xs) * (avg_y - y[anchor])
+        )
+        anchor = range_start + int(np.argmax(areas))
+        sampled[bucket + 1] = anchor
+
+    sampled[-1] = n - 1
+    return sampled
+
+
+def bin_2d(
+    x: np.ndarray, y: np.ndarray, max_cells: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bin a scatter into at most ``max_cells`` non-empty grid cells.
+
+    Returns the x centres, y centres and point counts of the occupied cells.
+    """
+    bins = max(1, int(math.isqrt(max_cells)))
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    x_index, y_index = np.nonzero(counts)
+    x_centres = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centres = (y_edges[:-1] + y_edges[1:]) / 2
+    return x_centres[x_index], y_centres[y_index], counts[x_index, y_index]
+
+
+def freedman_diaconis_bins(values: np.ndarray, max_bins: int) -> int:
+    n = len(values)
+    if n < 2:
+        return 1
+    q1, q3 = np.percentile(values, [25, 75])
+    width = 2 * (q3 - q1) * n ** (-1 / 3)
+    spread = float(values.max() - values.min())
+    if width <= 0 or spread <= 0:
+        return 1
+    return int(min(max(math.ceil(spread / width), 1), max_bins))
+
+
+def histogram(
+    values: np.ndarray, bins: int | None, max_bins: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Histogram ``values`` with a fixed bin count, or Freedman–Diaconis when None."""
+    bin_count = bins if bins is not None else freedman_diaconis_bins(values, max_bins)
+    counts, edges = np.histogram(values, bins=min(bin_count, max_bins))
+    return counts, edges
+
+
+def _numeric_values(series: pd.Series, column: str) -> np.ndarray:
+    if is_datetime64_any_dtype(series):
+        if series.dt.tz is not None:
+            series = series.dt.tz_convert(None)
+        return series.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    if is_numeric_dtype(series) and not is_bool_dtype(series):
+        return series.to_numpy(dtype=np.float64)
+    raise _build_error(
+        message=f"Column '{column}' must be numeric or datetime for this chart.",
+        details={"column": column},
+    )
+
+
+def _restore_axis(values: np.ndarray, source: pd.Series) -> list[object]:
+    if is_datetime64_any_dtype(source):
+        return [_to_json_value(pd.Timestamp(int(value))) for value in values]
+    return [float(value) for value in values]
+
+
+def _to_json_value(value: object) -> object:
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _build_error(*, message: str, details: dict[str, object]) -> APIError:
+    return APIError(
+        status_code=400,
+        code="INVALID_QUERY",
+        message=message,
+        details=details,
+        request_id=f"req_{uuid4().hex[:8]}",
+    )
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from app.services.dataset_cache import DatasetFrameCache
+from app.services.metastore_service import MetastoreService
+from app.services.storage_service import S3StorageService
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweepStats:
+    runs: int = 0
+    batches: int = 0
+    datasets_deleted: int = 0
+    objects_deleted: int = 0
+    object_failures: int = 0
+    errors: int = 0
+    throttled_seconds: float = 0.0
+    last_run_at: datetime | None = None
+    last_run_seconds: float = 0.0
+
+
+class ExpirySweeper:
+    """Delete datasets older than ``expiry_days`` in the background.
+
+    Each batch costs one indexed SELECT, one DeleteObjects request per 1000
+    keys and one ``DELETE ... = ANY``. Objects go first; a row whose object
+    could not be deleted is kept, and the keyset cursor moves past it so it
+    cannot hold back the rows behind it. Missing objects count as deleted.
+    A run capped by ``max_batches_per_run`` resumes at the cursor; once the
+    sweep reaches the end it starts over, retrying the kept rows. Throughput
+    is capped at ``max_deletes_per_second``.
+    """
+
+    def __init__(
+        self,
+        *,
+        metastore_service: MetastoreService,
+        storage_service: S3StorageService,
+        frame_cache: DatasetFrameCache | None = None,
+        storage_enabled: bool = True,
+        expiry_days: int,
+        batch_size: int = 500,
+        max_batches_per_run: int = 20,
+        max_deletes_per_second: float = 200,
+        interval_seconds: float = 3600,
+        now: Callable[[], datetime] = lambda: datetime.now(UTC),
+    ) -> None:
+        self.metastore_service = metastore_service
+        self.storage_service = storage_service
+        self.frame_cache = frame_cache
+        self.storage_enabled = storage_enabled
+        self.expiry_days = expiry_days
+        self.batch_size = max(batch_size, 1)
+        self.max_batches_per_run = max_batches_per_run
+        self.max_deletes_per_second = max_deletes_per_second
+        self.interval_seconds = interval_seconds
+        self._now = now
+        self._stats = SweepStats()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._resume_after: tuple[datetime, str] | None = None
+
+    def sweep_once(self) -> int:
+        """Run one bounded sweep; returns how many datasets were deleted."""
+        started = time.monotonic()
+        cutoff = self._now() - timedelta(days=self.expiry_days)
+        deleted_total = 0
+        try:
+            for _ in range(self.max_batches_per_run):
+                if self._stop.is_set():
+                    break
+                records = self.metastore_service.list_expired_datasets(
+                    cutoff, limit=self.batch_size, after=self._resume_after
+                )
+                if records:
+                    deleted_total += self._delete_batch(records)
+                if len(records) < self.batch_size:
+                    # End of the expired rows; the next run starts over.
+                    self._resume_after = None
+                    break
+                last = records[-1]
+                self._resume_after = (last.created_at, last.dataset_id)
+                self._throttle(started, deleted_total)
+        except Exception:
+            logger.exception("Dataset expiry sweep failed")
+            with self._lock:
+                self._stats.errors += 1
+        finally:
+            with self._lock:
+                self._stats.runs += 1
+                self._stats.last_run_at = self._now()
+                self._stats.last_run_seconds = time.monotonic() - started
+        return deleted_total
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="expiry-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "runs": self._stats.runs,
+                "batches": self._stats.batches,
+                "datasets_deleted": self._stats.datasets_deleted,
+                "objects_deleted": self._stats.objects_deleted,
+                "object_failures": self._stats.object_failures,
+                "errors": self._stats.errors,
+                "throttled_seconds": round(self._stats.throttled_seconds, 3),
+                "last_run_at": (
+                    self._stats.last_run_at.isoformat() if self._stats.last_run_at else None
+                ),
+                "last_run_ms": round(self._stats.last_run_seconds * 1000, 1),
+            }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sweep_once()
+            self._stop.wait(self.interval_seconds)
+
+    def _delete_batch(self, records: list) -> int:
+        keys = [record.storage_key_raw for record in records]
+        if self.frame_cache is not None:
+            for key in keys:
+                self.frame_cache.invalidate(key)
+        # Without object storage there is nothing to delete but the rows.
+        failed = (
+            set(self.storage_service.delete_objects(keys=keys))
+            if self.storage_enabled
+            else set()
+        )
+        dataset_ids = [
+            record.dataset_id for record in records if record.storage_key_raw not in failed
+        ]
+        deleted = self.metastore_service.delete_datasets_metadata(dataset_ids)
+        with self._lock:
+            self._stats.batches += 1
+            if self.storage_enabled:
+                self._stats.objects_deleted += len(keys) - len(failed)
+            self._stats.object_failures += len(failed)
+            self._stats.datasets_deleted += len(deleted)
+        return len(deleted)
+
+    def _throttle(self, started: float, deleted_total: int) -> None:
+        if self.max_deletes_per_second <= 0:
+            return
+        earliest = started + deleted_total / self.max_deletes_per_second
+        delay = earliest - time.monotonic()
+        if delay > 0:
+            with self._lock:
+                self._stats.throttled_seconds += delay
+            self._stop.wait(delay)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_numeric_dtype,
+)
+
+from app.errors import APIError
+from app.services.dataset_cache import CachedDataset
+
+
+FILTER_OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "in", "is_null")
+
+
+@dataclass
+class RowFilter:
+    column: str
+    op: str
+    value: str
+
+
+def parse_columns(raw: str | None) -> list[str] | None:
+    if raw is None:
+        return None
+    columns = [name.strip() for name in raw.split(",") if name.strip()]
+    return list(dict.fromkeys(columns)) or None
+
+
+def parse_filters(raw_filters: list[str]) -> list[RowFilter]:
+    filters: list[RowFilter] = []
+    for raw in raw_filters:
+        parts = raw.split(":", 2)
+        if len(parts) < 2 or not parts[0] or parts[1] not in FILTER_OPERATORS:
+            raise _build_error(
+                message="Filters must look like column:op:value.",
+                details={"filter": raw, "operators": list(FILTER_OPERATORS)},
+            )
+        column, op = parts[0], parts[1]
+        value = parts[2] if len(parts) == 3 else ""
+        if op != "is_null" and len(parts) != 3:
+            raise _build_error(
+                message=f"Filter operator '{op}' requires a value.",
+                details={"filter": raw},
+            )
+        filters.append(RowFilter(column=column, op=op, value=value))
+    return filters
+
+
+def referenced_columns(
+    columns: list[str] | None, filters: list[RowFilter]
+) -> list[str] | None:
+    if columns is None:
+        return None
+    needed = list(columns)
+    for row_filter in filters:
+        if row_filter.column not in needed:
+            needed.append(row_filter.column)
+    return needed
+
+
+def apply_query(
+    dataframe: pd.DataFrame,
+    *,
+    columns: list[str] | None,
+    filters: list[RowFilter],
+) -> pd.DataFrame:
+    _require_columns(dataframe, columns or [])
+    _require_columns(dataframe, [row_filter.column for row_filter in filters])
+
+    if filters:
+        dataframe = dataframe.loc[_filter_mask(dataframe, filters)]
+    if columns is not None:
+        dataframe = dataframe.loc[:, columns]
+    return dataframe
+
+
+def sorted_page(
+    dataset: CachedDataset,
+    *,
+    columns: list[str] | None,
+    filters: list[RowFilter],
+    sort_by: str,
+    order: str,
+    limit: int,
+    offset: int,
+    cursor: str | None,
+) -> tuple[pd.DataFrame, str | None]:
+    """One page of the rows matching ``filters``, ordered by ``sort_by``.
+
+    The matching positions in sort order are cached on ``dataset`` per sort
+    and filter set, so after the first page each page only slices them.
+    """
+    dataframe = dataset.dataframe
+    _require_columns(dataframe, [sort_by, *(columns or [])])
+    _require_columns(dataframe, [row_filter.column for row_filter in filters])
+    if filters:
+        positions = dataset.filtered_sort_order(
+            sort_by,
+            order,
+            filter_key=tuple((item.column, item.op, item.value) for item in filters),
+            mask=lambda: _filter_mask(dataframe, filters).to_numpy(
+                dtype=bool, na_value=False
+            ),
+        )
+    else:
+        positions = dataset.sort_order(sort_by, order)
+
+    start = offset
+    if cursor is not None:
+        start = _resolve_cursor(cursor, positions, sort_by=sort_by, order=order)
+
+    page_positions = positions[start : start + limit]
+    page = dataframe.iloc[page_positions]
+    if columns is not None:
+        page = page.loc[:, columns]
+
+    next_cursor = None
+    end = start + len(page_positions)
+    if len(page_positions) and end < len(positions):
+        next_cursor = _encode_cursor(
+            sort_by=sort_by, order=order, rank=end, row=int(positions[end - 1])
+        )
+    return page, next_cursor
+
+
+def aggregate(
+    dataframe: pd.DataFrame,
+    *,
+    group_by: list[str],
+    measures: list[tuple[str, str | None, str]],
+    max_groups: int,
+) -> tuple[pd.DataFrame, int]:
+    """Group ``dataframe`` and evaluate ``(func, column, output_name)`` measures.
+
+    Returns at most ``max_groups`` groups (in group-key order) together with
+    the total number of groups.
+    """
+    _require_columns(dataframe, group_by)
+    _require_columns(dataframe, [column for _, column, _ in measures if column is not None])
+
+    output_names = [name for _, _, name in measures]
+    duplicates = sorted({name for name in output_names if output_names.count(name) > 1})
+    if duplicates or set(output_names) & set(group_by):
+        raise _build_error(
+            message="Measure names must be unique and differ from group_by columns.",
+            details={"names": duplicates or sorted(set(output_names) & set(group_by))},
+        )
+
+    for func, column, _ in measures:
+        if column is None and func != "count":
+            raise _build_error(
+                message=f"Measure '{func}' requires a column.",
+                details={"func": func},
+            )
+        if func in {"sum", "mean", "median"} and not (
+            is_numeric_dtype(dataframe[column]) and not is_bool_dtype(dataframe[column])
+        ):
+            raise _build_error(
+                message=f"Measure '{func}' requires a numeric column.",
+                details={"func": func, "column": column},
+            )
+
+    try:
+        if not group_by:
+            values = {
+                name: [_evaluate_measure(dataframe, func, column)]
+                for func, column, name in measures
+            }
+            return pd.DataFrame(values), 1
+
+        grouped = dataframe.groupby(group_by, dropna=False, sort=True, observed=True)
+        columns: dict[str, pd.Series] = {}
+        for func, column, name in measures:
+            if column is None:
+                columns[name] = grouped.size()
+            else:
+                columns[name] = grouped[column].agg(func)
+    except TypeError as exc:
+        raise _build_error(
+            message="Measures could not be evaluated for the selected columns.",
+            details={"reason": str(exc)[:200]},
+        ) from exc
+
+    result = pd.DataFrame(columns).head(max_groups).reset_index()
+    return result, int(grouped.ngroups)
+
+
+def _evaluate_measure(dataframe: pd.DataFrame, func: str, column: str | None) -> object:
+    if column is None:
+        return len(dataframe)
+    return dataframe[column].agg(func)
+
+
+def _encode_cursor(*, sort_by: str, order: str, rank: int, row: int) -> str:
+    payload = json.dumps({"c": sort_by, "o": order, "k": rank, "r": row})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _resolve_cursor(
+    cursor: str, positions: np.ndarray, *, sort_by: str, order: str
+) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        rank, row = int(payload["k"]), int(payload["r"])
+        matches_sort = payload["c"] == sort_by and payload["o"] == order
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeError) as exc:
+        raise _build_error(
+            message="Cursor is malformed.",
+            details={"cursor": cursor[:64]},
+            code="INVALID_CURSOR",
+        ) from exc
+
+    # The last row handed out must still sit right before the next page,
+    # otherwise the cursor belongs to a different sort or filter set.
+    if not matches_sort or not 0 < rank <= len(positions) or positions[rank - 1] != row:
+        raise _build_error(
+            message="Cursor does not match this sort order and filter set.",
+            details={"sort_by": sort_by, "order": order},
+            code="INVALID_CURSOR",
+        )
+    return rank
+
+
+def _filter_mask(dataframe: pd.DataFrame, filters: list[RowFilter]) -> pd.Series:
+    mask = pd.Series(True, index=dataframe.index)
+    for row_filter in filters:
+        mask &= _build_mask(dataframe[row_filter.column], row_filter)
+    return mask
+
+
+def _build_mask(series: pd.Series, row_filter: RowFilter) -> pd.Series:
+    if row_filter.op == "is_null":
+        wants_null = row_filter.value.strip().lower() not in {"false", "0", "no"}
+        return series.isna() if wants_null else series.notna()
+
+    if row_filter.op == "in":
+        values = [
+            _coerce_value(series, item.strip(), row_filter)
+            for item in row_filter.value.split(",")
+        ]
+        return series.isin(values)
+
+    value = _coerce_value(series, row_filter.value, row_filter)
+    try:
+        if row_filter.op == "=":
+            return series == value
+        if row_filter.op == "!=":
+            return series != value
+        if row_filter.op == "<":
+            return series < value
+        if row_filter.op == "<=":
+            return series <= value
+        if row_filter.op == ">":
+            return series > value
+        return series >= value
+    except TypeError as exc:
+        raise _build_error(
+            message=f"Column '{row_filter.column}' cannot be compared with '{row_filter.op}'.",
+            details={"column": row_filter.column, "op": row_filter.op},
+        ) from exc
+
+
+def _coerce_value(series: pd.Series, raw: str, row_filter: RowFilter) -> object:
+    try:
+        if is_bool_dtype(series):
+            lowered = raw.strip().lower()
+            if lowered not in {"true", "false", "1", "0"}:
+                raise ValueError(raw)
+            return lowered in {"true", "1"}
+        if is_numeric_dtype(series):
+            return float(raw)
+        if is_datetime64_any_dtype(series):
+            timestamp = pd.Timestamp(raw)
+            if series.dt.tz is not None and timestamp.tzinfo is None:
+                timestamp = timestamp.tz_localize("UTC")
+            return timestamp
+    except ValueError as exc:
+        raise _build_error(
+            message=f"Filter value '{raw}' does not match the type of column '{row_filter.column}'.",
+            details={"column": row_filter.column, "value": raw},
+        ) from exc
+    return raw
+
+
+def _require_columns(dataframe: pd.DataFrame, columns: list[str]) -> None:
+    missing = [name for name in columns if name not in dataframe.columns]
+    if missing:
+        raise _build_error(
+            message="Unknown column(s) requested.",
+            details={"columns": missing},
+        )
+
+
+def _build_error(
+    *, message: str, details: dict[str, object], code: str = "INVALID_QUERY"
+) -> APIError:
+    return APIError(
+        status_code=400,
+        code=code,
+        message=message,
+        details=details,
+        request_id=f"req_{uuid4().hex[:8]}",
+    )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+
+class LocalFileStorageService:
+    """Object storage in a local directory, interchangeable with S3StorageService.
+
+    Meant for single-node deployments and tests. Objects live at
+    ``root/bucket/key``; writes go to a temporary file that is renamed into
+    place, so readers never see a partial object, and reads map the file
+    instead of copying it through a socket.
+    """
+
+    def __init__(self, *, root: str | Path, bucket: str) -> None:
+        self.bucket = bucket
+        self.root = Path(root).resolve() / bucket
+        # Local reads are already as cheap as a cache hit.
+        self.object_cache = None
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def warm_up(self) -> None:
+        return None
+
+    def put_object(self, *, file_bytes: bytes, key: str, content_type: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(file_bytes)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def get_object(self, *, key: str) -> bytes:
+        return self.get_object_range(key=key, start=0)
+
+    def get_object_range(self, *, key: str, start: int, end: int | None = None) -> bytes:
+        """Bytes ``start`` through ``end`` inclusive, like an HTTP Range."""
+        with self._path(key).open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            stop = size if end is None else min(end + 1, size)
+            if size == 0 or start >= stop:
+                return b""
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[start:stop]
+
+    def iter_object(self, *, key: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        with self._path(key).open("rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, len(mapped), chunk_size):
+                    yield mapped[offset : offset + chunk_size]
+
+    def delete_object(self, *, key: str) -> None:
+        path = self._path(key)
+        path.unlink(missing_ok=True)
+        self._prune_empty_parents(path)
+
+    def delete_objects(self, *, keys: list[str]) -> list[str]:
+        failed = []
+        for key in keys:
+            try:
+                self.delete_object(key=key)
+            except OSError:
+                failed.append(key)
+        return failed
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root) or path == self.root:
+            raise ValueError(f"Object key escapes the storage root: {key!r}")
+        return path
+
+    def _prune_empty_parents(self, path: Path) -> None:
+        # Keys are nested per day and dataset; drop directories left empty.
+        parent = path.parent
+        while parent != self.root:
+            try:
+                parent.rmdir()
+            except OSError:
+                return
+            parent = parent.parent
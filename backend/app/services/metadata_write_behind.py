@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.services.metastore_service import DatasetInsertRecord
+
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_BACKOFF_SECONDS = 30.0
+
+
+@dataclass
+class WriteBehindStats:
+    submitted: int = 0
+    overflowed: int = 0
+    flushed: int = 0
+    batches: int = 0
+    failures: int = 0
+    rejected: int = 0
+    spilled: int = 0
+    replayed: int = 0
+
+
+class MetadataWriteBehind:
+    """Queue metadata inserts and write them in multi-row batches.
+
+    A background thread flushes once ``max_batch_size`` records are waiting
+    or ``flush_interval`` seconds after the oldest one arrived, each batch in
+    a single transaction. A failed batch stays queued and is retried with
+    exponential backoff. At most ``max_queue_size`` records are held;
+    ``submit`` refuses more and the caller writes them directly.
+
+    Queued records are stamped with ``created_at`` on submit and written
+    with it, so reads served from the queue match the row written later.
+    They are only visible in this process, through ``pending``.
+
+    What is still queued at ``close`` is appended to ``spill_path`` and
+    written by ``replay_spill`` at the next start or shutdown. Rows the
+    database rejects outright (``is_transient`` is false for the error) are
+    logged, counted and dropped so they cannot hold back their batch.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[DatasetInsertRecord]], None],
+        *,
+        record_type: type[DatasetInsertRecord],
+        max_batch_size: int = 100,
+        max_queue_size: int = 1000,
+        flush_interval: float = 0.5,
+        retry_backoff: float = 0.5,
+        spill_path: str | os.PathLike[str],
+        is_transient: Callable[[Exception], bool] = lambda exc: True,
+    ) -> None:
+        self._flush_fn = flush
+        self._record_type = record_type
+        self._is_transient = is_transient
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_queue_size = max(max_queue_size, self.max_batch_size)
+        self.flush_interval = flush_interval
+        self.retry_backoff = retry_backoff
+        self.spill_path = Path(spill_path)
+        self._pending: OrderedDict[str, DatasetInsertRecord] = OrderedDict()
+        self._oldest_at: float | None = None
+        self._attempts = 0
+        self._retry_at: float | None = None
+        self._stats = WriteBehindStats()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def submit(self, record: DatasetInsertRecord) -> bool:
+        """Queue ``record``; returns ``False`` when the queue is full."""
+        if record.created_at is None:
+            record = replace(record, created_at=datetime.now(timezone.utc))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Metadata write-behind queue is closed.")
+            if len(self._pending) >= self.max_queue_size:
+                self._stats.overflowed += 1
+                return False
+            self._pending[record.dataset_id] = record
+            self._stats.submitted += 1
+            if self._oldest_at is None:
+                self._oldest_at = time.monotonic()
+            self._ensure_thread()
+            if len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+            return True
+
+    def pending(self, dataset_id: str) -> DatasetInsertRecord | None:
+        with self._condition:
+            return self._pending.get(dataset_id)
+
+    def pending_for_session(self, session_id: str) -> list[DatasetInsertRecord]:
+        with self._condition:
+            return [
+                record for record in self._pending.values() if record.session_id == session_id
+            ]
+
+    def discard(self, dataset_id: str) -> bool:
+        """Drop a queued record. Waits out an in-flight batch first, so once
+        this returns the record is either in the database or gone for good."""
+        with self._flush_lock:
+            with self._condition:
+                return self._pending.pop(dataset_id, None) is not None
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._condition:
+                batch = list(self._pending.values())[: self.max_batch_size]
+            if not batch:
+                return
+            try:
+                rejected = self._write(batch)
+            except Exception:
+                logger.exception("Metadata write-behind flush failed")
+                with self._condition:
+                    self._stats.failures += 1
+                    self._attempts += 1
+                    delay = min(
+                        self.retry_backoff * 2 ** (self._attempts - 1),
+                        MAX_RETRY_BACKOFF_SECONDS,
+                    )
+                    self._retry_at = time.monotonic() + delay
+                return
+            with self._condition:
+                self._stats.flushed += len(batch) - rejected
+                self._stats.batches += 1
+                self._attempts = 0
+                self._retry_at = None
+                for record in batch:
+                    if self._pending.get(record.dataset_id) is record:
+                        del self._pending[record.dataset_id]
+                self._oldest_at = time.monotonic() if self._pending else None
+
+    def close(self) -> None:
+        """Stop the flush thread, then write or spill everything queued."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        try:
+            self.replay_spill()
+        except Exception:
+            logger.exception("Replaying spilled dataset metadata failed")
+
+        with self._flush_lock:
+            with self._condition:
+                remaining = list(self._pending.values())
+                self._pending.clear()
+            for start in range(0, len(remaining), self.max_batch_size):
+                batch = remaining[start : start + self.max_batch_size]
+                try:
+                    rejected = self._write(batch)
+                except Exception:
+                    logger.exception("Final metadata flush failed; spilling to disk")
+                    self._append(remaining[start:])
+                    with self._condition:
+                        self._stats.spilled += len(remaining) - start
+                    return
+                with self._condition:
+                    self._stats.flushed += len(batch) - rejected
+                    self._stats.batches += 1
+
+    def replay_spill(self) -> int:
+        """Write the rows spilled by an earlier shutdown; returns how many.
+
+        The file is moved aside first so two workers starting together do
+        not both replay it. Rows left unwritten by an error go back to
+        ``spill_path`` before the error is raised.
+        """
+        claimed = self.spill_path.with_name(f"{self.spill_path.name}.{os.getpid()}")
+        try:
+            os.replace(self.spill_path, claimed)
+        except FileNotFoundError:
+            return 0
+        records = [
+            self._record_type(**json.loads(line))
+            for line in claimed.read_text(encoding="utf-8").splitlines()
+            if line.strip()
+        ]
+        replayed = 0
+        try:
+            for start in range(0, len(records), self.max_batch_size):
+                batch = records[start : start + self.max_batch_size]
+                replayed += len(batch) - self._write(batch)
+        except Exception:
+            self._append(records[start:])
+            raise
+        finally:
+            claimed.unlink(missing_ok=True)
+            with self._condition:
+                self._stats.replayed += replayed
+        return replayed
+
+    def stats(self) -> dict[str, int]:
+        with self._condition:
+            return {"pending": len(self._pending), **asdict(self._stats)}
+
+    def _write(self, records: list[DatasetInsertRecord]) -> int:
+        """Write ``records``; returns how many the database rejected.
+
+        Transient errors propagate so the caller can retry or spill.
+        """
+        try:
+            self._flush_fn(records)
+            return 0
+        except Exception as exc:
+            if self._is_transient(exc):
+                raise
+            if len(records) == 1:
+                self._reject(records[0], exc)
+                return 1
+            logger.warning("Metadata batch rejected (%s); writing rows one by one", exc)
+
+        rejected = 0
+        for record in records:
+            try:
+                self._flush_fn([record])
+            except Exception as exc:
+                if self._is_transient(exc):
+                    raise
+                self._reject(record, exc)
+                rejected += 1
+        return rejected
+
+    def _reject(self, record: DatasetInsertRecord, exc: Exception) -> None:
+        # The upload already succeeded, so its object is left in storage
+        # without a row; the key is logged for cleanup.
+        logger.error(
+            "Dropping metadata row for %s (object %s): %s",
+            record.dataset_id,
+            record.storage_key_raw,
+            exc,
+        )
+        with self._condition:
+            self._stats.rejected += 1
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="metadata-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and not self._due():
+                    self._condition.wait(self._wait_timeout())
+                if self._closed:
+                    return
+            self.flush()
+
+    def _due(self) -> bool:
+        if not self._pending:
+            return False
+        if self._retry_at is not None:
+            return time.monotonic() >= self._retry_at
+        if len(self._pending) >= self.max_batch_size:
+            return True
+        return time.monotonic() - self._oldest_at >= self.flush_interval
+
+    def _wait_timeout(self) -> float | None:
+        if not self._pending:
+            return None
+        deadline = (
+            self._retry_at
+            if self._retry_at is not None
+            else self._oldest_at + self.flush_interval
+        )
+        return max(deadline - time.monotonic(), 0.001)
+
+    def _append(self, records: list[DatasetInsertRecord]) -> None:
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.spill_path.open("a", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(asdict(record), default=str) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from app.core.config import DATABASE_URL, METASTORE_SQLITE_PATH
+from app.services.metastore_service import MetastoreService
+from app.services.sqlite_metastore_service import SQLiteMetastoreService
+
+
+def build_metastore_service(
+    database_url: str | None = DATABASE_URL,
+) -> MetastoreService | SQLiteMetastoreService:
+    """Postgres when a database URL is configured, embedded SQLite otherwise."""
+    if database_url:
+        return MetastoreService(database_url=database_url)
+    return SQLiteMetastoreService(path=METASTORE_SQLITE_PATH)
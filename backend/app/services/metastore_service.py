@@ -1,10 +1,206 @@
 from __future__ import annotations
 
 import json
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 
 import psycopg2
+from psycopg2.extras import execute_values
+
+from app.core.config import (
+    DESCRIPTOR_CACHE_MAX_ENTRIES,
+    DESCRIPTOR_CACHE_TTL_SECONDS,
+    METASTORE_WRITE_BEHIND_BATCH_SIZE,
+    METASTORE_WRITE_BEHIND_ENABLED,
+    METASTORE_WRITE_BEHIND_FLUSH_MS,
+    METASTORE_WRITE_BEHIND_MAX_QUEUE,
+    METASTORE_WRITE_BEHIND_SPILL_PATH,
+)
+from app.services.dataset_cache import TTLCache
+from app.services.db_pool import PostgresConnectionPool, get_shared_pool
+from app.services.metadata_write_behind import MetadataWriteBehind
+from app.services.single_flight import SingleFlight
+
+
+INSERT_DATASET_COLUMNS = """
+    INSERT INTO public.datasets (
+        dataset_id,
+        parse_status,
+        session_id,
+        original_filename,
+        extension,
+        mime_type,
+        size_bytes,
+        row_count,
+        column_count,
+        schema_json,
+        storage_key_raw,
+        profile_json
+    )
+"""
+
+INSERT_DATASET_VALUES = """
+    (
+        %s,
+        %s::public.dataset_parse_status,
+        %s,
+        %s,
+        %s,
+        %s,
+        %s,
+        %s,
+        %s,
+        %s::jsonb,
+        %s,
+        %s::jsonb
+    )
+"""
+
+INSERT_DATASET_QUERY = INSERT_DATASET_COLUMNS + "VALUES" + INSERT_DATASET_VALUES
+
+# Batches come from the write-behind queue, whose rows carry the time they
+# were accepted; replayed spill files may repeat rows that made it in before
+# a crash.
+INSERT_DATASET_BATCH_QUERY = """
+    INSERT INTO public.datasets (
+        dataset_id,
+        parse_status,
+        session_id,
+        original_filename,
+        extension,
+        mime_type,
+        size_bytes,
+        row_count,
+        column_count,
+        schema_json,
+        storage_key_raw,
+        profile_json,
+        created_at,
+        updated_at
+    )
+    VALUES %s
+    ON CONFLICT (dataset_id) DO NOTHING
+"""
+
+INSERT_DATASET_BATCH_VALUES = """
+    (
+        %s,
+        %s::public.dataset_parse_status,
+        %s,
+        %s,
+        %s,
+        %s,
+        %s,
+        %s,
+        %s,
+        %s::jsonb,
+        %s,
+        %s::jsonb,
+        COALESCE(%s::timestamptz, now()),
+        COALESCE(%s::timestamptz, now())
+    )
+"""
+
+DATASET_DESCRIPTOR_QUERY = """
+    SELECT
+        dataset_id,
+        parse_status::text,
+        session_id,
+        original_filename,
+        extension,
+        mime_type,
+        size_bytes,
+        COALESCE(row_count, 0),
+        COALESCE(column_count, 0),
+        created_at,
+        updated_at,
+        COALESCE(schema_json, '[]'::jsonb),
+        storage_key_raw
+    FROM public.datasets
+    WHERE dataset_id = %s
+"""
+
+SESSION_DATASETS_COLUMNS = """
+    SELECT
+        dataset_id,
+        parse_status::text,
+        session_id,
+        original_filename,
+        extension,
+        mime_type,
+        size_bytes,
+        COALESCE(row_count, 0),
+        COALESCE(column_count, 0),
+        created_at,
+        updated_at
+    FROM public.datasets
+"""
+
+# Keyset pagination, newest first. Both variants walk
+# datasets_session_id_created_at_idx and stop after LIMIT rows.
+SESSION_DATASETS_QUERY = SESSION_DATASETS_COLUMNS + """
+    WHERE session_id = %s
+    ORDER BY created_at DESC, dataset_id DESC
+    LIMIT %s
+"""
+
+SESSION_DATASETS_AFTER_QUERY = SESSION_DATASETS_COLUMNS + """
+    WHERE session_id = %s
+      AND (created_at, dataset_id) < (%s, %s)
+    ORDER BY created_at DESC, dataset_id DESC
+    LIMIT %s
+"""
+
+DATASET_PROFILE_QUERY = """
+    SELECT
+        dataset_id,
+        profile_json
+    FROM public.datasets
+    WHERE dataset_id = %s
+"""
+
+DELETE_DATASET_QUERY = """
+    DELETE FROM public.datasets
+    WHERE dataset_id = %s
+"""
+
+DELETE_DATASETS_QUERY = """
+    DELETE FROM public.datasets
+    WHERE dataset_id = ANY(%s)
+    RETURNING dataset_id
+"""
+
+DATASET_OWNERS_QUERY = """
+    SELECT
+        dataset_id,
+        session_id,
+        storage_key_raw
+    FROM public.datasets
+    WHERE dataset_id = ANY(%s)
+"""
+
+EXPIRED_DATASETS_COLUMNS = """
+    SELECT
+        dataset_id,
+        storage_key_raw,
+        created_at
+    FROM public.datasets
+"""
+
+# Keyset pagination, oldest first through datasets_created_at_idx.
+EXPIRED_DATASETS_QUERY = EXPIRED_DATASETS_COLUMNS + """
+    WHERE created_at < %s
+    ORDER BY created_at, dataset_id
+    LIMIT %s
+"""
+
+EXPIRED_DATASETS_AFTER_QUERY = EXPIRED_DATASETS_COLUMNS + """
+    WHERE created_at < %s
+      AND (created_at, dataset_id) > (%s, %s)
+    ORDER BY created_at, dataset_id
+    LIMIT %s
+"""
 
 
 @dataclass
@@ -20,6 +216,29 @@ class DatasetInsertRecord:
     column_count: int
     schema_json: list[dict[str, str | int]]
     storage_key_raw: str
+    profile_json: dict[str, object] | None = None
+    created_at: datetime | None = None
+
+    def __post_init__(self) -> None:
+        # Spilled records come back from JSON with the timestamp as text.
+        if isinstance(self.created_at, str):
+            self.created_at = datetime.fromisoformat(self.created_at)
+
+    def to_params(self) -> tuple[object, ...]:
+        return (
+            self.dataset_id,
+            self.parse_status,
+            self.session_id,
+            self.original_filename,
+            self.extension,
+            self.mime_type,
+            self.size_bytes,
+            self.row_count,
+            self.column_count,
+            json.dumps(self.schema_json),
+            self.storage_key_raw,
+            json.dumps(self.profile_json) if self.profile_json is not None else None,
+        )
 
 
 @dataclass
@@ -36,11 +255,34 @@ class DatasetMetadataRecord:
     created_at: datetime
     updated_at: datetime
 
+    @classmethod
+    def from_row(cls, row: tuple) -> DatasetMetadataRecord:
+        return cls(
+            dataset_id=row[0],
+            parse_status=row[1],
+            session_id=row[2],
+            original_filename=row[3],
+            extension=row[4],
+            mime_type=row[5],
+            size_bytes=int(row[6]),
+            row_count=int(row[7]),
+            column_count=int(row[8]),
+            created_at=row[9],
+            updated_at=row[10],
+        )
+
 
 @dataclass
 class DatasetSchemaRecord:
     dataset_id: str
     schema_json: list[dict[str, str | int]]
+    parse_status: str
+
+
+@dataclass
+class DatasetProfileRecord:
+    dataset_id: str
+    profile_json: dict[str, object] | None
 
 
 @dataclass
@@ -48,93 +290,60 @@ class DatasetPreviewSourceRecord:
     dataset_id: str
     extension: str
     storage_key_raw: str
+    parse_status: str
 
 
-class MetastoreService:
-    def __init__(self, *, database_url: str | None) -> None:
-        self.database_url = database_url
-
-    def insert_dataset_metadata(self, record: DatasetInsertRecord) -> None:
-        if not self.database_url:
-            raise RuntimeError("DATABASE_URL is not configured")
+@dataclass
+class DatasetOwnerRecord:
+    dataset_id: str
+    session_id: str | None
+    storage_key_raw: str
 
-        query = """
-            INSERT INTO public.datasets (
-                dataset_id,
-                parse_status,
-                session_id,
-                original_filename,
-                extension,
-                mime_type,
-                size_bytes,
-                row_count,
-                column_count,
-                schema_json,
-                storage_key_raw
-            )
-            VALUES (
-                %s,
-                %s::public.dataset_parse_status,
-                %s,
-                %s,
-                %s,
-                %s,
-                %s,
-                %s,
-                %s,
-                %s::jsonb,
-                %s
-            )
-        """
 
-        with psycopg2.connect(self.database_url) as connection:
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    query,
-                    (
-                        record.dataset_id,
-                        record.parse_status,
-                        record.session_id,
-                        record.original_filename,
-                        record.extension,
-                        record.mime_type,
-                        record.size_bytes,
-                        record.row_count,
-                        record.column_count,
-                        json.dumps(record.schema_json),
-                        record.storage_key_raw,
-                    ),
-                )
+@dataclass
+class ExpiredDatasetRecord:
+    dataset_id: str
+    storage_key_raw: str
+    created_at: datetime
 
-    def get_dataset_metadata(self, dataset_id: str) -> DatasetMetadataRecord | None:
-        if not self.database_url:
-            raise RuntimeError("DATABASE_URL is not configured")
 
-        query = """
-            SELECT
-                dataset_id,
-                parse_status::text,
-                session_id,
-                original_filename,
-                extension,
-                mime_type,
-                size_bytes,
-                COALESCE(row_count, 0),
-                COALESCE(column_count, 0),
-                created_at,
-                updated_at
-            FROM public.datasets
-            WHERE dataset_id = %s
-        """
+@dataclass
+class DatasetDescriptorRecord:
+    dataset_id: str
+    parse_status: str
+    session_id: str | None
+    original_filename: str
+    extension: str
+    mime_type: str
+    size_bytes: int
+    row_count: int
+    column_count: int
+    created_at: datetime
+    updated_at: datetime
+    schema_json: list[dict[str, str | int]]
+    storage_key_raw: str
 
-        with psycopg2.connect(self.database_url) as connection:
-            with connection.cursor() as cursor:
-                cursor.execute(query, (dataset_id,))
-                row = cursor.fetchone()
-                if row is None:
-                    return None
+    @classmethod
+    def from_insert_record(cls, record: DatasetInsertRecord) -> DatasetDescriptorRecord:
+        return cls(
+            dataset_id=record.dataset_id,
+            parse_status=record.parse_status,
+            session_id=record.session_id,
+            original_filename=record.original_filename,
+            extension=record.extension,
+            mime_type=record.mime_type,
+            size_bytes=record.size_bytes,
+            row_count=record.row_count,
+            column_count=record.column_count,
+            created_at=record.created_at,
+            updated_at=record.created_at,
+            schema_json=record.schema_json,
+            storage_key_raw=record.storage_key_raw,
+        )
 
-        return DatasetMetadataRecord(
+    @classmethod
+    def from_row(cls, row: tuple) -> DatasetDescriptorRecord:
+        return cls(
             dataset_id=row[0],
             parse_status=row[1],
             session_id=row[2],
@@ -146,72 +355,375 @@ class MetastoreService:
             column_count=int(row[8]),
             created_at=row[9],
             updated_at=row[10],
+            schema_json=row[11],
+            storage_key_raw=row[12],
         )
 
-    def get_dataset_schema(self, dataset_id: str) -> DatasetSchemaRecord | None:
+    def to_metadata_record(self) -> DatasetMetadataRecord:
+        return DatasetMetadataRecord(
+            dataset_id=self.dataset_id,
+            parse_status=self.parse_status,
+            session_id=self.session_id,
+            original_filename=self.original_filename,
+            extension=self.extension,
+            mime_type=self.mime_type,
+            size_bytes=self.size_bytes,
+            row_count=self.row_count,
+            column_count=self.column_count,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+    def to_schema_record(self) -> DatasetSchemaRecord:
+        return DatasetSchemaRecord(
+            dataset_id=self.dataset_id,
+            schema_json=self.schema_json,
+            parse_status=self.parse_status,
+        )
+
+    def to_preview_source_record(self) -> DatasetPreviewSourceRecord:
+        return DatasetPreviewSourceRecord(
+            dataset_id=self.dataset_id,
+            extension=self.extension,
+            storage_key_raw=self.storage_key_raw,
+            parse_status=self.parse_status,
+        )
+
+
+def build_descriptor_cache() -> TTLCache[DatasetDescriptorRecord]:
+    return TTLCache(
+        ttl_seconds=DESCRIPTOR_CACHE_TTL_SECONDS,
+        max_entries=DESCRIPTOR_CACHE_MAX_ENTRIES,
+    )
+
+
+def is_transient_metastore_error(exc: Exception) -> bool:
+    """Whether retrying the same statement later could succeed.
+
+    Database errors other than lost connections (constraint or data errors)
+    fail the same way every time; anything else is assumed to be an outage.
+    """
+    if isinstance(exc, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+        return True
+    return not isinstance(exc, psycopg2.Error)
+
+
+_shared_write_behinds: dict[str, MetadataWriteBehind] = {}
+_shared_write_behinds_lock = threading.Lock()
+
+
+def get_shared_write_behind(database_url: str) -> MetadataWriteBehind:
+    """Process-wide insert queue per database URL, configured from settings."""
+    with _shared_write_behinds_lock:
+        write_behind = _shared_write_behinds.get(database_url)
+        if write_behind is None:
+            writer = MetastoreService(database_url=database_url, write_behind_enabled=False)
+            write_behind = MetadataWriteBehind(
+                writer.insert_dataset_metadata_batch,
+                record_type=DatasetInsertRecord,
+                max_batch_size=METASTORE_WRITE_BEHIND_BATCH_SIZE,
+                max_queue_size=METASTORE_WRITE_BEHIND_MAX_QUEUE,
+                flush_interval=METASTORE_WRITE_BEHIND_FLUSH_MS / 1000,
+                spill_path=METASTORE_WRITE_BEHIND_SPILL_PATH,
+                is_transient=is_transient_metastore_error,
+            )
+            _shared_write_behinds[database_url] = write_behind
+        return write_behind
+
+
+def close_shared_write_behinds() -> None:
+    """Flush queued inserts, spilling whatever the database will not take."""
+    with _shared_write_behinds_lock:
+        write_behinds = list(_shared_write_behinds.values())
+        _shared_write_behinds.clear()
+    for write_behind in write_behinds:
+        write_behind.close()
+
+
+class MetastoreService:
+    def __init__(
+        self,
+        *,
+        database_url: str | None,
+        pool: PostgresConnectionPool | None = None,
+        descriptor_cache: TTLCache[DatasetDescriptorRecord] | None = None,
+        write_behind: MetadataWriteBehind | None = None,
+        write_behind_enabled: bool = METASTORE_WRITE_BEHIND_ENABLED,
+    ) -> None:
+        self.database_url = database_url
+        self._pool = pool
+        self.descriptor_cache = descriptor_cache or build_descriptor_cache()
+        # Metadata, schema and preview reads all come down to the descriptor,
+        # so a burst of them for one dataset shares one query.
+        self.descriptor_flight = SingleFlight()
+        if write_behind is None and write_behind_enabled and database_url:
+            write_behind = get_shared_write_behind(database_url)
+        self.write_behind = write_behind
+
+    @property
+    def pool(self) -> PostgresConnectionPool:
+        # Services built per request share one pool per database URL.
+        if self._pool is None:
+            self._pool = get_shared_pool(self.database_url)
+        return self._pool
+
+    def pool_stats(self) -> dict[str, int | float] | None:
+        if self._pool is None:
+            return None
+        return self._pool.stats()
+
+    def write_behind_stats(self) -> dict[str, int] | None:
+        if self.write_behind is None:
+            return None
+        return self.write_behind.stats()
+
+    def warm_up(self) -> None:
+        """Open the pool's minimum connections before the first request."""
+        if not self.database_url:
+            return
+        with self.pool.connection():
+            pass
+
+    def insert_dataset_metadata(self, record: DatasetInsertRecord) -> None:
         if not self.database_url:
             raise RuntimeError("DATABASE_URL is not configured")
 
-        query = """
-            SELECT
-                dataset_id,
-                COALESCE(schema_json, '[]'::jsonb)
-            FROM public.datasets
-            WHERE dataset_id = %s
-        """
+        if self.queue_dataset_metadata(record):
+            return
+
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(INSERT_DATASET_QUERY, record.to_params())
+
+    def queue_dataset_metadata(self, record: DatasetInsertRecord) -> bool:
+        """Hand ``record`` to the write-behind queue without touching the
+        network. Returns ``False`` when there is no queue or it is full."""
+        return self.write_behind is not None and self.write_behind.submit(record)
+
+    def insert_dataset_metadata_batch(self, records: list[DatasetInsertRecord]) -> None:
+        """Insert many rows with one statement in one transaction."""
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not configured")
+        if not records:
+            return
 
-        with psycopg2.connect(self.database_url) as connection:
+        with self.pool.connection() as connection:
             with connection.cursor() as cursor:
-                cursor.execute(query, (dataset_id,))
+                execute_values(
+                    cursor,
+                    INSERT_DATASET_BATCH_QUERY,
+                    [
+                        (*record.to_params(), record.created_at, record.created_at)
+                        for record in records
+                    ],
+                    template=INSERT_DATASET_BATCH_VALUES,
+                    page_size=len(records),
+                )
+
+    def get_dataset_profile(self, dataset_id: str) -> DatasetProfileRecord | None:
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not configured")
+
+        if self.write_behind is not None:
+            pending = self.write_behind.pending(dataset_id)
+            if pending is not None:
+                return DatasetProfileRecord(
+                    dataset_id=pending.dataset_id, profile_json=pending.profile_json
+                )
+
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(DATASET_PROFILE_QUERY, (dataset_id,))
                 row = cursor.fetchone()
                 if row is None:
                     return None
 
-        return DatasetSchemaRecord(
+        return DatasetProfileRecord(
             dataset_id=row[0],
-            schema_json=row[1],
+            profile_json=row[1],
         )
 
+    def get_dataset_descriptor(self, dataset_id: str) -> DatasetDescriptorRecord | None:
+        """Everything the API needs about a dataset except its profile.
+
+        Served from a per-process TTL cache; a miss costs one query, shared
+        by every concurrent miss for the same dataset.
+        """
+        descriptor = self.descriptor_cache.get(dataset_id)
+        if descriptor is not None:
+            return descriptor
+
+        return self.descriptor_flight.do(
+            ("descriptor", dataset_id), lambda: self._load_dataset_descriptor(dataset_id)
+        )
+
+    def get_dataset_metadata(self, dataset_id: str) -> DatasetMetadataRecord | None:
+        descriptor = self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_metadata_record() if descriptor is not None else None
+
+    def get_dataset_schema(self, dataset_id: str) -> DatasetSchemaRecord | None:
+        descriptor = self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_schema_record() if descriptor is not None else None
+
     def get_dataset_preview_source(
         self, dataset_id: str
     ) -> DatasetPreviewSourceRecord | None:
-        if not self.database_url:
-            raise RuntimeError("DATABASE_URL is not configured")
+        descriptor = self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_preview_source_record() if descriptor is not None else None
+
+    def list_session_datasets(
+        self,
+        session_id: str,
+        *,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[DatasetMetadataRecord]:
+        """One page of a session's datasets, newest first.
 
-        query = """
-            SELECT
-                dataset_id,
-                extension,
-                storage_key_raw
-            FROM public.datasets
-            WHERE dataset_id = %s
+        ``after`` is the ``(created_at, dataset_id)`` of the last row of the
+        previous page. Only the light columns are read, never the JSON ones.
         """
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not configured")
 
-        with psycopg2.connect(self.database_url) as connection:
+        with self.pool.connection() as connection:
             with connection.cursor() as cursor:
-                cursor.execute(query, (dataset_id,))
-                row = cursor.fetchone()
-                if row is None:
-                    return None
+                if after is None:
+                    cursor.execute(SESSION_DATASETS_QUERY, (session_id, limit))
+                else:
+                    cursor.execute(
+                        SESSION_DATASETS_AFTER_QUERY, (session_id, after[0], after[1], limit)
+                    )
+                rows = cursor.fetchall()
 
-        return DatasetPreviewSourceRecord(
-            dataset_id=row[0],
-            extension=row[1],
-            storage_key_raw=row[2],
-        )
+        records = [DatasetMetadataRecord.from_row(row) for row in rows]
+        if self.write_behind is None:
+            return records
+
+        # Queued rows are the newest ones; merge them in so a session sees
+        # its own uploads before they are flushed.
+        listed = {record.dataset_id for record in records}
+        for pending in self.write_behind.pending_for_session(session_id):
+            if pending.dataset_id in listed:
+                continue
+            if after is not None and (pending.created_at, pending.dataset_id) >= after:
+                continue
+            records.append(
+                DatasetDescriptorRecord.from_insert_record(pending).to_metadata_record()
+            )
+        records.sort(key=lambda record: (record.created_at, record.dataset_id), reverse=True)
+        return records[:limit]
 
     def delete_dataset_metadata(self, dataset_id: str) -> bool:
         if not self.database_url:
             raise RuntimeError("DATABASE_URL is not configured")
 
-        query = """
-            DELETE FROM public.datasets
-            WHERE dataset_id = %s
+        discarded = self.write_behind is not None and self.write_behind.discard(dataset_id)
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(DELETE_DATASET_QUERY, (dataset_id,))
+                deleted_count = cursor.rowcount
+
+        self.descriptor_cache.invalidate(dataset_id)
+        return discarded or deleted_count > 0
+
+    def delete_datasets_metadata(self, dataset_ids: list[str]) -> list[str]:
+        """Delete many rows with one statement; returns the ids that existed."""
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not configured")
+        if not dataset_ids:
+            return []
+
+        discarded = []
+        if self.write_behind is not None:
+            discarded = [
+                dataset_id for dataset_id in dataset_ids if self.write_behind.discard(dataset_id)
+            ]
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(DELETE_DATASETS_QUERY, (list(dataset_ids),))
+                deleted = [row[0] for row in cursor.fetchall()]
+
+        for dataset_id in dataset_ids:
+            self.descriptor_cache.invalidate(dataset_id)
+        return list(dict.fromkeys(discarded + deleted))
+
+    def get_dataset_owners(self, dataset_ids: list[str]) -> dict[str, DatasetOwnerRecord]:
+        """Owner and raw object key of each existing dataset, in one query."""
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not configured")
+        if not dataset_ids:
+            return {}
+
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(DATASET_OWNERS_QUERY, (list(dataset_ids),))
+                rows = cursor.fetchall()
+
+        owners = {
+            row[0]: DatasetOwnerRecord(dataset_id=row[0], session_id=row[1], storage_key_raw=row[2])
+            for row in rows
+        }
+        if self.write_behind is not None:
+            for dataset_id in dataset_ids:
+                pending = self.write_behind.pending(dataset_id)
+                if pending is not None and dataset_id not in owners:
+                    owners[dataset_id] = DatasetOwnerRecord(
+                        dataset_id=dataset_id,
+                        session_id=pending.session_id,
+                        storage_key_raw=pending.storage_key_raw,
+                    )
+        return owners
+
+    def list_expired_datasets(
+        self,
+        cutoff: datetime,
+        *,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[ExpiredDatasetRecord]:
+        """Up to ``limit`` datasets created before ``cutoff``, oldest first.
+
+        ``after`` is the ``(created_at, dataset_id)`` of the last row already
+        seen; rows up to it are skipped.
         """
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not configured")
 
-        with psycopg2.connect(self.database_url) as connection:
+        with self.pool.connection() as connection:
             with connection.cursor() as cursor:
-                cursor.execute(query, (dataset_id,))
-                deleted_count = cursor.rowcount
+                if after is None:
+                    cursor.execute(EXPIRED_DATASETS_QUERY, (cutoff, limit))
+                else:
+                    cursor.execute(
+                        EXPIRED_DATASETS_AFTER_QUERY, (cutoff, after[0], after[1], limit)
+                    )
+                rows = cursor.fetchall()
+
+        return [
+            ExpiredDatasetRecord(dataset_id=row[0], storage_key_raw=row[1], created_at=row[2])
+            for row in rows
+        ]
+
+    def _load_dataset_descriptor(self, dataset_id: str) -> DatasetDescriptorRecord | None:
+        descriptor = self._fetch_dataset_descriptor(dataset_id)
+        if descriptor is not None:
+            self.descriptor_cache.put(dataset_id, descriptor)
+        return descriptor
+
+    def _fetch_dataset_descriptor(self, dataset_id: str) -> DatasetDescriptorRecord | None:
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not configured")
+
+        # Read-your-writes: a queued insert is answered from the queue.
+        if self.write_behind is not None:
+            pending = self.write_behind.pending(dataset_id)
+            if pending is not None:
+                return DatasetDescriptorRecord.from_insert_record(pending)
+
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(DATASET_DESCRIPTOR_QUERY, (dataset_id,))
+                row = cursor.fetchone()
 
-        return deleted_count > 0
+        return DatasetDescriptorRecord.from_row(row) if row is not None else None
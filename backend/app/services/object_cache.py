@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+
+_ETAG_TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9-]{1,128}$")
+_ENTRY_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass
+class ObjectCacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    bytes_saved: int = 0
+
+
+@dataclass
+class _IndexEntry:
+    path: Path
+    etag_token: str
+    size: int
+    atime: float
+
+
+class DiskObjectCache:
+    """LRU byte cache on local disk, safe to share between uvicorn workers.
+
+    Each entry is one file named after the object key, holding the ETag on
+    its first line and the bytes after it, so a changed object never matches
+    a stale entry. The directory is scanned once at startup into an in-memory
+    index (least recently used first) that ``put``, ``get`` and eviction keep
+    current; no later call lists the directory. An entry another worker wrote
+    is found by opening its file and joins the index then. Each worker evicts
+    only the entries in its own index, so ``max_bytes`` is a per-worker
+    budget: workers sharing ``root`` can together keep up to
+    ``workers * max_bytes`` on disk.
+    """
+
+    def __init__(self, *, root: str | Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._stats = ObjectCacheStats()
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, _IndexEntry] = OrderedDict()
+        self._size_bytes = 0
+        self._index_lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def lookup_etag(self, *, key: str) -> str | None:
+        digest = self._key_digest(key)
+        with self._index_lock:
+            entry = self._index.get(digest)
+        if entry is None:
+            entry = self._read_entry(digest)
+            if entry is None:
+                return None
+            self._remember(digest, entry)
+        return f'"{entry.etag_token}"'
+
+    def get(self, *, key: str, etag: str) -> bytes | None:
+        token = self._etag_token(etag)
+        if token is None:
+            self._record(misses=1)
+            return None
+
+        digest = self._key_digest(key)
+        path = self.root / digest
+        try:
+            with path.open("rb") as handle:
+                header = handle.readline()
+                if header.rstrip(b"\n").decode("ascii", "replace") != token:
+                    self._record(misses=1)
+                    return None
+                data = handle.read()
+        except FileNotFoundError:
+            self._forget(digest)
+            self._record(misses=1)
+            return None
+
+        self._remember(
+            digest,
+            _IndexEntry(
+                path=path, etag_token=token, size=len(header) + len(data), atime=time.time()
+            ),
+        )
+        self._record(hits=1, bytes_saved=len(data))
+        return data
+
+    def put(self, *, key: str, etag: str, data: bytes) -> None:
+        token = self._etag_token(etag)
+        if token is None or len(data) > self.max_bytes:
+            return
+
+        digest = self._key_digest(key)
+        path = self.root / digest
+        header = f"{token}\n".encode("ascii")
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(header)
+                handle.write(data)
+            # Replacing the key's file drops the previous version with it.
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        self._remember(
+            digest,
+            _IndexEntry(
+                path=path, etag_token=token, size=len(header) + len(data), atime=time.time()
+            ),
+        )
+        self._record(writes=1)
+        self._evict()
+
+    def record_miss(self) -> None:
+        self._record(misses=1)
+
+    def discard(self, *, key: str) -> None:
+        digest = self._key_digest(key)
+        self._forget(digest)
+        (self.root / digest).unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._index_lock:
+            size_bytes = self._size_bytes
+        with self._lock:
+            lookups = self._stats.hits + self._stats.misses
+            return {
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "hit_ratio": (self._stats.hits / lookups) if lookups else 0.0,
+                "writes": self._stats.writes,
+                "evictions": self._stats.evictions,
+                "bytes_saved": self._stats.bytes_saved,
+                "size_bytes": size_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _load_index(self) -> None:
+        found: list[tuple[str, _IndexEntry]] = []
+        # Only files named like an entry are read; anything else in the
+        # directory is left alone.
+        for path in self.root.iterdir():
+            if _ENTRY_NAME_PATTERN.match(path.name):
+                entry = self._read_entry(path.name)
+                if entry is not None:
+                    found.append((path.name, entry))
+
+        for digest, entry in sorted(found, key=lambda item: item[1].atime):
+            self._remember(digest, entry)
+        self._evict()
+
+    def _read_entry(self, digest: str) -> _IndexEntry | None:
+        path = self.root / digest
+        try:
+            with path.open("rb") as handle:
+                token = handle.readline(256).rstrip(b"\n").decode("ascii", "replace")
+                stat = os.fstat(handle.fileno())
+        except FileNotFoundError:
+            return None
+        if not _ETAG_TOKEN_PATTERN.match(token):
+            return None
+        return _IndexEntry(path=path, etag_token=token, size=stat.st_size, atime=stat.st_mtime)
+
+    def _remember(self, digest: str, entry: _IndexEntry) -> None:
+        with self._index_lock:
+            previous = self._index.pop(digest, None)
+            if previous is not None:
+                self._size_bytes -= previous.size
+            self._index[digest] = entry
+            self._size_bytes += entry.size
+
+    def _forget(self, digest: str) -> None:
+        with self._index_lock:
+            entry = self._index.pop(digest, None)
+            if entry is not None:
+                self._size_bytes -= entry.size
+
+    def _evict(self) -> None:
+        evicted: list[Path] = []
+        with self._index_lock:
+            while self._size_bytes > self.max_bytes and self._index:
+                _, entry = self._index.popitem(last=False)
+                self._size_bytes -= entry.size
+                evicted.append(entry.path)
+        for path in evicted:
+            path.unlink(missing_ok=True)
+        if evicted:
+            self._record(evictions=len(evicted))
+
+    def _record(self, **increments: int) -> None:
+        with self._lock:
+            for field_name, amount in increments.items():
+                setattr(self._stats, field_name, getattr(self._stats, field_name) + amount)
+
+    @staticmethod
+    def _etag_token(etag: str) -> str | None:
+        token = etag.strip().strip('"')
+        return token if _ETAG_TOKEN_PATTERN.match(token) else None
+
+    @staticmethod
+    def _key_digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
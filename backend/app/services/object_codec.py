@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import gzip
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+# User metadata key (x-amz-meta-*) naming the codec of a stored object.
+ENCODING_METADATA_KEY = "thinkabit-encoding"
+
+_COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/csv",
+    "application/xml",
+}
+
+
+def resolve_encoding(name: str | None) -> str | None:
+    """Map a configured codec name to one that can be used here.
+
+    ``zstd`` falls back to ``gzip`` when ``zstandard`` is not installed.
+    """
+    normalized = (name or "").strip().lower()
+    if normalized in {"", "none", "off"}:
+        return None
+    if normalized == "zstd":
+        return "zstd" if zstandard is not None else "gzip"
+    if normalized == "gzip":
+        return "gzip"
+    raise ValueError(f"Unsupported object compression: {name!r}")
+
+
+def is_compressible(content_type: str) -> bool:
+    # Spreadsheets are zip archives already; only text formats shrink.
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in _COMPRESSIBLE_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+def compress(data: bytes, encoding: str, *, level: int) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=min(max(level, 1), 9), mtime=0)
+    raise ValueError(f"Unsupported object compression: {encoding!r}")
+
+
+def read_decoded(stream: BinaryIO, encoding: str | None) -> bytes:
+    """Read a whole object body, decompressing while it streams in."""
+    if encoding is None:
+        return stream.read()
+    if encoding == "zstd":
+        with zstandard.ZstdDecompressor().stream_reader(
+            stream, read_across_frames=True, closefd=False
+        ) as reader:
+            return reader.read()
+    if encoding == "gzip":
+        with gzip.GzipFile(fileobj=stream, mode="rb") as reader:
+            return reader.read()
+    raise ValueError(f"Unsupported object encoding: {encoding!r}")
+
+
+def iter_decoded(chunks: Iterable[bytes], encoding: str | None) -> Iterator[bytes]:
+    if encoding is None:
+        yield from chunks
+        return
+    if encoding == "zstd":
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    elif encoding == "gzip":
+        decompressor = zlib.decompressobj(wbits=31)
+    else:
+        raise ValueError(f"Unsupported object encoding: {encoding!r}")
+    for chunk in chunks:
+        decoded = decompressor.decompress(chunk)
+        if decoded:
+            yield decoded
+    tail = decompressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import UTC
+
+import numpy as np
+import pandas as pd
+
+from app.services.sketches import HyperLogLog, KLLSketch, hash_values, hashable_values
+
+
+PROFILE_VERSION = 2
+HISTOGRAM_BINS = 10
+TOP_VALUES = 5
+# Below this many values an exact distinct count is cheaper than it is wrong.
+EXACT_DISTINCT_ROWS = 10_000
+QUANTILES = {"p05": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95}
+# Sketches are built over row chunks of this size and merged, so the
+# hashes of a long column are never all held at once.
+SKETCH_CHUNK_ROWS = 100_000
+
+
+def build_dataset_profile(
+    dataframe: pd.DataFrame, dtypes: Mapping[str, str]
+) -> dict[str, object]:
+    """Summarise every column of ``dataframe`` into a small JSON document.
+
+    ``dtypes`` maps column names to the schema dtypes inferred at upload.
+    The profile is computed once and stored with the dataset, so it has a
+    fixed size per column regardless of the number of rows. Distinct counts
+    and quantiles come from mergeable sketches that are stored alongside.
+    """
+    return {
+        "version": PROFILE_VERSION,
+        "row_count": int(len(dataframe)),
+        "columns": [
+            _profile_column(str(name), dataframe[name], dtypes.get(str(name), "unknown"))
+            for name in dataframe.columns
+        ],
+    }
+
+
+def merge_column_sketches(
+    left: Mapping[str, object], right: Mapping[str, object]
+) -> dict[str, object]:
+    """Merge the ``sketches`` of two profiles of the same column.
+
+    Lets chunked or parallel profiling combine partial results without
+    revisiting rows.
+    """
+    merged: dict[str, object] = {
+        "hll": HyperLogLog.from_json(left["hll"])
+        .merge(HyperLogLog.from_json(right["hll"]))
+        .to_json()
+    }
+    if "kll" in left and "kll" in right:
+        merged["kll"] = (
+            KLLSketch.from_json(left["kll"]).merge(KLLSketch.from_json(right["kll"])).to_json()
+        )
+    elif "kll" in left or "kll" in right:
+        merged["kll"] = left.get("kll") or right.get("kll")
+    return merged
+
+
+def approximate_quantiles(
+    sketches: Mapping[str, object], fractions: list[float]
+) -> list[float] | None:
+    if "kll" not in sketches:
+        return None
+    return KLLSketch.from_json(sketches["kll"]).quantiles(fractions)
+
+
+def _profile_column(name: str, series: pd.Series, dtype: str) -> dict[str, object]:
+    non_null = hashable_values(series.dropna())
+    numeric = dtype in {"int", "float"}
+    sketches: dict[str, object] | None = None
+    for start in range(0, max(len(non_null), 1), SKETCH_CHUNK_ROWS):
+        chunk = _chunk_sketches(non_null.iloc[start : start + SKETCH_CHUNK_ROWS], numeric)
+        sketches = chunk if sketches is None else merge_column_sketches(sketches, chunk)
+    profile: dict[str, object] = {
+        "name": name,
+        "dtype": dtype,
+        "count": int(len(non_null)),
+        "null_count": int(len(series) - len(non_null)),
+        "distinct_count": (
+            int(non_null.nunique())
+            if len(non_null) <= EXACT_DISTINCT_ROWS
+            else min(
+                int(round(HyperLogLog.from_json(sketches["hll"]).estimate())),
+                int(len(non_null)),
+            )
+        ),
+        "min": None,
+        "max": None,
+        "mean": None,
+        "std": None,
+        "quantiles": None,
+        "histogram": None,
+        "top_values": [],
+        "sketches": sketches,
+    }
+    if non_null.empty:
+        return profile
+
+    if numeric:
+        values = non_null.to_numpy(dtype=np.float64)
+        finite = values[np.isfinite(values)]
+        if finite.size:
+            profile["min"] = float(finite.min())
+            profile["max"] = float(finite.max())
+            profile["mean"] = float(finite.mean())
+            profile["std"] = float(finite.std(ddof=1)) if finite.size > 1 else 0.0
+            quantiles = approximate_quantiles(sketches, list(QUANTILES.values()))
+            profile["quantiles"] = {
+                label: float(value) for label, value in zip(QUANTILES, quantiles)
+            }
+            counts, edges = np.histogram(finite, bins=HISTOGRAM_BINS)
+            profile["histogram"] = {
+                "edges": [float(edge) for edge in edges],
+                "counts": [int(count) for count in counts],
+            }
+    elif dtype == "datetime":
+        profile["min"] = _format_timestamp(non_null.min())
+        profile["max"] = _format_timestamp(non_null.max())
+
+    if dtype in {"string", "bool", "int"}:
+        top = non_null.value_counts(sort=True).head(TOP_VALUES)
+        profile["top_values"] = [
+            {"value": _to_json_value(value), "count": int(count)}
+            for value, count in top.items()
+        ]
+    return profile
+
+
+def _chunk_sketches(values: pd.Series, numeric: bool) -> dict[str, object]:
+    hll = HyperLogLog()
+    hll.add_hashes(hash_values(values))
+    sketches: dict[str, object] = {"hll": hll.to_json()}
+    if numeric:
+        kll = KLLSketch()
+        kll.add(values.to_numpy(dtype=np.float64))
+        if kll.count:
+            sketches["kll"] = kll.to_json()
+    return sketches
+
+
+def _format_timestamp(value: pd.Timestamp) -> str:
+    dt = value.to_pydatetime()
+    if dt.tzinfo is None:
+        return dt.isoformat() + "Z"
+    return dt.astimezone(UTC).isoformat().replace("+00:00", "Z")
+
+
+def _to_json_value(value: object) -> object:
+    if isinstance(value, pd.Timestamp):
+        return _format_timestamp(value)
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import (
+    DATASET_EXPIRY_DAYS,
+    EXPIRY_SWEEP_BATCH_SIZE,
+    EXPIRY_SWEEP_ENABLED,
+    EXPIRY_SWEEP_INTERVAL_SECONDS,
+    EXPIRY_SWEEP_MAX_BATCHES_PER_RUN,
+    EXPIRY_SWEEP_MAX_DELETES_PER_SECOND,
+)
+from app.services.db_pool import close_shared_pools
+from app.services.expiry_sweeper import ExpirySweeper
+from app.services.metastore_service import close_shared_write_behinds
+from app.services.storage_service import shutdown_storage_io
+from app.services.upload_service import UploadService
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ServiceContainer:
+    """The app-wide service clients, opened and closed by the app lifespan.
+
+    Building a boto3 client and checking the bucket costs a few round trips,
+    so routes and the chat assistant share these instances instead of
+    constructing services per call.
+    """
+
+    upload_service: UploadService
+    expiry_sweeper: ExpirySweeper
+
+    @property
+    def metastore_service(self):
+        return self.upload_service.metastore_service
+
+    @property
+    def storage_service(self):
+        return self.upload_service.storage_service
+
+    async def startup(self) -> None:
+        await run_in_threadpool(self._warm_up)
+        if EXPIRY_SWEEP_ENABLED:
+            self.expiry_sweeper.start()
+
+    async def shutdown(self) -> None:
+        self.expiry_sweeper.stop()
+        # Flush queued metadata while the pools it writes through are open.
+        close_shared_write_behinds()
+        async_metastore = self.upload_service.async_metastore_service
+        if async_metastore is not None:
+            await async_metastore.close()
+        close_shared_pools()
+        shutdown_storage_io()
+
+    def _warm_up(self) -> None:
+        # A backend that is down must not keep the API from starting; the
+        # first request that needs it reports the error instead.
+        if self.upload_service.storage_enabled:
+            try:
+                self.storage_service.warm_up()
+            except Exception:
+                logger.exception("Warming up the object storage client failed")
+        try:
+            self.metastore_service.warm_up()
+        except Exception:
+            logger.exception("Warming up the metastore failed")
+
+        write_behind = getattr(self.metastore_service, "write_behind", None)
+        if write_behind is not None:
+            try:
+                replayed = write_behind.replay_spill()
+            except Exception:
+                logger.exception("Replaying spilled dataset metadata failed")
+            else:
+                if replayed:
+                    logger.info("Replayed %d spilled dataset metadata rows", replayed)
+
+
+def build_service_container() -> ServiceContainer:
+    upload_service = UploadService()
+    return ServiceContainer(
+        upload_service=upload_service,
+        expiry_sweeper=ExpirySweeper(
+            metastore_service=upload_service.metastore_service,
+            storage_service=upload_service.storage_service,
+            frame_cache=upload_service.frame_cache,
+            storage_enabled=upload_service.storage_enabled,
+            expiry_days=DATASET_EXPIRY_DAYS,
+            batch_size=EXPIRY_SWEEP_BATCH_SIZE,
+            max_batches_per_run=EXPIRY_SWEEP_MAX_BATCHES_PER_RUN,
+            max_deletes_per_second=EXPIRY_SWEEP_MAX_DELETES_PER_SECOND,
+            interval_seconds=EXPIRY_SWEEP_INTERVAL_SECONDS,
+        ),
+    )
+
+
+_container: ServiceContainer | None = None
+_container_lock = threading.Lock()
+
+
+def get_service_container() -> ServiceContainer:
+    """Process-wide container, built on first use by the app lifespan."""
+    global _container
+    with _container_lock:
+        if _container is None:
+            _container = build_service_container()
+        return _container
+
+
+def get_services(request: Request) -> ServiceContainer:
+    """FastAPI dependency for routes; override it to swap the services."""
+    return request.app.state.services
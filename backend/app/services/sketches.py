@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import base64
+import json
+import math
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+HLL_PRECISION = 11
+KLL_K = 200
+_KLL_DECAY = 2 / 3
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """64-bit hashes of the non-null values, stable across processes.
+
+    Object columns must be passed through ``hashable_values`` first.
+    """
+    return pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy(dtype=np.uint64)
+
+
+def hashable_values(series: pd.Series) -> pd.Series:
+    """``series`` with nested objects and arrays replaced by canonical JSON.
+
+    JSON uploads can hold dicts and lists in a cell, which neither hashing
+    nor value counts accept.
+    """
+    if series.dtype != object or not series.map(_is_unhashable).any():
+        return series
+    return series.map(_stringify_unhashable)
+
+
+class HyperLogLog:
+    """Fixed-size distinct-count sketch; merging is a register-wise max."""
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: np.ndarray | None = None) -> None:
+        self.precision = precision
+        self.registers = (
+            registers
+            if registers is not None
+            else np.zeros(1 << precision, dtype=np.uint8)
+        )
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << width) - 1)
+        rank = (width - _bit_length(remainder) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: HyperLogLog) -> HyperLogLog:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision.")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return raw
+
+    def to_json(self) -> dict[str, object]:
+        return {"p": self.precision, "registers": _pack(self.registers.tobytes())}
+
+    @classmethod
+    def from_json(cls, payload: dict[str, object]) -> HyperLogLog:
+        registers = np.frombuffer(_unpack(payload["registers"]), dtype=np.uint8).copy()
+        return cls(int(payload["p"]), registers)
+
+
+class KLLSketch:
+    """Mergeable quantile sketch (Karnin, Lang and Liberty, 2016).
+
+    Level ``h`` holds items of weight ``2**h``; a full level is sorted and
+    every other item is promoted, so the sketch keeps O(k) items and rank
+    error stays around ``1/k`` however many values are added or merged.
+    """
+
+    def __init__(self, k: int = KLL_K, levels: list[np.ndarray] | None = None, count: int = 0) -> None:
+        self.k = k
+        self.levels = levels if levels is not None else [np.empty(0, dtype=np.float64)]
+        self.count = count
+        self._rng = np.random.default_rng(count)
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        # Feeding level 0 a few capacities at a time keeps every level
+        # populated; compacting a huge batch in one go would push it all to
+        # the top level and lose accuracy.
+        batch = 4 * self.k
+        for start in range(0, values.size, batch):
+            chunk = values[start : start + batch]
+            self.levels[0] = np.concatenate([self.levels[0], chunk])
+            self.count += int(chunk.size)
+            self._compress()
+
+    def merge(self, other: KLLSketch) -> KLLSketch:
+        merged = KLLSketch(
+            min(self.k, other.k),
+            [level.copy() for level in self.levels],
+            self.count + other.count,
+        )
+        for height, level in enumerate(other.levels):
+            if height == len(merged.levels):
+                merged.levels.append(np.empty(0, dtype=np.float64))
+            merged.levels[height] = np.concatenate([merged.levels[height], level])
+        merged._compress()
+        return merged
+
+    def quantiles(self, fractions: list[float]) -> list[float]:
+        if self.count == 0:
+            return [math.nan for _ in fractions]
+        if self.exact:
+            return [float(value) for value in np.quantile(self.levels[0], fractions)]
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(level), 1 << height, dtype=np.int64) for height, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        targets = np.asarray(fractions, dtype=np.float64) * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side="left")
+        return [float(items[min(position, len(items) - 1)]) for position in positions]
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "k": self.k,
+            "n": self.count,
+            "levels": [_pack(level.astype("<f8").tobytes()) for level in self.levels],
+        }
+
+    @classmethod
+    def from_json(cls, payload: dict[str, object]) -> KLLSketch:
+        levels = [
+            np.frombuffer(_unpack(level), dtype="<f8").astype(np.float64)
+            for level in payload["levels"]
+        ]
+        return cls(int(payload["k"]), levels or None, int(payload["n"]))
+
+    def _capacity(self, height: int) -> int:
+        depth = len(self.levels) - height - 1
+        return max(2, int(math.ceil(self.k * _KLL_DECAY**depth)))
+
+    def _compress(self) -> None:
+        height = 0
+        while height < len(self.levels):
+            level = self.levels[height]
+            if len(level) < self._capacity(height):
+                height += 1
+                continue
+            if height + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            level = np.sort(level)
+            # An odd item stays behind so the total weight is preserved.
+            keep, level = level[: len(level) % 2], level[len(level) % 2 :]
+            promoted = level[int(self._rng.integers(2)) :: 2]
+            self.levels[height] = keep
+            self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+            # Capacities shrink as the sketch grows taller, so start over.
+            height = 0
+
+
+def _is_unhashable(value: object) -> bool:
+    return isinstance(value, (dict, list, set))
+
+
+def _stringify_unhashable(value: object) -> object:
+    if isinstance(value, set):
+        value = sorted(value, key=str)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        wide = values >= np.uint64(1 << shift)
+        values[wide] >>= np.uint64(shift)
+        lengths[wide] += shift
+    return lengths + (values > 0)
+
+
+def _pack(raw: bytes) -> str:
+    return base64.b64encode(zlib.compress(raw)).decode("ascii")
+
+
+def _unpack(encoded: object) -> bytes:
+    return zlib.decompress(base64.b64decode(str(encoded)))
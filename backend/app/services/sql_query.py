@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import re
+import threading
+from uuid import uuid4
+
+import duckdb
+
+from app.core.config import SQL_QUERY_MEMORY_LIMIT_MB
+from app.errors import APIError
+from app.services.dataset_cache import CachedDataset
+
+
+TABLE_NAME = "dataset"
+# Queries may only read the registered frame: no files, no network, no
+# extensions, bounded memory, and the settings that enforce this cannot be
+# changed.
+_DATABASE_CONFIG = {
+    "enable_external_access": False,
+    "memory_limit": f"{SQL_QUERY_MEMORY_LIMIT_MB}MB",
+    "autoinstall_known_extensions": False,
+    "autoload_known_extensions": False,
+    "lock_configuration": True,
+}
+_QUERY_KEYWORDS = {"select", "with", "from", "values"}
+_LEADING_KEYWORD = re.compile(r"^(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/|\()*(\w+)", re.DOTALL)
+
+_database: duckdb.DuckDBPyConnection | None = None
+_database_lock = threading.Lock()
+
+
+def _shared_database() -> duckdb.DuckDBPyConnection:
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = duckdb.connect(":memory:", config=_DATABASE_CONFIG)
+        return _database
+
+
+def run_query(
+    dataset: CachedDataset,
+    sql: str,
+    *,
+    max_rows: int,
+    timeout_ms: int,
+) -> tuple[list[str], list[tuple[object, ...]], bool]:
+    """Run one read-only ``SELECT`` against the dataset as table ``dataset``.
+
+    The cached frame is registered as a view and scanned in place by DuckDB's
+    vectorized engine, so nothing is copied. Returns the result column
+    names, at most ``max_rows`` rows and whether more rows were available.
+    """
+    _require_select(sql)
+    # Each query gets its own connection to the shared database; the view
+    # is local to it, so concurrent queries never see each other's frames.
+    connection = _shared_database().cursor()
+    timer = threading.Timer(timeout_ms / 1000, connection.interrupt)
+    try:
+        connection.register(TABLE_NAME, dataset.dataframe)
+        timer.start()
+        try:
+            cursor = connection.execute(sql)
+            rows = cursor.fetchmany(max_rows + 1)
+            description = cursor.description
+        finally:
+            timer.cancel()
+    except duckdb.InterruptException as exc:
+        raise APIError(
+            status_code=408,
+            code="QUERY_TIMEOUT",
+            message=f"Query exceeded the {timeout_ms} ms time limit.",
+            details={"timeout_ms": timeout_ms},
+            request_id=f"req_{uuid4().hex[:8]}",
+        ) from exc
+    except duckdb.Error as exc:
+        raise _build_error(exc) from exc
+    finally:
+        connection.close()
+
+    if description is None:
+        raise _build_error("Only SELECT statements are supported.")
+    columns = [column[0] for column in description]
+    values = [tuple(_to_json_value(value) for value in row) for row in rows[:max_rows]]
+    return columns, values, len(rows) > max_rows
+
+
+def _require_select(sql: str) -> None:
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error as exc:
+        raise _build_error(exc) from exc
+    if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+        raise _build_error("Only a single SELECT statement is supported.")
+    # DuckDB parses PRAGMA and SHOW into SELECTs over its catalog.
+    match = _LEADING_KEYWORD.match(sql)
+    if match is None or match.group(1).lower() not in _QUERY_KEYWORDS:
+        raise _build_error("Only a single SELECT statement is supported.")
+
+
+def _to_json_value(value: object) -> object:
+    # BLOBs are not valid JSON text; render them the way DuckDB casts a
+    # BLOB to VARCHAR. Other DuckDB values serialize as they are.
+    if isinstance(value, bytes):
+        return "".join(
+            chr(byte) if 0x20 <= byte < 0x7F and byte != 0x5C else f"\\x{byte:02X}"
+            for byte in value
+        )
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {_to_json_value(key): _to_json_value(item) for key, item in value.items()}
+    return value
+
+
+def _build_error(reason: Exception | str) -> APIError:
+    return APIError(
+        status_code=400,
+        code="INVALID_QUERY",
+        message="Query could not be executed. Only a single read-only SELECT is allowed.",
+        details={"reason": str(reason)[:200], "table": TABLE_NAME},
+        request_id=f"req_{uuid4().hex[:8]}",
+    )
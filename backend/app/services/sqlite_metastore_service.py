@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+
+from app.services.dataset_cache import TTLCache
+from app.services.metastore_service import (
+    DatasetDescriptorRecord,
+    DatasetInsertRecord,
+    DatasetMetadataRecord,
+    DatasetOwnerRecord,
+    DatasetPreviewSourceRecord,
+    DatasetProfileRecord,
+    DatasetSchemaRecord,
+    ExpiredDatasetRecord,
+    build_descriptor_cache,
+)
+from app.services.single_flight import SingleFlight
+
+
+# Timestamps are stored as fixed-width UTC ISO strings, so text order is
+# time order and the created_at indexes serve range scans and sorts.
+SCHEMA_SCRIPT = """
+    CREATE TABLE IF NOT EXISTS datasets (
+        dataset_id TEXT PRIMARY KEY CHECK (dataset_id LIKE 'ds_%'),
+        parse_status TEXT NOT NULL DEFAULT 'uploaded'
+            CHECK (parse_status IN ('uploaded', 'parsing', 'ready', 'failed')),
+        session_id TEXT,
+        original_filename TEXT NOT NULL,
+        extension TEXT NOT NULL,
+        mime_type TEXT NOT NULL,
+        size_bytes INTEGER NOT NULL CHECK (size_bytes >= 0),
+        row_count INTEGER,
+        column_count INTEGER,
+        schema_json TEXT NOT NULL DEFAULT '[]' CHECK (json_valid(schema_json)),
+        storage_key_raw TEXT NOT NULL,
+        profile_json TEXT CHECK (profile_json IS NULL OR json_valid(profile_json)),
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS datasets_session_id_created_at_idx
+        ON datasets (session_id, created_at DESC, dataset_id DESC);
+
+    CREATE INDEX IF NOT EXISTS datasets_created_at_idx
+        ON datasets (created_at);
+"""
+
+INSERT_DATASET_QUERY = """
+    INSERT INTO datasets (
+        dataset_id,
+        parse_status,
+        session_id,
+        original_filename,
+        extension,
+        mime_type,
+        size_bytes,
+        row_count,
+        column_count,
+        schema_json,
+        storage_key_raw,
+        profile_json,
+        created_at,
+        updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_DATASET_BATCH_QUERY = INSERT_DATASET_QUERY.replace(
+    "INSERT INTO", "INSERT OR IGNORE INTO"
+)
+
+DATASET_DESCRIPTOR_QUERY = """
+    SELECT
+        dataset_id,
+        parse_status,
+        session_id,
+        original_filename,
+        extension,
+        mime_type,
+        size_bytes,
+        COALESCE(row_count, 0),
+        COALESCE(column_count, 0),
+        created_at,
+        updated_at,
+        schema_json,
+        storage_key_raw
+    FROM datasets
+    WHERE dataset_id = ?
+"""
+
+SESSION_DATASETS_COLUMNS = """
+    SELECT
+        dataset_id,
+        parse_status,
+        session_id,
+        original_filename,
+        extension,
+        mime_type,
+        size_bytes,
+        COALESCE(row_count, 0),
+        COALESCE(column_count, 0),
+        created_at,
+        updated_at
+    FROM datasets
+"""
+
+SESSION_DATASETS_QUERY = SESSION_DATASETS_COLUMNS + """
+    WHERE session_id = ?
+    ORDER BY created_at DESC, dataset_id DESC
+    LIMIT ?
+"""
+
+SESSION_DATASETS_AFTER_QUERY = SESSION_DATASETS_COLUMNS + """
+    WHERE session_id = ?
+      AND (created_at, dataset_id) < (?, ?)
+    ORDER BY created_at DESC, dataset_id DESC
+    LIMIT ?
+"""
+
+DATASET_PROFILE_QUERY = """
+    SELECT
+        dataset_id,
+        profile_json
+    FROM datasets
+    WHERE dataset_id = ?
+"""
+
+DELETE_DATASET_QUERY = """
+    DELETE FROM datasets
+    WHERE dataset_id = ?
+"""
+
+# Id lists travel as one JSON array parameter, so a single prepared
+# statement serves every batch size.
+DELETE_DATASETS_QUERY = """
+    DELETE FROM datasets
+    WHERE dataset_id IN (SELECT value FROM json_each(?))
+    RETURNING dataset_id
+"""
+
+DATASET_OWNERS_QUERY = """
+    SELECT
+        dataset_id,
+        session_id,
+        storage_key_raw
+    FROM datasets
+    WHERE dataset_id IN (SELECT value FROM json_each(?))
+"""
+
+EXPIRED_DATASETS_COLUMNS = """
+    SELECT
+        dataset_id,
+        storage_key_raw,
+        created_at
+    FROM datasets
+"""
+
+EXPIRED_DATASETS_QUERY = EXPIRED_DATASETS_COLUMNS + """
+    WHERE created_at < ?
+    ORDER BY created_at, dataset_id
+    LIMIT ?
+"""
+
+EXPIRED_DATASETS_AFTER_QUERY = EXPIRED_DATASETS_COLUMNS + """
+    WHERE created_at < ?
+      AND (created_at, dataset_id) > (?, ?)
+    ORDER BY created_at, dataset_id
+    LIMIT ?
+"""
+
+
+def _format_timestamp(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.astimezone(UTC).isoformat(timespec="microseconds")
+
+
+class SQLiteMetastoreService:
+    """Embedded metastore with the same methods and records as ``MetastoreService``.
+
+    Used when no Postgres ``DATABASE_URL`` is configured. The database runs
+    in WAL mode so readers never wait for the writer, and each thread keeps
+    its own connection whose statement cache holds every query prepared.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: str | Path,
+        descriptor_cache: TTLCache[DatasetDescriptorRecord] | None = None,
+    ) -> None:
+        self.path = str(path)
+        self.descriptor_cache = descriptor_cache or build_descriptor_cache()
+        self.descriptor_flight = SingleFlight()
+        # Inserts commit in microseconds; there is nothing to batch behind.
+        self.write_behind = None
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def pool_stats(self) -> None:
+        return None
+
+    def write_behind_stats(self) -> None:
+        return None
+
+    def warm_up(self) -> None:
+        # Creates the database file and schema on the calling thread.
+        self._connection()
+
+    def insert_dataset_metadata(self, record: DatasetInsertRecord) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute(INSERT_DATASET_QUERY, self._insert_params(record))
+
+    def insert_dataset_metadata_batch(self, records: list[DatasetInsertRecord]) -> None:
+        if not records:
+            return
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                INSERT_DATASET_BATCH_QUERY, [self._insert_params(record) for record in records]
+            )
+
+    def get_dataset_profile(self, dataset_id: str) -> DatasetProfileRecord | None:
+        row = self._connection().execute(DATASET_PROFILE_QUERY, (dataset_id,)).fetchone()
+        if row is None:
+            return None
+        return DatasetProfileRecord(
+            dataset_id=row[0],
+            profile_json=json.loads(row[1]) if row[1] is not None else None,
+        )
+
+    def get_dataset_descriptor(self, dataset_id: str) -> DatasetDescriptorRecord | None:
+        descriptor = self.descriptor_cache.get(dataset_id)
+        if descriptor is not None:
+            return descriptor
+
+        return self.descriptor_flight.do(
+            ("descriptor", dataset_id), lambda: self._load_dataset_descriptor(dataset_id)
+        )
+
+    def _load_dataset_descriptor(self, dataset_id: str) -> DatasetDescriptorRecord | None:
+        row = self._connection().execute(DATASET_DESCRIPTOR_QUERY, (dataset_id,)).fetchone()
+        if row is None:
+            return None
+        descriptor = DatasetDescriptorRecord.from_row(
+            (
+                *row[:9],
+                datetime.fromisoformat(row[9]),
+                datetime.fromisoformat(row[10]),
+                json.loads(row[11]),
+                row[12],
+            )
+        )
+        self.descriptor_cache.put(dataset_id, descriptor)
+        return descriptor
+
+    def get_dataset_metadata(self, dataset_id: str) -> DatasetMetadataRecord | None:
+        descriptor = self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_metadata_record() if descriptor is not None else None
+
+    def get_dataset_schema(self, dataset_id: str) -> DatasetSchemaRecord | None:
+        descriptor = self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_schema_record() if descriptor is not None else None
+
+    def get_dataset_preview_source(
+        self, dataset_id: str
+    ) -> DatasetPreviewSourceRecord | None:
+        descriptor = self.get_dataset_descriptor(dataset_id)
+        return descriptor.to_preview_source_record() if descriptor is not None else None
+
+    def list_session_datasets(
+        self,
+        session_id: str,
+        *,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[DatasetMetadataRecord]:
+        connection = self._connection()
+        if after is None:
+            cursor = connection.execute(SESSION_DATASETS_QUERY, (session_id, limit))
+        else:
+            cursor = connection.execute(
+                SESSION_DATASETS_AFTER_QUERY,
+                (session_id, _format_timestamp(after[0]), after[1], limit),
+            )
+        return [
+            DatasetMetadataRecord.from_row(
+                (*row[:9], datetime.fromisoformat(row[9]), datetime.fromisoformat(row[10]))
+            )
+            for row in cursor.fetchall()
+        ]
+
+    def delete_dataset_metadata(self, dataset_id: str) -> bool:
+        connection = self._connection()
+        with connection:
+            deleted_count = connection.execute(DELETE_DATASET_QUERY, (dataset_id,)).rowcount
+        self.descriptor_cache.invalidate(dataset_id)
+        return deleted_count > 0
+
+    def delete_datasets_metadata(self, dataset_ids: list[str]) -> list[str]:
+        if not dataset_ids:
+            return []
+        connection = self._connection()
+        with connection:
+            rows = connection.execute(
+                DELETE_DATASETS_QUERY, (json.dumps(list(dataset_ids)),)
+            ).fetchall()
+        for dataset_id in dataset_ids:
+            self.descriptor_cache.invalidate(dataset_id)
+        return [row[0] for row in rows]
+
+    def get_dataset_owners(self, dataset_ids: list[str]) -> dict[str, DatasetOwnerRecord]:
+        if not dataset_ids:
+            return {}
+        rows = self._connection().execute(
+            DATASET_OWNERS_QUERY, (json.dumps(list(dataset_ids)),)
+        ).fetchall()
+        return {
+            row[0]: DatasetOwnerRecord(dataset_id=row[0], session_id=row[1], storage_key_raw=row[2])
+            for row in rows
+        }
+
+    def list_expired_datasets(
+        self,
+        cutoff: datetime,
+        *,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[ExpiredDatasetRecord]:
+        connection = self._connection()
+        if after is None:
+            cursor = connection.execute(
+                EXPIRED_DATASETS_QUERY, (_format_timestamp(cutoff), limit)
+            )
+        else:
+            cursor = connection.execute(
+                EXPIRED_DATASETS_AFTER_QUERY,
+                (_format_timestamp(cutoff), _format_timestamp(after[0]), after[1], limit),
+            )
+        return [
+            ExpiredDatasetRecord(
+                dataset_id=row[0],
+                storage_key_raw=row[1],
+                created_at=datetime.fromisoformat(row[2]),
+            )
+            for row in cursor.fetchall()
+        ]
+
+    def _insert_params(self, record: DatasetInsertRecord) -> tuple[object, ...]:
+        now = _format_timestamp(datetime.now(UTC))
+        return (*record.to_params(), now, now)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, cached_statements=256)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            self._ensure_schema(connection)
+            self._local.connection = connection
+        return connection
+
+    def _ensure_schema(self, connection: sqlite3.Connection) -> None:
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                connection.executescript(SCHEMA_SCRIPT)
+                self._schema_ready = True
@@ -1,8 +1,64 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TypeVar
+
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from app.core.config import STORAGE_IO_WORKERS
+from app.services.object_cache import DiskObjectCache
+from app.services.object_codec import (
+    ENCODING_METADATA_KEY,
+    compress,
+    is_compressible,
+    iter_decoded,
+    read_decoded,
+    resolve_encoding,
+)
+
+
+T = TypeVar("T")
+
+# S3 DeleteObjects accepts at most this many keys per request.
+DELETE_OBJECTS_MAX_KEYS = 1000
+
+_io_executor: ThreadPoolExecutor | None = None
+_io_executor_lock = threading.Lock()
+
+
+def _storage_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=STORAGE_IO_WORKERS, thread_name_prefix="storage-io"
+            )
+        return _io_executor
+
+
+async def run_storage_io(fn: Callable[..., T], /, **kwargs: object) -> T:
+    """Await a blocking storage call on the dedicated storage thread pool.
+
+    The pool is bounded, so a burst of slow object-store calls queues here
+    instead of exhausting the threadpool that serves sync route handlers.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_storage_executor(), partial(fn, **kwargs))
+
+
+def shutdown_storage_io() -> None:
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=True)
+            _io_executor = None
+
 
 class S3StorageService:
     def __init__(
@@ -14,9 +70,25 @@ class S3StorageService:
         bucket: str,
         secure: bool,
         auto_create_bucket: bool,
+        object_cache: DiskObjectCache | None = None,
+        max_pool_connections: int = 10,
+        connect_timeout: float = 60,
+        read_timeout: float = 60,
+        max_attempts: int = 3,
+        retry_mode: str = "standard",
+        tcp_keepalive: bool = False,
+        compression: str | None = None,
+        compression_level: int = 3,
+        compression_min_bytes: int = 1024,
     ) -> None:
         self.bucket = bucket
         self.auto_create_bucket = auto_create_bucket
+        self.object_cache = object_cache
+        self.compression = resolve_encoding(compression)
+        self.compression_level = compression_level
+        self.compression_min_bytes = compression_min_bytes
+        self._compression_stats = {"objects": 0, "raw_bytes": 0, "stored_bytes": 0}
+        self._compression_lock = threading.Lock()
         self._bucket_ready = False
         self._client = boto3.client(
             "s3",
@@ -24,25 +96,150 @@ class S3StorageService:
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
             use_ssl=secure,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                retries={"total_max_attempts": max_attempts, "mode": retry_mode},
+                tcp_keepalive=tcp_keepalive,
+            ),
         )
 
+    def warm_up(self) -> None:
+        """Check (or create) the bucket up front instead of on the first call."""
+        self._ensure_bucket()
+
+    def compression_stats(self) -> dict[str, object]:
+        with self._compression_lock:
+            stats = dict(self._compression_stats)
+        stats["encoding"] = self.compression
+        stored_bytes = stats["stored_bytes"]
+        stats["ratio"] = round(stats["raw_bytes"] / stored_bytes, 2) if stored_bytes else None
+        return stats
+
     def put_object(self, *, file_bytes: bytes, key: str, content_type: str) -> None:
         self._ensure_bucket()
-        self._client.put_object(
+        body, metadata = self._encode(file_bytes, content_type)
+        response = self._client.put_object(
             Bucket=self.bucket,
             Key=key,
-            Body=file_bytes,
+            Body=body,
             ContentType=content_type,
+            Metadata=metadata,
         )
+        etag = response.get("ETag") if isinstance(response, dict) else None
+        if self.object_cache is not None and etag:
+            self.object_cache.put(key=key, etag=etag, data=file_bytes)
 
     def get_object(self, *, key: str) -> bytes:
+        self._ensure_bucket()
+        if self.object_cache is None:
+            response = self._client.get_object(Bucket=self.bucket, Key=key)
+            return self._read_body(response)
+
+        cached_etag = self.object_cache.lookup_etag(key=key)
+        if cached_etag is not None:
+            try:
+                response = self._client.get_object(
+                    Bucket=self.bucket, Key=key, IfNoneMatch=cached_etag
+                )
+            except ClientError as exc:
+                if not self._is_not_modified(exc):
+                    raise
+                cached = self.object_cache.get(key=key, etag=cached_etag)
+                if cached is not None:
+                    return cached
+                response = self._client.get_object(Bucket=self.bucket, Key=key)
+            else:
+                self.object_cache.record_miss()
+        else:
+            self.object_cache.record_miss()
+            response = self._client.get_object(Bucket=self.bucket, Key=key)
+
+        # The cache holds decoded bytes, so hits skip decompression too.
+        body = self._read_body(response)
+        etag = response.get("ETag")
+        if etag:
+            self.object_cache.put(key=key, etag=etag, data=body)
+        return body
+
+    def get_object_range(self, *, key: str, start: int, end: int | None = None) -> bytes:
+        """Bytes ``start`` through ``end`` inclusive, bypassing the object cache.
+
+        Offsets refer to the decoded object; a compressed object cannot be
+        read partially, so it is fetched whole and sliced.
+        """
+        self._ensure_bucket()
+        byte_range = f"bytes={start}-{end if end is not None else ''}"
+        response = self._client.get_object(Bucket=self.bucket, Key=key, Range=byte_range)
+        if self._encoding_of(response) is None:
+            return response["Body"].read()
+        response["Body"].close()
+        data = self.get_object(key=key)
+        return data[start : end + 1 if end is not None else None]
+
+    def iter_object(self, *, key: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
         self._ensure_bucket()
         response = self._client.get_object(Bucket=self.bucket, Key=key)
-        return response["Body"].read()
+        yield from iter_decoded(
+            response["Body"].iter_chunks(chunk_size), self._encoding_of(response)
+        )
 
     def delete_object(self, *, key: str) -> None:
         self._ensure_bucket()
         self._client.delete_object(Bucket=self.bucket, Key=key)
+        if self.object_cache is not None:
+            self.object_cache.discard(key=key)
+
+    def delete_objects(self, *, keys: list[str]) -> list[str]:
+        """Delete many objects with one request per 1000 keys.
+
+        Returns the keys S3 reported as not deleted; missing keys count as
+        deleted.
+        """
+        self._ensure_bucket()
+        failed: list[str] = []
+        for start in range(0, len(keys), DELETE_OBJECTS_MAX_KEYS):
+            chunk = keys[start : start + DELETE_OBJECTS_MAX_KEYS]
+            response = self._client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+            )
+            errors = {error["Key"] for error in response.get("Errors", [])}
+            failed.extend(key for key in chunk if key in errors)
+            if self.object_cache is not None:
+                for key in chunk:
+                    if key not in errors:
+                        self.object_cache.discard(key=key)
+        return failed
+
+    def _encode(self, data: bytes, content_type: str) -> tuple[bytes, dict[str, str]]:
+        if (
+            self.compression is None
+            or len(data) < self.compression_min_bytes
+            or not is_compressible(content_type)
+        ):
+            return data, {}
+        encoded = compress(data, self.compression, level=self.compression_level)
+        if len(encoded) >= len(data):
+            return data, {}
+        with self._compression_lock:
+            self._compression_stats["objects"] += 1
+            self._compression_stats["raw_bytes"] += len(data)
+            self._compression_stats["stored_bytes"] += len(encoded)
+        return encoded, {ENCODING_METADATA_KEY: self.compression}
+
+    def _encoding_of(self, response: dict) -> str | None:
+        # Objects written before compression was enabled carry no marker.
+        return response.get("Metadata", {}).get(ENCODING_METADATA_KEY)
+
+    def _read_body(self, response: dict) -> bytes:
+        return read_decoded(response["Body"], self._encoding_of(response))
+
+    def _is_not_modified(self, exc: ClientError) -> bool:
+        status_code = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        error_code = str(exc.response.get("Error", {}).get("Code", ""))
+        return status_code == 304 or error_code in {"304", "NotModified"}
 
     def _ensure_bucket(self) -> None:
         if self._bucket_ready:
@@ -1,5 +1,7 @@
+import asyncio
 import io
 import json
+import logging
 import xml.etree.ElementTree as ET
 import zipfile
 from datetime import UTC, date, datetime
@@ -8,6 +10,7 @@ from uuid import uuid4
 
 import pandas as pd
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pandas.api.types import (
     is_bool_dtype,
     is_datetime64_any_dtype,
@@ -19,15 +22,32 @@ from pandas.api.types import (
 
 from app.core.config import (
     DATABASE_URL,
+    FRAME_CACHE_MAX_BYTES,
+    FRAME_CACHE_MAX_ENTRIES,
+    LOCAL_STORAGE_ROOT,
+    METASTORE_ASYNC_ENABLED,
     METASTORE_INSERT_ENABLED,
     MINIO_ACCESS_KEY,
     MINIO_AUTO_CREATE_BUCKET,
+    MINIO_CONNECT_TIMEOUT_SECONDS,
     MINIO_ENDPOINT,
+    MINIO_MAX_ATTEMPTS,
+    MINIO_MAX_POOL_CONNECTIONS,
     MINIO_RAW_BUCKET,
+    MINIO_READ_TIMEOUT_SECONDS,
+    MINIO_RETRY_MODE,
     MINIO_SECRET_KEY,
     MINIO_SECURE,
+    MINIO_TCP_KEEPALIVE,
     MINIO_UPLOAD_ENABLED,
+    OBJECT_CACHE_DIR,
+    OBJECT_CACHE_ENABLED,
+    OBJECT_CACHE_MAX_BYTES,
+    OBJECT_COMPRESSION,
+    OBJECT_COMPRESSION_LEVEL,
+    OBJECT_COMPRESSION_MIN_BYTES,
     ROW_CAP,
+    STORAGE_BACKEND,
 )
 from app.errors import APIError
 from app.schemas.upload import (
@@ -38,8 +58,46 @@ from app.schemas.upload import (
     StorageRef,
     UploadResponse,
 )
+from app.services.async_metastore_service import AsyncMetastoreService
+from app.services.dataset_cache import CachedDataset, DatasetFrameCache
+from app.services.local_storage_service import LocalFileStorageService
+from app.services.metastore_backends import build_metastore_service
 from app.services.metastore_service import DatasetInsertRecord, MetastoreService
-from app.services.storage_service import S3StorageService
+from app.services.profile_service import build_dataset_profile
+from app.services.object_cache import DiskObjectCache
+from app.services.single_flight import SingleFlight
+from app.services.sqlite_metastore_service import SQLiteMetastoreService
+from app.services.storage_service import S3StorageService, run_storage_io
+
+
+logger = logging.getLogger(__name__)
+
+
+def _build_storage_service(bucket: str) -> S3StorageService | LocalFileStorageService:
+    if STORAGE_BACKEND == "local":
+        return LocalFileStorageService(root=LOCAL_STORAGE_ROOT, bucket=bucket)
+    return S3StorageService(
+        endpoint=MINIO_ENDPOINT,
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        bucket=bucket,
+        secure=MINIO_SECURE,
+        auto_create_bucket=MINIO_AUTO_CREATE_BUCKET,
+        object_cache=(
+            DiskObjectCache(root=OBJECT_CACHE_DIR, max_bytes=OBJECT_CACHE_MAX_BYTES)
+            if OBJECT_CACHE_ENABLED
+            else None
+        ),
+        max_pool_connections=MINIO_MAX_POOL_CONNECTIONS,
+        connect_timeout=MINIO_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=MINIO_READ_TIMEOUT_SECONDS,
+        max_attempts=MINIO_MAX_ATTEMPTS,
+        retry_mode=MINIO_RETRY_MODE,
+        tcp_keepalive=MINIO_TCP_KEEPALIVE,
+        compression=OBJECT_COMPRESSION,
+        compression_level=OBJECT_COMPRESSION_LEVEL,
+        compression_min_bytes=OBJECT_COMPRESSION_MIN_BYTES,
+    )
 
 
 class UploadService:
@@ -48,24 +106,32 @@ class UploadService:
         raw_bucket: str = MINIO_RAW_BUCKET,
         *,
         storage_enabled: bool = MINIO_UPLOAD_ENABLED,
-        storage_service: S3StorageService | None = None,
+        storage_service: S3StorageService | LocalFileStorageService | None = None,
         metastore_enabled: bool = METASTORE_INSERT_ENABLED,
-        metastore_service: MetastoreService | None = None,
+        metastore_service: MetastoreService | SQLiteMetastoreService | None = None,
+        async_metastore_service: AsyncMetastoreService | None = None,
+        frame_cache: DatasetFrameCache | None = None,
+        single_flight: SingleFlight | None = None,
     ) -> None:
         self.raw_bucket = raw_bucket
         self.storage_enabled = storage_enabled
         self.metastore_enabled = metastore_enabled
-        self.storage_service = storage_service or S3StorageService(
-            endpoint=MINIO_ENDPOINT,
-            access_key=MINIO_ACCESS_KEY,
-            secret_key=MINIO_SECRET_KEY,
-            bucket=raw_bucket,
-            secure=MINIO_SECURE,
-            auto_create_bucket=MINIO_AUTO_CREATE_BUCKET,
+        self.storage_service = storage_service or _build_storage_service(raw_bucket)
+        self.metastore_service = metastore_service or build_metastore_service()
+        self.async_metastore_service = async_metastore_service or (
+            AsyncMetastoreService(
+                database_url=DATABASE_URL,
+                descriptor_cache=getattr(self.metastore_service, "descriptor_cache", None),
+                write_behind=getattr(self.metastore_service, "write_behind", None),
+            )
+            if METASTORE_ASYNC_ENABLED and DATABASE_URL
+            else None
         )
-        self.metastore_service = metastore_service or MetastoreService(
-            database_url=DATABASE_URL
+        self.frame_cache = frame_cache or DatasetFrameCache(
+            max_entries=FRAME_CACHE_MAX_ENTRIES,
+            max_bytes=FRAME_CACHE_MAX_BYTES,
         )
+        self.single_flight = single_flight or SingleFlight()
 
     async def handle_upload(
         self,
@@ -109,46 +175,63 @@ class UploadService:
                 status_code=422,
             ) from exc
 
+        try:
+            profile = self.build_profile(dataframe, schema)
+        except Exception:
+            # The profile only speeds up /stats, which can rebuild it on
+            # demand; it must never reject an upload that parsed.
+            logger.exception("Profiling dataset %s failed", dataset_id)
+            profile = None
+
+        record = DatasetInsertRecord(
+            dataset_id=dataset_id,
+            parse_status="ready",
+            session_id=session_id,
+            original_filename=file.filename or "unknown",
+            extension=extension,
+            mime_type=file.content_type or "application/octet-stream",
+            size_bytes=file_size,
+            row_count=int(dataframe.shape[0]),
+            column_count=int(dataframe.shape[1]),
+            schema_json=[column.model_dump() for column in schema],
+            storage_key_raw=object_key,
+            profile_json=profile,
+        )
+        # The raw object and its metadata row are written concurrently; if
+        # one write fails, the other is undone so neither is left orphaned.
+        storage_result, metastore_result = await asyncio.gather(
+            self._store_raw_object(
+                content=content,
+                key=object_key,
+                content_type=file.content_type or "application/octet-stream",
+            ),
+            self._insert_metadata(record),
+            return_exceptions=True,
+        )
+        if isinstance(storage_result, BaseException):
+            if self.metastore_enabled and not isinstance(metastore_result, BaseException):
+                await self._delete_metadata_quietly(dataset_id)
+            raise self._build_error(
+                code="STORAGE_ERROR",
+                message="Failed to write object to storage backend.",
+                details={"reason": str(storage_result)[:200]},
+                status_code=500,
+            ) from storage_result
+        if isinstance(metastore_result, BaseException):
+            if self.storage_enabled:
+                await self._delete_raw_object_quietly(object_key)
+            raise self._build_error(
+                code="METASTORE_ERROR",
+                message="Failed to write metadata to metastore backend.",
+                details={"reason": str(metastore_result)[:200]},
+                status_code=500,
+            ) from metastore_result
+
         if self.storage_enabled:
-            content_type = file.content_type or "application/octet-stream"
-            try:
-                self.storage_service.put_object(
-                    file_bytes=content,
-                    key=object_key,
-                    content_type=content_type,
-                )
-            except Exception as exc:
-                raise self._build_error(
-                    code="STORAGE_ERROR",
-                    message="Failed to write object to storage backend.",
-                    details={"reason": str(exc)[:200]},
-                    status_code=500,
-                ) from exc
-
-        if self.metastore_enabled:
-            try:
-                self.metastore_service.insert_dataset_metadata(
-                    DatasetInsertRecord(
-                        dataset_id=dataset_id,
-                        parse_status="ready",
-                        session_id=session_id,
-                        original_filename=file.filename or "unknown",
-                        extension=extension,
-                        mime_type=file.content_type or "application/octet-stream",
-                        size_bytes=file_size,
-                        row_count=int(dataframe.shape[0]),
-                        column_count=int(dataframe.shape[1]),
-                        schema_json=[column.model_dump() for column in schema],
-                        storage_key_raw=object_key,
-                    )
-                )
-            except Exception as exc:
-                raise self._build_error(
-                    code="METASTORE_ERROR",
-                    message="Failed to write metadata to metastore backend.",
-                    details={"reason": str(exc)[:200]},
-                    status_code=500,
-                ) from exc
+            # Reads parse the raw object exactly like this, so the first
+            # preview or query served by this worker can skip the download
+            # and parse. Other workers still parse the object themselves.
+            self.frame_cache.put(object_key, dataframe)
 
         return UploadResponse(
             dataset_id=dataset_id,
@@ -172,22 +255,127 @@ class UploadService:
             warnings=[],
         )
 
+    async def _store_raw_object(self, *, content: bytes, key: str, content_type: str) -> None:
+        if not self.storage_enabled:
+            return
+        # Off the event loop: a slow object store must not stall every other
+        # request served by this worker.
+        await run_storage_io(
+            self.storage_service.put_object,
+            file_bytes=content,
+            key=key,
+            content_type=content_type,
+        )
+
+    async def _insert_metadata(self, record: DatasetInsertRecord) -> None:
+        if not self.metastore_enabled:
+            return
+        # Queueing never touches the network, so no thread is needed; a full
+        # queue falls through to a direct insert.
+        has_queue = getattr(self.metastore_service, "write_behind", None) is not None
+        if has_queue and self.metastore_service.queue_dataset_metadata(record):
+            return
+        if self.async_metastore_service is not None:
+            await self.async_metastore_service.insert_dataset_metadata(record)
+        else:
+            await run_in_threadpool(self.metastore_service.insert_dataset_metadata, record)
+
+    async def _delete_metadata_quietly(self, dataset_id: str) -> None:
+        try:
+            if (
+                self.async_metastore_service is not None
+                and getattr(self.metastore_service, "write_behind", None) is None
+            ):
+                await self.async_metastore_service.delete_dataset_metadata(dataset_id)
+            else:
+                await run_in_threadpool(
+                    self.metastore_service.delete_dataset_metadata, dataset_id
+                )
+        except Exception:
+            pass
+
+    async def _delete_raw_object_quietly(self, key: str) -> None:
+        try:
+            await run_storage_io(self.storage_service.delete_object, key=key)
+        except Exception:
+            pass
+
     def parse_dataset_bytes(self, *, content: bytes, extension: str) -> pd.DataFrame:
         dataframe = self._parse_to_dataframe(content=content, extension=extension)
         return self._normalize_columns(dataframe)
 
-    def build_preview_rows(
-        self, *, content: bytes, extension: str, limit: int, offset: int
-    ) -> list[dict]:
-        rows = self.build_content_rows(content=content, extension=extension)
-        return rows[offset : offset + limit]
+    def build_profile(
+        self, dataframe: pd.DataFrame, schema: list[ColumnSchema] | None = None
+    ) -> dict[str, object]:
+        schema = schema if schema is not None else self._build_schema(dataframe)
+        return build_dataset_profile(
+            dataframe, {column.name: column.dtype for column in schema}
+        )
+
+    def load_dataframe(
+        self,
+        *,
+        storage_key: str,
+        extension: str,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        return self.load_dataset(
+            storage_key=storage_key, extension=extension, columns=columns
+        ).dataframe
+
+    def load_dataset(
+        self,
+        *,
+        storage_key: str,
+        extension: str,
+        columns: list[str] | None = None,
+    ) -> CachedDataset:
+        cached = self.frame_cache.get(storage_key, columns)
+        if cached is not None:
+            return cached
+
+        # Push the projection down into the CSV reader. A partial entry
+        # already cached is widened rather than replaced by a narrower one.
+        usecols = None
+        if extension == "csv" and columns is not None:
+            partial = self.frame_cache.peek(storage_key)
+            cached_columns = partial.columns if partial is not None else None
+            usecols = sorted(set(columns) | (cached_columns or set()))
+        return self.single_flight.do(
+            ("frame", storage_key, tuple(usecols) if usecols is not None else None),
+            lambda: self._fetch_dataset(storage_key, extension, usecols),
+        )
+
+    def _fetch_dataset(
+        self, storage_key: str, extension: str, usecols: list[str] | None
+    ) -> CachedDataset:
+        # A flight that finished just before this one started has already
+        # published the frame.
+        cached = self.frame_cache.peek(storage_key)
+        if cached is not None and cached.covers(usecols):
+            return cached
 
-    def build_content_rows(self, *, content: bytes, extension: str) -> list[dict]:
         try:
-            dataframe = self.parse_dataset_bytes(content=content, extension=extension)
-            rows = self._serialize_rows(dataframe)
-        except APIError:
-            raise
+            content = self.storage_service.get_object(key=storage_key)
+        except Exception as exc:
+            raise self._build_error(
+                code="STORAGE_ERROR",
+                message="Failed to read object from storage backend.",
+                details={"reason": str(exc)[:200]},
+                status_code=500,
+            ) from exc
+
+        try:
+            dataframe = None
+            if usecols is not None:
+                dataframe = self._parse_csv_columns(content, usecols)
+            if dataframe is None:
+                # Either no projection was asked for or none of its columns
+                # exist; both parse the whole file, so cache a full frame.
+                usecols = None
+                dataframe = self._normalize_columns(
+                    self._parse_to_dataframe(content, extension)
+                )
         except Exception as exc:
             raise self._build_error(
                 code="PARSE_FAILED",
@@ -196,7 +384,30 @@ class UploadService:
                 status_code=422,
             ) from exc
 
-        return rows
+        return self.frame_cache.put(storage_key, dataframe, columns=usecols)
+
+    def build_frame_rows(
+        self, dataframe: pd.DataFrame, *, limit: int | None = None, offset: int = 0
+    ) -> list[dict]:
+        stop = None if limit is None else offset + limit
+        return self._serialize_rows(dataframe.iloc[offset:stop])
+
+    def _parse_csv_columns(self, content: bytes, columns: list[str]) -> pd.DataFrame | None:
+        """Parse only ``columns`` of a CSV, named as a full parse would name them.
+
+        Callers use normalized names, so they are mapped back to positions in
+        the header before the reader runs. Returns ``None`` when none of
+        ``columns`` is in the header.
+        """
+        header = pd.read_csv(io.BytesIO(content), nrows=0).columns
+        names = self._normalize_header_names(list(header))
+        wanted = set(columns)
+        positions = [index for index, name in enumerate(names) if name in wanted]
+        if not positions:
+            return None
+        dataframe = pd.read_csv(io.BytesIO(content), usecols=positions)
+        dataframe.columns = [names[index] for index in positions]
+        return dataframe
 
     def _parse_to_dataframe(self, content: bytes, extension: str) -> pd.DataFrame:
         if extension == "csv":
@@ -0,0 +1,5 @@
+-- Index backing the background expiry sweeper (DATASET_EXPIRY_DAYS)
+-- Safe to run in Supabase SQL Editor.
+
+CREATE INDEX IF NOT EXISTS datasets_created_at_idx
+    ON public.datasets (created_at);
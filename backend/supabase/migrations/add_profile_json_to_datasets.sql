@@ -0,0 +1,5 @@
+-- Persist per-column statistics computed at upload for GET /datasets/{dataset_id}/stats
+-- Safe to run in Supabase SQL Editor.
+
+ALTER TABLE IF EXISTS public.datasets
+    ADD COLUMN IF NOT EXISTS profile_json jsonb;
@@ -0,0 +1,7 @@
+-- Index backing GET /sessions/{session_id}/datasets keyset pagination
+-- Safe to run in Supabase SQL Editor.
+
+-- Pages are ordered by (created_at DESC, dataset_id DESC) within a session;
+-- dataset_id breaks ties so every page boundary is exact.
+CREATE INDEX IF NOT EXISTS datasets_session_id_created_at_idx
+    ON public.datasets (session_id, created_at DESC, dataset_id DESC);
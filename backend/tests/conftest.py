@@ -1,5 +1,7 @@
 import sys
 import os
+import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
@@ -13,10 +15,27 @@ if str(BACKEND_DIR) not in sys.path:
 # Keep tests hermetic: do not require a running MinIO instance.
 os.environ.setdefault("MINIO_UPLOAD_ENABLED", "false")
 os.environ.setdefault("METASTORE_INSERT_ENABLED", "false")
+os.environ.setdefault(
+    "METASTORE_SQLITE_PATH", str(Path(tempfile.mkdtemp()) / "metastore.sqlite3")
+)
 
 from app.main import app  # noqa: E402
+from app.services.service_container import (  # noqa: E402
+    ServiceContainer,
+    build_service_container,
+    get_services,
+)
 
 
 @pytest.fixture()
-def client() -> TestClient:
+def services() -> Iterator[ServiceContainer]:
+    # A fresh container per test, so cached frames never leak between tests.
+    container = build_service_container()
+    app.dependency_overrides[get_services] = lambda: container
+    yield container
+    app.dependency_overrides.pop(get_services, None)
+
+
+@pytest.fixture()
+def client(services: ServiceContainer) -> TestClient:
     return TestClient(app)
@@ -0,0 +1,141 @@
+import asyncio
+import socket
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import pytest
+from psycopg2 import extensions
+
+from app.services import upload_service as upload_service_module
+from app.services.async_metastore_service import AsyncMetastoreService
+from app.services.dataset_cache import TTLCache
+from app.services.db_pool import AsyncPostgresConnectionPool, wait_ready
+from app.services.upload_service import UploadService
+
+
+class FakeAsyncConnection:
+    def __init__(self, polls: list[int] | None = None) -> None:
+        self.polls = list(polls or [])
+        self.closed = 0
+        self.cursor_mock = MagicMock()
+        self.reader, self.writer = socket.socketpair()
+
+    def poll(self) -> int:
+        return self.polls.pop(0) if self.polls else extensions.POLL_OK
+
+    def fileno(self) -> int:
+        return self.reader.fileno()
+
+    def cursor(self) -> MagicMock:
+        return self.cursor_mock
+
+    def close(self) -> None:
+        self.closed = 1
+        self.reader.close()
+        self.writer.close()
+
+
+def test_wait_ready_waits_for_the_socket_without_blocking() -> None:
+    connection = FakeAsyncConnection(polls=[extensions.POLL_READ])
+
+    async def scenario() -> list[str]:
+        events = []
+        waiter = asyncio.create_task(wait_ready(connection))
+        await asyncio.sleep(0.01)
+        events.append("loop free" if not waiter.done() else "finished early")
+        connection.writer.send(b"x")
+        await asyncio.wait_for(waiter, 1)
+        events.append("ready")
+        return events
+
+    assert asyncio.run(scenario()) == ["loop free", "ready"]
+    connection.close()
+
+
+def test_async_metastore_reuses_connections_and_caches_descriptors() -> None:
+    opened: list[FakeAsyncConnection] = []
+    connect_kwargs: list[dict] = []
+
+    def connect(database_url: str, **kwargs: object) -> FakeAsyncConnection:
+        connect_kwargs.append(kwargs)
+        opened.append(FakeAsyncConnection())
+        now = datetime(2026, 1, 1, tzinfo=UTC)
+        opened[-1].cursor_mock.fetchone.return_value = (
+            "ds_001", "ready", None, "sample.csv", "csv", "text/csv", 10, 2, 1,
+            now, now, [], "raw/ds_001/sample.csv",
+        )
+        opened[-1].cursor_mock.rowcount = 1
+        return opened[-1]
+
+    pool = AsyncPostgresConnectionPool(
+        "postgresql://demo", max_size=2, statement_timeout_ms=1000, connect=connect
+    )
+    service = AsyncMetastoreService(database_url="postgresql://demo", pool=pool)
+
+    async def scenario() -> None:
+        source = await service.get_dataset_preview_source("ds_001")
+        metadata = await service.get_dataset_metadata("ds_001")
+        assert source.storage_key_raw == "raw/ds_001/sample.csv"
+        assert metadata.row_count == 2
+        assert await service.delete_dataset_metadata("ds_001") is True
+        await service.close()
+
+    asyncio.run(scenario())
+
+    assert len(opened) == 1
+    assert connect_kwargs == [{"async_": 1, "options": "-c statement_timeout=1000"}]
+    assert opened[0].cursor_mock.execute.call_count == 2
+    assert opened[0].closed
+    assert pool.stats()["checkouts"] == 2
+
+
+def test_async_pool_discards_connections_left_by_errors_and_cancellation() -> None:
+    opened: list[FakeAsyncConnection] = []
+
+    def connect(database_url: str, **kwargs: object) -> FakeAsyncConnection:
+        opened.append(FakeAsyncConnection())
+        return opened[-1]
+
+    pool = AsyncPostgresConnectionPool(
+        "postgresql://demo", max_size=1, statement_timeout_ms=1000, connect=connect
+    )
+
+    async def scenario() -> None:
+        with pytest.raises(ValueError):
+            async with pool.connection():
+                raise ValueError("bad row")
+
+        async def wait_forever() -> None:
+            async with pool.connection():
+                await asyncio.sleep(10)
+
+        waiter = asyncio.create_task(wait_forever())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        async with pool.connection():
+            pass
+        await pool.close()
+
+    asyncio.run(scenario())
+
+    assert len(opened) == 3
+    assert opened[0].closed and opened[1].closed
+
+
+def test_upload_service_shares_the_sync_descriptor_cache(monkeypatch) -> None:
+    monkeypatch.setattr(upload_service_module, "METASTORE_ASYNC_ENABLED", True)
+    monkeypatch.setattr(upload_service_module, "DATABASE_URL", "postgresql://demo")
+    metastore = MagicMock(descriptor_cache=TTLCache(ttl_seconds=60, max_entries=8))
+    service = UploadService(storage_service=MagicMock(), metastore_service=metastore)
+    async_metastore = service.async_metastore_service
+
+    metastore.descriptor_cache.put("ds_001", "cached descriptor")
+    assert asyncio.run(async_metastore.get_dataset_descriptor("ds_001")) == "cached descriptor"
+    assert async_metastore.write_behind is metastore.write_behind
+
+    # A sync delete invalidates the shared cache, so the async path misses too.
+    metastore.descriptor_cache.invalidate("ds_001")
+    assert async_metastore.descriptor_cache.get("ds_001") is None
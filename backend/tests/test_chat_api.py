@@ -1,5 +1,80 @@
 import io
+from datetime import UTC, datetime
 from unittest.mock import Mock
+
+import pytest
 from fastapi.testclient import TestClient
+
 from app.api.v1 import chat as chat_module
+from app.services import chat_services
+from app.services.metastore_service import DatasetDescriptorRecord
+from app.services.upload_service import UploadService
+
+
+def build_descriptor(**overrides: object) -> DatasetDescriptorRecord:
+    fields = {
+        "dataset_id": "ds_demo",
+        "parse_status": "ready",
+        "session_id": "sess_1",
+        "original_filename": "sample.csv",
+        "extension": "csv",
+        "mime_type": "text/csv",
+        "size_bytes": 16,
+        "row_count": 2,
+        "column_count": 2,
+        "created_at": datetime(2026, 3, 19, tzinfo=UTC),
+        "updated_at": datetime(2026, 3, 19, tzinfo=UTC),
+        "schema_json": [
+            {"name": "a", "dtype": "int", "null_count": 0},
+            {"name": "b", "dtype": "int", "null_count": 0},
+        ],
+        "storage_key_raw": "raw/ds_demo/sample.csv",
+    }
+    fields.update(overrides)
+    return DatasetDescriptorRecord(**fields)
+
+
+def build_upload_service(descriptor: DatasetDescriptorRecord) -> tuple[UploadService, Mock]:
+    metastore = Mock()
+    metastore.get_dataset_descriptor.return_value = descriptor
+    storage = Mock()
+    storage.get_object.return_value = b"a,b\n1,2\n3,4\n"
+    return UploadService(storage_service=storage, metastore_service=metastore), storage
+
+
+@pytest.fixture(autouse=True)
+def clear_chat_context_cache() -> None:
+    chat_services.dataset_context_cache.clear()
+
+
+def test_dataset_context_is_built_once_and_cached() -> None:
+    upload_service, storage = build_upload_service(build_descriptor())
+
+    first = chat_services.inspect_uploaded_dataset("ds_demo", "sess_1", upload_service)
+    upload_service.frame_cache.clear()
+    second = chat_services.inspect_uploaded_dataset("ds_demo", "sess_1", upload_service)
+
+    assert second is first
+    assert first["schema"] == build_descriptor().schema_json
+    assert first["preview_rows"] == [{"a": 1, "b": 2}, {"a": 3, "b": 4}]
+    assert first["rows"] == 2
+    storage.get_object.assert_called_once_with(key="raw/ds_demo/sample.csv")
+
+
+def test_dataset_context_checks_ownership_on_every_message() -> None:
+    upload_service, _ = build_upload_service(build_descriptor())
+    chat_services.inspect_uploaded_dataset("ds_demo", "sess_1", upload_service)
+
+    with pytest.raises(PermissionError):
+        chat_services.inspect_uploaded_dataset("ds_demo", "sess_other", upload_service)
+    with pytest.raises(PermissionError):
+        chat_services.inspect_uploaded_dataset("ds_demo", None, upload_service)
+
+
+def test_dataset_context_builds_schema_when_none_was_stored() -> None:
+    upload_service, _ = build_upload_service(build_descriptor(schema_json=[]))
+
+    context = chat_services.inspect_uploaded_dataset("ds_demo", "sess_1", upload_service)
 
+    assert [column["name"] for column in context["schema"]] == ["a", "b"]
+    assert context["schema"][0]["dtype"] == "int"
@@ -0,0 +1,99 @@
+import gzip
+import json
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import (
+    CompressionMiddleware,
+    encoded_etag,
+    negotiate_encoding,
+    strip_etag_coding,
+)
+
+
+def build_app(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **options)
+
+    @app.get("/rows")
+    def rows(response: Response) -> dict:
+        response.headers["ETag"] = '"rows-v1"'
+        return {"rows": [{"name": "Alice", "score": index} for index in range(500)]}
+
+    @app.get("/small")
+    def small() -> dict:
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        chunks = (json.dumps({"index": index}).encode() + b"\n" for index in range(200))
+        return StreamingResponse(chunks, media_type="application/json")
+
+    return app
+
+
+def test_negotiate_encoding_respects_quality_values() -> None:
+    supported = ["zstd", "br", "gzip"]
+
+    assert negotiate_encoding("gzip, br;q=0.5", supported) == "gzip"
+    assert negotiate_encoding("gzip;q=0.2, zstd", supported) == "zstd"
+    assert negotiate_encoding("*;q=0.1, gzip;q=0", supported) == "zstd"
+    assert negotiate_encoding("identity", supported) is None
+    assert negotiate_encoding("", supported) is None
+
+
+def test_large_json_is_gzipped_and_small_json_is_not() -> None:
+    client = TestClient(build_app(minimum_size=512))
+
+    large = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in large.headers["vary"]
+    assert int(large.headers["content-length"]) < len(large.content)
+    assert len(large.json()["rows"]) == 500
+    assert "content-encoding" not in small.headers
+
+
+def test_streaming_response_is_compressed_incrementally() -> None:
+    client = TestClient(build_app(minimum_size=512))
+
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).count(b"\n") == 200
+
+
+def test_route_levels_override_default_level(monkeypatch) -> None:
+    levels: list[int] = []
+    original = compression._GzipEncoder.__init__
+
+    def recording_init(self, level: int) -> None:
+        levels.append(level)
+        original(self, level)
+
+    monkeypatch.setattr(compression._GzipEncoder, "__init__", recording_init)
+    client = TestClient(build_app(minimum_size=0, route_levels={"/rows": {"gzip": 1}}))
+
+    client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert levels == [1, 6]
+
+
+def test_compressed_body_gets_its_own_etag() -> None:
+    client = TestClient(build_app(minimum_size=512))
+
+    encoded = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/rows", headers={"Accept-Encoding": "identity"})
+
+    assert encoded.headers["etag"] == '"rows-v1-gzip"'
+    assert identity.headers["etag"] == '"rows-v1"'
+    assert encoded_etag('W/"abc"', "br") == 'W/"abc-br"'
+    assert strip_etag_coding('"abc-zstd"') == '"abc"'
+    assert strip_etag_coding('"abc"') == '"abc"'
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from app.services import frame_query
+from app.services.dataset_cache import DatasetFrameCache, TTLCache
+from app.services.frame_query import parse_filters
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used() -> None:
+    now = [0.0]
+    cache: TTLCache[str] = TTLCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+
+    cache.put("a", "first")
+    cache.put("b", "second")
+    assert cache.get("a") == "first"
+    cache.put("c", "third")
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "third"
+
+    now[0] = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_with_zero_ttl_stores_nothing() -> None:
+    cache: TTLCache[str] = TTLCache(ttl_seconds=0, max_entries=8)
+
+    cache.put("a", "value")
+
+    assert cache.get("a") is None
+
+
+def test_sort_order_handles_mixed_type_columns() -> None:
+    cache = DatasetFrameCache(max_entries=4, max_bytes=1024 * 1024)
+    frame = pd.DataFrame({"code": pd.Series([10, "b", None, "a", 2], dtype=object)})
+    entry = cache.put("raw/mixed.csv", frame)
+
+    assert entry.sort_order("code", "asc").tolist() == [0, 4, 3, 1, 2]
+    assert entry.sort_order("code", "desc").tolist() == [1, 3, 4, 0, 2]
+
+
+def test_sort_orders_count_against_the_byte_budget() -> None:
+    frame = pd.DataFrame({"value": np.arange(1_000, dtype=np.int64)})
+    frame_bytes = int(frame.memory_usage(deep=True).sum())
+    cache = DatasetFrameCache(max_entries=4, max_bytes=2 * frame_bytes + 8_000)
+    first = cache.put("raw/a.csv", frame)
+    cache.put("raw/b.csv", frame.copy())
+
+    first.sort_order("value", "desc")
+
+    assert first.size_bytes == frame_bytes + 8_000
+    assert cache.stats()["size_bytes"] == 2 * frame_bytes + 8_000
+    assert cache.stats()["evictions"] == 0
+
+    first.sort_order("value", "asc")
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.peek("raw/a.csv") is None
+    assert cache.stats()["size_bytes"] == frame_bytes
+
+
+
+def test_filtered_sort_orders_evaluate_the_filter_once(monkeypatch) -> None:
+    cache = DatasetFrameCache(max_entries=4, max_bytes=1024 * 1024)
+    frame = pd.DataFrame(
+        {"value": [5, 1, 4, 2, 3, 6], "city": ["NY", "LA", "NY", "NY", "LA", "NY"]}
+    )
+    entry = cache.put("raw/filtered.csv", frame)
+    filters = parse_filters(["city:=:NY"])
+    mask_calls = []
+    build_mask = frame_query._filter_mask
+    monkeypatch.setattr(
+        frame_query,
+        "_filter_mask",
+        lambda *args: mask_calls.append(args) or build_mask(*args),
+    )
+
+    pages = []
+    cursor = None
+    while True:
+        page, cursor = frame_query.sorted_page(
+            entry,
+            columns=["value"],
+            filters=filters,
+            sort_by="value",
+            order="asc",
+            limit=2,
+            offset=0,
+            cursor=cursor,
+        )
+        pages.append(page["value"].tolist())
+        if cursor is None:
+            break
+
+    assert pages == [[2, 4], [5, 6]]
+    assert len(mask_calls) == 1
+    assert ("value", "asc", (("city", "=", "NY"),)) in entry.sort_orders
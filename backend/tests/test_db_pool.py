@@ -0,0 +1,147 @@
+import threading
+import time
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+from app.services.db_pool import PoolTimeoutError, PostgresConnectionPool
+from app.services.metastore_service import MetastoreService
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.cursor_mock = MagicMock()
+
+    def cursor(self) -> MagicMock:
+        return self.cursor_mock
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+def build_pool(**kwargs: object) -> tuple[PostgresConnectionPool, list[FakeConnection], list[dict]]:
+    opened: list[FakeConnection] = []
+    connect_kwargs: list[dict] = []
+
+    def connect(database_url: str, **options: object) -> FakeConnection:
+        connect_kwargs.append(options)
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    pool = PostgresConnectionPool("postgresql://demo", connect=connect, **kwargs)
+    return pool, opened, connect_kwargs
+
+
+def test_pool_reuses_connections_and_sets_statement_timeout() -> None:
+    pool, opened, connect_kwargs = build_pool(min_size=1, max_size=4, statement_timeout_ms=2500)
+
+    for _ in range(5):
+        with pool.connection():
+            pass
+
+    assert len(opened) == 1
+    assert opened[0].commits == 5
+    assert connect_kwargs == [{"options": "-c statement_timeout=2500"}]
+    stats = pool.stats()
+    assert stats["checkouts"] == 5
+    assert stats["size"] == 1
+    assert stats["in_use"] == 0
+
+
+def test_pool_discards_broken_connections_and_rolls_back_errors() -> None:
+    pool, opened, _ = build_pool(min_size=0, max_size=2)
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("bad row")
+    assert opened[0].rollbacks == 1
+    assert not opened[0].closed
+
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection():
+            raise psycopg2.OperationalError("server closed the connection")
+    assert opened[0].closed
+
+    with pool.connection() as connection:
+        assert connection is opened[1]
+    assert pool.stats()["size"] == 1
+
+
+def test_pool_pings_idle_connections_before_reuse() -> None:
+    pool, opened, _ = build_pool(min_size=0, max_size=2, health_check_interval=0)
+    with pool.connection():
+        pass
+    opened[0].cursor_mock.__enter__.return_value.execute.side_effect = (
+        psycopg2.OperationalError("gone")
+    )
+
+    with pool.connection() as connection:
+        assert connection is opened[1]
+
+    assert opened[0].closed
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_pool_waits_for_a_free_connection_then_times_out() -> None:
+    pool, _, _ = build_pool(min_size=0, max_size=1, timeout=0.5)
+    released = threading.Event()
+
+    def hold() -> None:
+        with pool.connection():
+            released.wait()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.05)
+    threading.Timer(0.1, released.set).start()
+    with pool.connection():
+        pass
+    holder.join()
+    assert pool.stats()["wait_ms_max"] >= 50
+
+    short_pool, _, _ = build_pool(min_size=0, max_size=1, timeout=0.05)
+    with short_pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with short_pool.connection():
+                pass
+    assert short_pool.stats()["timeouts"] == 1
+
+
+def test_metastore_service_runs_queries_on_pooled_connections() -> None:
+    pool, opened, _ = build_pool(min_size=0, max_size=2)
+    service = MetastoreService(database_url="postgresql://demo", pool=pool)
+    with pool.connection() as connection:
+        cursor = connection.cursor_mock.__enter__.return_value
+    now = datetime(2026, 1, 1, tzinfo=UTC)
+    cursor.fetchone.return_value = (
+        "ds_001", "ready", "sess_1", "sample.csv", "csv", "text/csv", 10, 2, 1,
+        now, now, [{"name": "a", "dtype": "int", "null_count": 0}],
+        "raw/ds_001/sample.csv",
+    )
+    cursor.rowcount = 1
+
+    source = service.get_dataset_preview_source("ds_001")
+    schema = service.get_dataset_schema("ds_001")
+    metadata = service.get_dataset_metadata("ds_001")
+
+    assert source.storage_key_raw == "raw/ds_001/sample.csv"
+    assert schema.schema_json[0]["name"] == "a"
+    assert metadata.session_id == "sess_1"
+    assert cursor.execute.call_count == 1
+    assert len(opened) == 1
+
+    assert service.delete_dataset_metadata("ds_001") is True
+    service.get_dataset_preview_source("ds_001")
+    assert cursor.execute.call_count == 3
+    assert service.pool_stats()["checkouts"] == 4
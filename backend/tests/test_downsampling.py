@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from app.services.downsampling import (
+    build_chart_points,
+    freedman_diaconis_bins,
+    lttb_indices,
+)
+
+
+def test_lttb_keeps_endpoints_and_peaks() -> None:
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[500] = 100.0
+
+    keep = lttb_indices(x, y, 50)
+
+    assert len(keep) == 50
+    assert keep[0] == 0
+    assert keep[-1] == 999
+    assert 500 in keep
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_returns_all_points_below_threshold() -> None:
+    x = np.arange(10, dtype=float)
+
+    assert lttb_indices(x, x, 50).tolist() == list(range(10))
+
+
+def test_freedman_diaconis_bins_is_capped() -> None:
+    values = np.random.default_rng(0).normal(size=10_000)
+
+    assert 10 < freedman_diaconis_bins(values, 1000) < 200
+    assert freedman_diaconis_bins(values, 5) == 5
+    assert freedman_diaconis_bins(np.ones(10), 50) == 1
+
+
+def test_build_chart_points_bins_large_scatter() -> None:
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({"a": rng.normal(size=5000), "b": rng.normal(size=5000)})
+
+    points, source_points = build_chart_points(
+        frame, kind="scatter", x="a", y="b", max_points=100
+    )
+
+    assert source_points == 5000
+    assert len(points) <= 100
+    assert sum(point["count"] for point in points) == 5000
+
+
+def test_build_chart_points_line_with_datetime_axis() -> None:
+    frame = pd.DataFrame(
+        {
+            "day": pd.date_range("2024-01-01", periods=500, freq="D"),
+            "value": np.sin(np.linspace(0, 10, 500)),
+        }
+    ).sample(frac=1, random_state=0)
+
+    points, source_points = build_chart_points(
+        frame, kind="line", x="day", y="value", max_points=20
+    )
+
+    assert source_points == 500
+    assert len(points) == 20
+    assert points[0]["x"].startswith("2024-01-01")
+    assert [point["x"] for point in points] == sorted(point["x"] for point in points)
+
+
+def test_build_chart_points_accepts_the_same_column_on_both_axes() -> None:
+    frame = pd.DataFrame({"a": [3.0, 1.0, 2.0, None]})
+
+    points, source_points = build_chart_points(
+        frame, kind="line", x="a", y="a", max_points=10
+    )
+
+    assert source_points == 3
+    assert points == [{"x": 1.0, "y": 1.0}, {"x": 2.0, "y": 2.0}, {"x": 3.0, "y": 3.0}]
+
+
+def test_build_chart_points_drops_infinite_values() -> None:
+    frame = pd.DataFrame(
+        {
+            "a": [1.0, np.inf, 2.0, -np.inf, 3.0] * 100,
+            "b": [1.0, 2.0, np.inf, 4.0, 5.0] * 100,
+        }
+    )
+
+    bars, histogram_points = build_chart_points(
+        frame, kind="histogram", x="a", y=None, max_points=10, bins=4
+    )
+    points, scatter_points = build_chart_points(
+        frame, kind="scatter", x="a", y="b", max_points=16
+    )
+
+    assert histogram_points == 300
+    assert sum(bar["count"] for bar in bars) == 300
+    assert scatter_points == 200
+    assert sum(point["count"] for point in points) == 200
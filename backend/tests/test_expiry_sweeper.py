@@ -0,0 +1,158 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, Mock
+
+from app.services import metastore_service as metastore_module
+from app.services.expiry_sweeper import ExpirySweeper
+from app.services.metastore_service import ExpiredDatasetRecord, MetastoreService
+
+
+NOW = datetime(2026, 3, 20, tzinfo=UTC)
+
+
+def build_expired(count: int, start: int = 0) -> list[ExpiredDatasetRecord]:
+    return [
+        ExpiredDatasetRecord(
+            dataset_id=f"ds_{index}",
+            storage_key_raw=f"raw/ds_{index}.csv",
+            created_at=NOW - timedelta(days=30, seconds=-index),
+        )
+        for index in range(start, start + count)
+    ]
+
+
+def build_sweeper(metastore: Mock, storage: Mock, **kwargs: object) -> ExpirySweeper:
+    options = {
+        "expiry_days": 7,
+        "batch_size": 2,
+        "max_deletes_per_second": 0,
+        "now": lambda: NOW,
+    }
+    options.update(kwargs)
+    return ExpirySweeper(metastore_service=metastore, storage_service=storage, **options)
+
+
+def test_sweep_deletes_expired_datasets_in_batches() -> None:
+    metastore = Mock()
+    metastore.list_expired_datasets.side_effect = [build_expired(2), build_expired(1, start=2)]
+    metastore.delete_datasets_metadata.side_effect = lambda ids: ids
+    storage = Mock()
+    storage.delete_objects.return_value = []
+    frame_cache = Mock()
+    sweeper = build_sweeper(metastore, storage, frame_cache=frame_cache)
+
+    assert sweeper.sweep_once() == 3
+
+    cutoff = NOW - timedelta(days=7)
+    assert metastore.list_expired_datasets.call_args.args == (cutoff,)
+    assert metastore.list_expired_datasets.call_args.kwargs == {
+        "limit": 2,
+        "after": (NOW - timedelta(days=30, seconds=-1), "ds_1"),
+    }
+    assert storage.delete_objects.call_args_list[0].kwargs == {
+        "keys": ["raw/ds_0.csv", "raw/ds_1.csv"]
+    }
+    assert metastore.delete_datasets_metadata.call_args_list[1].args == (["ds_2"],)
+    assert frame_cache.invalidate.call_count == 3
+    stats = sweeper.stats()
+    assert stats["batches"] == 2
+    assert stats["datasets_deleted"] == 3
+    assert stats["objects_deleted"] == 3
+    assert stats["runs"] == 1
+
+
+def test_sweep_moves_past_rows_whose_objects_were_not_deleted() -> None:
+    metastore = Mock()
+    metastore.list_expired_datasets.side_effect = [
+        build_expired(2),
+        build_expired(2, start=2),
+        build_expired(1, start=4),
+        build_expired(2),
+        [],
+    ]
+    metastore.delete_datasets_metadata.side_effect = lambda ids: ids
+    storage = Mock()
+    storage.delete_objects.side_effect = lambda keys: [
+        key for key in keys if key in {"raw/ds_0.csv", "raw/ds_1.csv"}
+    ]
+    sweeper = build_sweeper(metastore, storage)
+
+    # Both rows of the first batch fail, yet the rows behind them go.
+    assert sweeper.sweep_once() == 3
+    assert metastore.delete_datasets_metadata.call_args_list[0].args == ([],)
+    calls = metastore.list_expired_datasets.call_args_list
+    assert [call.kwargs["after"] for call in calls] == [
+        None,
+        (NOW - timedelta(days=30, seconds=-1), "ds_1"),
+        (NOW - timedelta(days=30, seconds=-3), "ds_3"),
+    ]
+    assert sweeper.stats()["object_failures"] == 2
+
+    # The next run starts over and retries the kept rows.
+    storage.delete_objects.side_effect = lambda keys: []
+    assert sweeper.sweep_once() == 2
+    assert metastore.list_expired_datasets.call_args_list[3].kwargs["after"] is None
+
+
+def test_sweep_resumes_where_a_capped_run_stopped() -> None:
+    metastore = Mock()
+    metastore.list_expired_datasets.side_effect = (
+        lambda cutoff, limit, after: build_expired(limit)
+    )
+    metastore.delete_datasets_metadata.side_effect = lambda ids: ids
+    storage = Mock()
+    storage.delete_objects.return_value = []
+    sweeper = build_sweeper(metastore, storage, max_batches_per_run=1)
+
+    sweeper.sweep_once()
+    sweeper.sweep_once()
+
+    assert metastore.list_expired_datasets.call_args.kwargs["after"] == (
+        NOW - timedelta(days=30, seconds=-1),
+        "ds_1",
+    )
+
+
+def test_sweep_deletes_metadata_only_when_storage_is_disabled() -> None:
+    metastore = Mock()
+    metastore.list_expired_datasets.side_effect = [build_expired(1)]
+    metastore.delete_datasets_metadata.side_effect = lambda ids: ids
+    storage = Mock()
+    sweeper = build_sweeper(metastore, storage, storage_enabled=False)
+
+    assert sweeper.sweep_once() == 1
+
+    storage.delete_objects.assert_not_called()
+    assert metastore.delete_datasets_metadata.call_args.args == (["ds_0"],)
+    assert sweeper.stats()["objects_deleted"] == 0
+
+
+def test_sweep_stops_after_max_batches_and_records_errors() -> None:
+    metastore = Mock()
+    metastore.list_expired_datasets.side_effect = (
+        lambda cutoff, limit, after: build_expired(limit)
+    )
+    metastore.delete_datasets_metadata.side_effect = lambda ids: ids
+    storage = Mock()
+    storage.delete_objects.return_value = []
+    sweeper = build_sweeper(metastore, storage, max_batches_per_run=3)
+
+    assert sweeper.sweep_once() == 6
+    assert metastore.list_expired_datasets.call_count == 3
+
+    metastore.list_expired_datasets.side_effect = RuntimeError("database unavailable")
+    assert sweeper.sweep_once() == 0
+    assert sweeper.stats()["errors"] == 1
+
+
+def test_metastore_batch_delete_uses_one_statement() -> None:
+    pool = MagicMock()
+    cursor = pool.connection.return_value.__enter__.return_value.cursor.return_value
+    cursor.__enter__.return_value.fetchall.return_value = [("ds_a",)]
+    service = MetastoreService(database_url="postgresql://demo", pool=pool)
+
+    deleted = service.delete_datasets_metadata(["ds_a", "ds_missing"])
+
+    assert deleted == ["ds_a"]
+    query, params = cursor.__enter__.return_value.execute.call_args.args
+    assert query == metastore_module.DELETE_DATASETS_QUERY
+    assert params == (["ds_a", "ds_missing"],)
@@ -0,0 +1,70 @@
+import pytest
+
+from app.services.local_storage_service import LocalFileStorageService
+
+
+def test_put_get_and_range_reads(tmp_path) -> None:
+    storage = LocalFileStorageService(root=tmp_path, bucket="thinkabit-raw")
+    key = "raw/2026/03/19/ds_demo/sample.csv"
+
+    storage.put_object(file_bytes=b"a,b\n1,2\n3,4\n", key=key, content_type="text/csv")
+
+    assert (tmp_path / "thinkabit-raw" / key).read_bytes() == b"a,b\n1,2\n3,4\n"
+    assert list((tmp_path / "thinkabit-raw" / "raw/2026/03/19/ds_demo").iterdir()) == [
+        tmp_path / "thinkabit-raw" / key
+    ]
+    assert storage.get_object(key=key) == b"a,b\n1,2\n3,4\n"
+    assert storage.get_object_range(key=key, start=4, end=6) == b"1,2"
+    assert storage.get_object_range(key=key, start=8) == b"3,4\n"
+    assert b"".join(storage.iter_object(key=key, chunk_size=5)) == b"a,b\n1,2\n3,4\n"
+
+
+def test_range_reads_clamp_to_the_object_and_streams_are_chunked(tmp_path) -> None:
+    storage = LocalFileStorageService(root=tmp_path, bucket="raw")
+    storage.put_object(file_bytes=b"0123456789", key="digits.csv", content_type="text/csv")
+
+    assert storage.get_object_range(key="digits.csv", start=7, end=99) == b"789"
+    assert storage.get_object_range(key="digits.csv", start=10) == b""
+    assert storage.get_object_range(key="digits.csv", start=5, end=4) == b""
+    assert list(storage.iter_object(key="digits.csv", chunk_size=4)) == [
+        b"0123",
+        b"4567",
+        b"89",
+    ]
+    with pytest.raises(FileNotFoundError):
+        storage.get_object_range(key="missing.csv", start=0)
+    with pytest.raises(FileNotFoundError):
+        list(storage.iter_object(key="missing.csv"))
+
+
+def test_empty_objects_and_overwrites(tmp_path) -> None:
+    storage = LocalFileStorageService(root=tmp_path, bucket="raw")
+
+    storage.put_object(file_bytes=b"", key="empty.csv", content_type="text/csv")
+    assert storage.get_object(key="empty.csv") == b""
+    assert list(storage.iter_object(key="empty.csv")) == []
+
+    storage.put_object(file_bytes=b"old", key="data.csv", content_type="text/csv")
+    storage.put_object(file_bytes=b"new", key="data.csv", content_type="text/csv")
+    assert storage.get_object(key="data.csv") == b"new"
+
+
+def test_delete_prunes_empty_directories(tmp_path) -> None:
+    storage = LocalFileStorageService(root=tmp_path, bucket="raw")
+    storage.put_object(file_bytes=b"x", key="raw/2026/ds_a/a.csv", content_type="text/csv")
+    storage.put_object(file_bytes=b"y", key="raw/2026/ds_b/b.csv", content_type="text/csv")
+
+    storage.delete_object(key="raw/2026/ds_a/a.csv")
+    assert storage.delete_objects(keys=["raw/2026/ds_b/b.csv", "raw/missing.csv"]) == []
+
+    assert list((tmp_path / "raw").iterdir()) == []
+    with pytest.raises(FileNotFoundError):
+        storage.get_object(key="raw/2026/ds_a/a.csv")
+
+
+def test_rejects_keys_outside_the_root(tmp_path) -> None:
+    storage = LocalFileStorageService(root=tmp_path, bucket="raw")
+
+    with pytest.raises(ValueError):
+        storage.put_object(file_bytes=b"x", key="../escape.csv", content_type="text/csv")
+
@@ -0,0 +1,335 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+from app.services import metastore_service as metastore_module
+from app.services.metadata_write_behind import MetadataWriteBehind
+from app.services.metastore_service import DatasetInsertRecord, MetastoreService
+
+
+def build_record(dataset_id: str, session_id: str | None = "session-1") -> DatasetInsertRecord:
+    return DatasetInsertRecord(
+        dataset_id=dataset_id,
+        parse_status="parsed",
+        session_id=session_id,
+        original_filename=f"{dataset_id}.csv",
+        extension="csv",
+        mime_type="text/csv",
+        size_bytes=10,
+        row_count=2,
+        column_count=1,
+        schema_json=[{"name": "value", "type": "integer", "position": 0}],
+        storage_key_raw=f"raw/{dataset_id}.csv",
+        profile_json={"columns": []},
+    )
+
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        time.sleep(0.005)
+
+
+def test_write_behind_flushes_in_bounded_batches(tmp_path) -> None:
+    batches: list[list[str]] = []
+    queue = MetadataWriteBehind(
+        lambda records: batches.append([record.dataset_id for record in records]),
+        record_type=DatasetInsertRecord,
+        max_batch_size=2,
+        flush_interval=0.05,
+        spill_path=tmp_path / "spill.jsonl",
+    )
+
+    for index in range(5):
+        queue.submit(build_record(f"ds_{index}"))
+    wait_for(lambda: queue.stats()["flushed"] == 5)
+
+    assert [dataset_id for batch in batches for dataset_id in batch] == [
+        f"ds_{index}" for index in range(5)
+    ]
+    assert max(len(batch) for batch in batches) == 2
+    assert queue.stats()["flushed"] == 5
+    queue.close()
+
+
+def test_metastore_reads_queued_rows_and_deletes_them(tmp_path) -> None:
+    release = threading.Event()
+    queue = MetadataWriteBehind(
+        lambda records: release.wait(),
+        record_type=DatasetInsertRecord,
+        max_batch_size=100,
+        flush_interval=60,
+        spill_path=tmp_path / "spill.jsonl",
+    )
+    pool = MagicMock()
+    service = MetastoreService(database_url="postgresql://demo", pool=pool, write_behind=queue)
+
+    service.insert_dataset_metadata(build_record("ds_pending"))
+    metadata = service.get_dataset_metadata("ds_pending")
+    preview_source = service.get_dataset_preview_source("ds_pending")
+    profile = service.get_dataset_profile("ds_pending")
+
+    assert metadata is not None
+    assert profile.profile_json == {"columns": []}
+    assert metadata.original_filename == "ds_pending.csv"
+    assert preview_source.storage_key_raw == "raw/ds_pending.csv"
+    pool.connection.assert_not_called()
+
+    connection = pool.connection.return_value.__enter__.return_value
+    connection.cursor.return_value.__enter__.return_value.rowcount = 0
+    assert service.delete_dataset_metadata("ds_pending") is True
+    assert queue.pending("ds_pending") is None
+    release.set()
+    queue.close()
+
+
+def test_failed_batches_stay_queued_and_back_off(tmp_path) -> None:
+    attempts: list[float] = []
+    database_up = threading.Event()
+    written: list[str] = []
+
+    def flush(records: list[DatasetInsertRecord]) -> None:
+        if not database_up.is_set():
+            attempts.append(time.monotonic())
+            raise RuntimeError("database unavailable")
+        written.extend(record.dataset_id for record in records)
+
+    queue = MetadataWriteBehind(
+        flush,
+        record_type=DatasetInsertRecord,
+        max_batch_size=10,
+        flush_interval=0.01,
+        retry_backoff=0.05,
+        spill_path=tmp_path / "spill.jsonl",
+    )
+    queue.submit(build_record("ds_a"))
+    queue.submit(build_record("ds_b"))
+    wait_for(lambda: len(attempts) >= 3)
+
+    assert attempts[1] - attempts[0] >= 0.05
+    assert attempts[2] - attempts[1] >= 0.1
+    assert queue.pending("ds_a").storage_key_raw == "raw/ds_a.csv"
+    assert [record.dataset_id for record in queue.pending_for_session("session-1")] == [
+        "ds_a",
+        "ds_b",
+    ]
+
+    database_up.set()
+    wait_for(lambda: queue.stats()["pending"] == 0)
+    assert written == ["ds_a", "ds_b"]
+    assert queue.stats()["failures"] >= 3
+    queue.close()
+
+
+def test_full_queue_falls_back_to_a_direct_insert(tmp_path) -> None:
+    queue = MetadataWriteBehind(
+        lambda records: None,
+        record_type=DatasetInsertRecord,
+        max_batch_size=2,
+        max_queue_size=2,
+        flush_interval=60,
+        spill_path=tmp_path / "spill.jsonl",
+    )
+    # Hold the flush thread off so the queue stays full.
+    queue._flush_lock.acquire()
+    pool = MagicMock()
+    cursor = pool.connection.return_value.__enter__.return_value.cursor.return_value
+    service = MetastoreService(database_url="postgresql://demo", pool=pool, write_behind=queue)
+
+    for dataset_id in ("ds_a", "ds_b", "ds_c"):
+        service.insert_dataset_metadata(build_record(dataset_id))
+
+    query, params = cursor.__enter__.return_value.execute.call_args.args
+    assert query == metastore_module.INSERT_DATASET_QUERY
+    assert params[0] == "ds_c"
+    assert queue.pending("ds_c") is None
+    assert queue.stats()["overflowed"] == 1
+    queue._flush_lock.release()
+    queue.close()
+
+
+def test_queued_rows_are_written_with_the_created_at_they_were_served_with(
+    tmp_path,
+) -> None:
+    release = threading.Event()
+    written: list[DatasetInsertRecord] = []
+
+    def flush(records: list[DatasetInsertRecord]) -> None:
+        release.wait()
+        written.extend(records)
+
+    queue = MetadataWriteBehind(
+        flush,
+        record_type=DatasetInsertRecord,
+        flush_interval=0.01,
+        spill_path=tmp_path / "spill.jsonl",
+    )
+    service = MetastoreService(
+        database_url="postgresql://demo", pool=MagicMock(), write_behind=queue
+    )
+
+    service.insert_dataset_metadata(build_record("ds_a"))
+    served = service.get_dataset_metadata("ds_a")
+    release.set()
+    queue.close()
+
+    assert served.created_at is not None
+    assert served.updated_at == served.created_at
+    assert written[0].created_at == served.created_at
+
+
+def test_close_spills_what_it_cannot_write_and_replay_writes_it(tmp_path) -> None:
+    spill_path = tmp_path / "spill.jsonl"
+
+    def fail(records: list[DatasetInsertRecord]) -> None:
+        raise RuntimeError("database unavailable")
+
+    failing = MetadataWriteBehind(
+        fail, record_type=DatasetInsertRecord, flush_interval=60, spill_path=spill_path
+    )
+    failing.submit(build_record("ds_a"))
+    submitted = failing.pending("ds_a")
+    failing.close()
+
+    assert '"dataset_id": "ds_a"' in spill_path.read_text(encoding="utf-8")
+    assert failing.stats()["spilled"] == 1
+
+    # A replay that fails leaves the rows in the spill file.
+    retry = MetadataWriteBehind(fail, record_type=DatasetInsertRecord, spill_path=spill_path)
+    with pytest.raises(RuntimeError):
+        retry.replay_spill()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["spill.jsonl"]
+
+    replayed: list[DatasetInsertRecord] = []
+    recovered = MetadataWriteBehind(
+        replayed.extend, record_type=DatasetInsertRecord, spill_path=spill_path
+    )
+
+    assert recovered.replay_spill() == 1
+    assert replayed == [submitted]
+    assert list(tmp_path.iterdir()) == []
+    assert recovered.replay_spill() == 0
+
+
+def test_rejected_rows_do_not_take_the_batch_with_them(tmp_path, caplog) -> None:
+    written: list[str] = []
+
+    class BadRow(Exception):
+        pass
+
+    def flush(records: list[DatasetInsertRecord]) -> None:
+        if any(record.dataset_id == "ds_bad" for record in records):
+            raise BadRow("value too long")
+        written.extend(record.dataset_id for record in records)
+
+    queue = MetadataWriteBehind(
+        flush,
+        record_type=DatasetInsertRecord,
+        flush_interval=0.01,
+        spill_path=tmp_path / "spill.jsonl",
+        is_transient=lambda exc: not isinstance(exc, BadRow),
+    )
+    with caplog.at_level(logging.ERROR):
+        for dataset_id in ("ds_a", "ds_bad", "ds_b"):
+            queue.submit(build_record(dataset_id))
+        wait_for(lambda: queue.stats()["pending"] == 0)
+
+    assert written == ["ds_a", "ds_b"]
+    stats = queue.stats()
+    assert stats["rejected"] == 1
+    assert stats["flushed"] == 2
+    assert stats["failures"] == 0
+    assert "raw/ds_bad.csv" in caplog.text
+    queue.close()
+
+
+def test_close_flushes_pending_rows(tmp_path) -> None:
+    written: list[str] = []
+    queue = MetadataWriteBehind(
+        lambda records: written.extend(record.dataset_id for record in records),
+        record_type=DatasetInsertRecord,
+        flush_interval=60,
+        spill_path=tmp_path / "spill.jsonl",
+    )
+    queue.submit(build_record("ds_a"))
+    queue.close()
+
+    assert written == ["ds_a"]
+    assert not (tmp_path / "spill.jsonl").exists()
+    with pytest.raises(RuntimeError):
+        queue.submit(build_record("ds_b"))
+
+
+def test_batch_insert_writes_all_rows_in_one_statement(monkeypatch) -> None:
+    calls: list[tuple] = []
+    monkeypatch.setattr(
+        metastore_module,
+        "execute_values",
+        lambda cursor, query, rows, template, page_size: calls.append(
+            (query, rows, template, page_size)
+        ),
+    )
+    pool = MagicMock()
+    service = MetastoreService(database_url="postgresql://demo", pool=pool)
+
+    service.insert_dataset_metadata_batch([build_record("ds_a"), build_record("ds_b")])
+
+    assert pool.connection.call_count == 1
+    query, rows, template, page_size = calls[0]
+    assert "ON CONFLICT (dataset_id) DO NOTHING" in query
+    assert [row[0] for row in rows] == ["ds_a", "ds_b"]
+    assert [len(row) for row in rows] == [14, 14]
+    assert template == metastore_module.INSERT_DATASET_BATCH_VALUES
+    assert page_size == 2
+
+
+def test_session_listing_uses_keyset_and_merges_queued_rows(tmp_path) -> None:
+    queue = MetadataWriteBehind(
+        lambda records: None,
+        record_type=DatasetInsertRecord,
+        flush_interval=60,
+        spill_path=tmp_path / "spill.jsonl",
+    )
+    pool = MagicMock()
+    connection = pool.connection.return_value.__enter__.return_value
+    cursor = connection.cursor.return_value.__enter__.return_value
+    flushed_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    cursor.fetchall.return_value = [
+        ("ds_old", "ready", "session-1", "old.csv", "csv", "text/csv", 10, 2, 1)
+        + (flushed_at, flushed_at)
+    ]
+    service = MetastoreService(database_url="postgresql://demo", pool=pool, write_behind=queue)
+    queue.submit(build_record("ds_new"))
+    queue.submit(build_record("ds_other", session_id="session-2"))
+
+    records = service.list_session_datasets("session-1", limit=10)
+
+    assert [record.dataset_id for record in records] == ["ds_new", "ds_old"]
+    query, params = cursor.execute.call_args.args
+    assert query == metastore_module.SESSION_DATASETS_QUERY
+    assert "schema_json" not in query
+    assert params == ("session-1", 10)
+
+    records = service.list_session_datasets(
+        "session-1", limit=10, after=(records[0].created_at, "ds_new")
+    )
+
+    assert [record.dataset_id for record in records] == ["ds_old"]
+    query, params = cursor.execute.call_args.args
+    assert query == metastore_module.SESSION_DATASETS_AFTER_QUERY
+    assert params[0] == "session-1"
+    queue.close()
+
+
+def test_only_connection_errors_count_as_transient() -> None:
+    assert metastore_module.is_transient_metastore_error(psycopg2.OperationalError("gone"))
+    assert metastore_module.is_transient_metastore_error(RuntimeError("pool timeout"))
+    assert not metastore_module.is_transient_metastore_error(psycopg2.IntegrityError("dup"))
+    assert not metastore_module.is_transient_metastore_error(psycopg2.DataError("too long"))
@@ -0,0 +1,142 @@
+import os
+from unittest.mock import Mock
+
+from botocore.exceptions import ClientError
+
+from app.services.object_cache import DiskObjectCache
+from app.services.storage_service import S3StorageService
+
+
+def build_storage(cache: DiskObjectCache) -> tuple[S3StorageService, Mock]:
+    storage = S3StorageService(
+        endpoint="http://localhost:19000",
+        access_key="minioadmin",
+        secret_key="minioadmin",
+        bucket="thinkabit-raw",
+        secure=False,
+        auto_create_bucket=False,
+        object_cache=cache,
+    )
+    client = Mock()
+    storage._client = client
+    storage._bucket_ready = True
+    return storage, client
+
+
+def not_modified_error() -> ClientError:
+    return ClientError(
+        {"Error": {"Code": "304"}, "ResponseMetadata": {"HTTPStatusCode": 304}},
+        "GetObject",
+    )
+
+
+def test_cache_round_trip_counts_hits_and_bytes_saved(tmp_path) -> None:
+    cache = DiskObjectCache(root=tmp_path, max_bytes=1024)
+
+    assert cache.get(key="raw/a.csv", etag='"abc"') is None
+    cache.put(key="raw/a.csv", etag='"abc"', data=b"a,b\n1,2\n")
+
+    assert cache.lookup_etag(key="raw/a.csv") == '"abc"'
+    assert cache.get(key="raw/a.csv", etag='"abc"') == b"a,b\n1,2\n"
+    assert cache.get(key="raw/a.csv", etag='"other"') is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["bytes_saved"] == 8
+    assert not [entry for entry in tmp_path.iterdir() if entry.name.startswith(".tmp-")]
+
+
+def test_cache_put_replaces_previous_etag_version(tmp_path) -> None:
+    cache = DiskObjectCache(root=tmp_path, max_bytes=1024)
+
+    cache.put(key="raw/a.csv", etag='"v1"', data=b"old")
+    cache.put(key="raw/a.csv", etag='"v2"', data=b"new")
+
+    assert cache.lookup_etag(key="raw/a.csv") == '"v2"'
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path) -> None:
+    cache = DiskObjectCache(root=tmp_path, max_bytes=14)
+
+    cache.put(key="first", etag='"1"', data=b"aaaa")
+    cache.put(key="second", etag='"2"', data=b"bbbb")
+    cache.get(key="first", etag='"1"')
+
+    cache.put(key="third", etag='"3"', data=b"cccc")
+
+    assert cache.lookup_etag(key="first") == '"1"'
+    assert cache.lookup_etag(key="second") is None
+    assert cache.lookup_etag(key="third") == '"3"'
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_index_is_loaded_once_and_never_rescans(tmp_path, monkeypatch) -> None:
+    writer = DiskObjectCache(root=tmp_path, max_bytes=1024)
+    writer.put(key="old", etag='"1"', data=b"aaaa")
+    writer.put(key="new", etag='"2"', data=b"bbbb")
+    os.utime(tmp_path / writer._key_digest("old"), (1, 1))
+    (tmp_path / "notes.txt").write_bytes(b"x")
+
+    cache = DiskObjectCache(root=tmp_path, max_bytes=14)
+
+    def no_listing(*args: object, **kwargs: object) -> None:
+        raise AssertionError("the cache directory was listed")
+
+    monkeypatch.setattr(type(tmp_path), "iterdir", no_listing)
+    monkeypatch.setattr(type(tmp_path), "glob", no_listing)
+    assert cache.lookup_etag(key="old") == '"1"'
+    assert cache.stats()["size_bytes"] == 12
+
+    cache.put(key="third", etag='"3"', data=b"cccc")
+
+    assert cache.lookup_etag(key="old") is None
+    assert cache.lookup_etag(key="new") == '"2"'
+    assert cache.stats()["size_bytes"] == 12
+    assert cache.stats()["evictions"] == 1
+    assert (tmp_path / "notes.txt").read_bytes() == b"x"
+
+
+def test_cache_finds_entries_written_by_another_worker(tmp_path) -> None:
+    cache = DiskObjectCache(root=tmp_path, max_bytes=1024)
+    other_worker = DiskObjectCache(root=tmp_path, max_bytes=1024)
+
+    other_worker.put(key="raw/a.csv", etag='"abc"', data=b"a,b\n")
+
+    assert cache.lookup_etag(key="raw/a.csv") == '"abc"'
+    assert cache.get(key="raw/a.csv", etag='"abc"') == b"a,b\n"
+    other_worker.discard(key="raw/a.csv")
+    assert cache.get(key="raw/a.csv", etag='"abc"') is None
+    assert cache.stats()["size_bytes"] == 0
+
+
+def test_storage_get_object_serves_cached_copy_on_not_modified(tmp_path) -> None:
+    cache = DiskObjectCache(root=tmp_path, max_bytes=1024)
+    storage, client = build_storage(cache)
+    body = Mock()
+    body.read.return_value = b"name,score\nAlice,90\n"
+    client.get_object.side_effect = [
+        {"Body": body, "ETag": '"etag1"'},
+        not_modified_error(),
+    ]
+
+    assert storage.get_object(key="raw/demo.csv") == b"name,score\nAlice,90\n"
+    assert storage.get_object(key="raw/demo.csv") == b"name,score\nAlice,90\n"
+
+    assert client.get_object.call_args_list[1].kwargs["IfNoneMatch"] == '"etag1"'
+    assert body.read.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_storage_delete_object_discards_cached_copy(tmp_path) -> None:
+    cache = DiskObjectCache(root=tmp_path, max_bytes=1024)
+    storage, client = build_storage(cache)
+    client.put_object.return_value = {"ETag": '"etag1"'}
+
+    storage.put_object(file_bytes=b"a,b\n", key="raw/demo.csv", content_type="text/csv")
+    assert cache.lookup_etag(key="raw/demo.csv") == '"etag1"'
+
+    storage.delete_object(key="raw/demo.csv")
+
+    assert cache.lookup_etag(key="raw/demo.csv") is None
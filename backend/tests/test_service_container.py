@@ -0,0 +1,79 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as main_module
+from app.main import app
+from app.services import chat_services
+from app.services import service_container as container_module
+from app.services.service_container import ServiceContainer
+
+
+def build_container(*, storage_enabled: bool = True) -> ServiceContainer:
+    upload_service = Mock(storage_enabled=storage_enabled)
+    upload_service.metastore_service.write_behind = None
+    upload_service.async_metastore_service = Mock(close=AsyncMock())
+    return ServiceContainer(upload_service=upload_service, expiry_sweeper=Mock())
+
+
+def test_lifespan_builds_the_container_and_routes_inject_it(monkeypatch) -> None:
+    services = build_container()
+    services.metastore_service.get_dataset_metadata.return_value = None
+    monkeypatch.setattr(main_module, "get_service_container", lambda: services)
+    for name in ("close_shared_write_behinds", "close_shared_pools", "shutdown_storage_io"):
+        monkeypatch.setattr(container_module, name, lambda: None)
+
+    with TestClient(app) as client:
+        assert app.state.services is services
+        response = client.get("/api/v1/datasets/ds_missing")
+
+    assert response.status_code == 404
+    services.metastore_service.get_dataset_metadata.assert_called_once_with("ds_missing")
+    services.expiry_sweeper.stop.assert_called_once_with()
+
+
+def test_startup_warms_clients_once_and_survives_backend_errors() -> None:
+    services = build_container()
+    services.metastore_service.warm_up.side_effect = RuntimeError("database unavailable")
+
+    asyncio.run(services.startup())
+
+    services.storage_service.warm_up.assert_called_once_with()
+    services.metastore_service.warm_up.assert_called_once_with()
+
+    disabled = build_container(storage_enabled=False)
+    asyncio.run(disabled.startup())
+    disabled.storage_service.warm_up.assert_not_called()
+
+
+def test_shutdown_closes_shared_resources(monkeypatch) -> None:
+    calls = []
+    monkeypatch.setattr(
+        container_module, "close_shared_write_behinds", lambda: calls.append("write_behind")
+    )
+    monkeypatch.setattr(container_module, "close_shared_pools", lambda: calls.append("pools"))
+    monkeypatch.setattr(container_module, "shutdown_storage_io", lambda: calls.append("io"))
+    services = build_container()
+
+    asyncio.run(services.shutdown())
+
+    services.expiry_sweeper.stop.assert_called_once_with()
+    services.upload_service.async_metastore_service.close.assert_awaited_once()
+    assert calls == ["write_behind", "pools", "io"]
+
+
+def test_chat_context_reuses_the_shared_services(monkeypatch) -> None:
+    upload_service = Mock()
+    upload_service.metastore_service.get_dataset_descriptor.return_value = None
+    monkeypatch.setattr(
+        container_module, "_container", ServiceContainer(upload_service, Mock())
+    )
+
+    with pytest.raises(ValueError):
+        chat_services.inspect_uploaded_dataset("ds_missing", "sess_1")
+
+    upload_service.metastore_service.get_dataset_descriptor.assert_called_once_with(
+        "ds_missing"
+    )
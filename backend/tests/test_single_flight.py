@@ -0,0 +1,155 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from app.services.dataset_cache import DatasetFrameCache
+from app.services.metastore_service import MetastoreService
+from app.services.single_flight import SingleFlight
+from app.services.upload_service import UploadService
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def slow_fetch() -> str:
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        leader = pool.submit(flight.do, "key", slow_fetch)
+        started.wait()
+        followers = [pool.submit(flight.do, "key", slow_fetch) for _ in range(7)]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "shared": 7, "in_flight": 0}
+
+
+def test_followers_receive_the_leaders_exception() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing_fetch() -> None:
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "key", failing_fetch)
+        started.wait()
+        follower = pool.submit(flight.do, "key", failing_fetch)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result()
+
+    assert flight.do("key", lambda: "retried") == "retried"
+
+
+def test_concurrent_dataset_loads_read_and_parse_once() -> None:
+    storage = Mock()
+
+    def slow_get_object(*, key: str) -> bytes:
+        time.sleep(0.1)
+        return b"name,score\nAlice,90\n"
+
+    storage.get_object.side_effect = slow_get_object
+    service = UploadService(
+        storage_service=storage,
+        metastore_service=Mock(),
+        frame_cache=DatasetFrameCache(max_entries=4, max_bytes=1024 * 1024),
+    )
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [
+            pool.submit(service.load_dataset, storage_key="raw/a.csv", extension="csv")
+            for _ in range(6)
+        ]
+        datasets = [future.result() for future in futures]
+
+    assert storage.get_object.call_count == 1
+    assert all(dataset is datasets[0] for dataset in datasets)
+
+
+def test_projected_loads_parse_only_requested_columns_by_normalized_name() -> None:
+    storage = Mock()
+    storage.get_object.return_value = b" id ,a,a,,b\n1,2,3,4,5\n6,7,8,9,10\n"
+    service = UploadService(
+        storage_service=storage,
+        metastore_service=Mock(),
+        frame_cache=DatasetFrameCache(max_entries=4, max_bytes=1024 * 1024),
+    )
+    full_columns = service.parse_dataset_bytes(
+        content=storage.get_object.return_value, extension="csv"
+    ).columns.tolist()
+
+    projected = service.load_dataset(
+        storage_key="raw/a.csv", extension="csv", columns=["id", full_columns[2]]
+    )
+    subset = service.load_dataset(storage_key="raw/a.csv", extension="csv", columns=["id"])
+    widened = service.load_dataset(
+        storage_key="raw/a.csv", extension="csv", columns=[full_columns[3]]
+    )
+    full = service.load_dataset(storage_key="raw/a.csv", extension="csv")
+
+    assert projected.dataframe.to_dict("list") == {"id": [1, 6], full_columns[2]: [3, 8]}
+    assert subset is projected
+    assert widened.dataframe.columns.tolist() == ["id", full_columns[2], full_columns[3]]
+    assert full.dataframe.columns.tolist() == full_columns
+    assert storage.get_object.call_count == 3
+    assert service.load_dataset(storage_key="raw/a.csv", extension="csv", columns=["b"]) is full
+
+
+def test_projection_with_no_known_columns_caches_the_full_frame() -> None:
+    storage = Mock()
+    storage.get_object.return_value = b"id,score\n1,90\n2,85\n"
+    service = UploadService(
+        storage_service=storage,
+        metastore_service=Mock(),
+        frame_cache=DatasetFrameCache(max_entries=4, max_bytes=1024 * 1024),
+    )
+
+    unknown = service.load_dataset(storage_key="raw/a.csv", extension="csv", columns=["missing"])
+
+    assert unknown.columns is None
+    assert unknown.dataframe.columns.tolist() == ["id", "score"]
+    assert service.load_dataset(storage_key="raw/a.csv", extension="csv") is unknown
+    assert storage.get_object.call_count == 1
+
+
+def test_metadata_schema_and_preview_reads_share_one_descriptor_query(monkeypatch) -> None:
+    metastore = MetastoreService(database_url="postgresql://unused", write_behind_enabled=False)
+    started = threading.Event()
+    fetched = []
+
+    def slow_fetch(dataset_id: str) -> Mock:
+        fetched.append(dataset_id)
+        started.set()
+        time.sleep(0.1)
+        return Mock()
+
+    monkeypatch.setattr(metastore, "_fetch_dataset_descriptor", slow_fetch)
+    readers = [
+        metastore.get_dataset_metadata,
+        metastore.get_dataset_schema,
+        metastore.get_dataset_preview_source,
+    ]
+
+    with ThreadPoolExecutor(max_workers=7) as pool:
+        leader = pool.submit(metastore.get_dataset_metadata, "ds_001")
+        started.wait()
+        followers = [pool.submit(read, "ds_001") for read in readers * 2]
+        for future in [leader, *followers]:
+            future.result()
+
+    assert fetched == ["ds_001"]
+    assert metastore.descriptor_flight.stats()["shared"] == 6
+    assert metastore.get_dataset_schema("ds_001") is not None
+    assert fetched == ["ds_001"]
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from app.services import profile_service
+from app.services.profile_service import (
+    approximate_quantiles,
+    build_dataset_profile,
+    merge_column_sketches,
+)
+from app.services.sketches import HyperLogLog, KLLSketch, hash_values, hashable_values
+
+
+def test_hyperloglog_estimates_and_merges_distinct_counts() -> None:
+    rng = np.random.default_rng(0)
+    left = pd.Series(rng.integers(0, 60_000, 200_000))
+    right = pd.Series(rng.integers(40_000, 100_000, 200_000))
+
+    left_sketch = HyperLogLog()
+    left_sketch.add_hashes(hash_values(left))
+    right_sketch = HyperLogLog()
+    right_sketch.add_hashes(hash_values(right))
+    merged = HyperLogLog.from_json(left_sketch.merge(right_sketch).to_json())
+
+    exact = pd.concat([left, right]).nunique()
+    assert abs(merged.estimate() - exact) / exact < 0.05
+
+
+def test_kll_quantiles_are_exact_for_small_inputs() -> None:
+    sketch = KLLSketch()
+    sketch.add(np.array([80.0, 90.0, np.nan]))
+
+    assert sketch.exact
+    assert sketch.quantiles([0.0, 0.5, 1.0]) == [80.0, 85.0, 90.0]
+
+
+def test_kll_merge_keeps_rank_error_small() -> None:
+    values = np.random.default_rng(1).normal(size=200_000)
+    left, right = KLLSketch(), KLLSketch()
+    left.add(values[:120_000])
+    right.add(values[120_000:])
+
+    merged = KLLSketch.from_json(left.merge(right).to_json())
+    ordered = np.sort(values)
+    fractions = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+    assert merged.count == 200_000
+    assert sum(len(level) for level in merged.levels) < 1_000
+    for fraction, estimate in zip(fractions, merged.quantiles(fractions)):
+        rank = np.searchsorted(ordered, estimate) / len(ordered)
+        assert abs(rank - fraction) < 0.02
+
+
+def test_profile_sketches_merge_across_chunks() -> None:
+    frame = pd.DataFrame({"amount": np.arange(10_000, dtype=float)})
+    first = build_dataset_profile(frame.iloc[:6_000], {"amount": "float"})
+    second = build_dataset_profile(frame.iloc[6_000:], {"amount": "float"})
+
+    merged = merge_column_sketches(
+        first["columns"][0]["sketches"], second["columns"][0]["sketches"]
+    )
+
+    assert abs(HyperLogLog.from_json(merged["hll"]).estimate() - 10_000) < 500
+    (median,) = approximate_quantiles(merged, [0.5])
+    assert abs(median - 5_000) < 200
+
+
+def test_long_columns_are_sketched_in_merged_chunks(monkeypatch) -> None:
+    monkeypatch.setattr(profile_service, "SKETCH_CHUNK_ROWS", 3_000)
+    values = np.random.default_rng(2).normal(size=20_000)
+    values[::7] = np.nan
+    frame = pd.DataFrame({"amount": values})
+
+    (column,) = build_dataset_profile(frame, {"amount": "float"})["columns"]
+
+    finite = values[np.isfinite(values)]
+    assert column["sketches"]["kll"]["n"] == finite.size
+    assert abs(column["distinct_count"] - finite.size) / finite.size < 0.05
+    rank = np.searchsorted(np.sort(finite), column["quantiles"]["p50"]) / finite.size
+    assert abs(rank - 0.5) < 0.02
+
+
+def test_hash_values_accepts_nested_cells() -> None:
+    series = pd.Series([{"x": 1}, {"x": 1}, [1, 2], None, "plain"], dtype=object)
+
+    hashes = hash_values(hashable_values(series))
+
+    assert len(hashes) == 4
+    assert hashes[0] == hashes[1]
+    assert len(set(hashes.tolist())) == 3
@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.services.metastore_backends import build_metastore_service
+from app.services.metastore_service import DatasetInsertRecord, MetastoreService
+from app.services.sqlite_metastore_service import SQLiteMetastoreService
+
+
+def build_record(dataset_id: str, session_id: str | None = "sess_abc") -> DatasetInsertRecord:
+    return DatasetInsertRecord(
+        dataset_id=dataset_id,
+        parse_status="ready",
+        session_id=session_id,
+        original_filename=f"{dataset_id}.csv",
+        extension="csv",
+        mime_type="text/csv",
+        size_bytes=14,
+        row_count=2,
+        column_count=1,
+        schema_json=[{"name": "value", "type": "int", "position": 0}],
+        storage_key_raw=f"raw/{dataset_id}.csv",
+        profile_json={"columns": [{"name": "value"}]},
+    )
+
+
+@pytest.fixture()
+def metastore(tmp_path) -> SQLiteMetastoreService:
+    return SQLiteMetastoreService(path=tmp_path / "metastore.sqlite3")
+
+
+def test_round_trips_records_in_wal_mode(metastore: SQLiteMetastoreService) -> None:
+    metastore.insert_dataset_metadata(build_record("ds_a"))
+
+    metadata = metastore.get_dataset_metadata("ds_a")
+    assert metadata.original_filename == "ds_a.csv"
+    assert metadata.created_at.tzinfo is not None
+    assert metastore.get_dataset_schema("ds_a").schema_json == [
+        {"name": "value", "type": "int", "position": 0}
+    ]
+    assert metastore.get_dataset_preview_source("ds_a").storage_key_raw == "raw/ds_a.csv"
+    assert metastore.get_dataset_profile("ds_a").profile_json == {"columns": [{"name": "value"}]}
+    assert metastore.get_dataset_metadata("ds_missing") is None
+    assert metastore.get_dataset_profile("ds_missing") is None
+
+    connection = sqlite3.connect(metastore.path)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    connection.close()
+
+    assert metastore.delete_dataset_metadata("ds_a") is True
+    assert metastore.get_dataset_metadata("ds_a") is None
+    assert metastore.delete_dataset_metadata("ds_a") is False
+
+
+def test_rejects_duplicate_and_invalid_rows(metastore: SQLiteMetastoreService) -> None:
+    metastore.insert_dataset_metadata(build_record("ds_a"))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        metastore.insert_dataset_metadata(build_record("ds_a"))
+    with pytest.raises(sqlite3.IntegrityError):
+        metastore.insert_dataset_metadata(build_record("not_a_dataset_id"))
+
+    metastore.insert_dataset_metadata_batch([build_record("ds_a"), build_record("ds_b")])
+    assert metastore.get_dataset_metadata("ds_b") is not None
+
+
+def test_lists_sessions_with_keyset_pages(metastore: SQLiteMetastoreService) -> None:
+    metastore.insert_dataset_metadata_batch(
+        [build_record(f"ds_{index}") for index in range(5)] + [build_record("ds_x", "sess_x")]
+    )
+
+    first = metastore.list_session_datasets("sess_abc", limit=3)
+    assert [record.dataset_id for record in first] == ["ds_4", "ds_3", "ds_2"]
+
+    second = metastore.list_session_datasets(
+        "sess_abc", limit=3, after=(first[-1].created_at, first[-1].dataset_id)
+    )
+    assert [record.dataset_id for record in second] == ["ds_1", "ds_0"]
+
+
+def test_bulk_owner_lookup_delete_and_expiry(metastore: SQLiteMetastoreService) -> None:
+    metastore.insert_dataset_metadata_batch(
+        [build_record("ds_a"), build_record("ds_b", "sess_other")]
+    )
+
+    owners = metastore.get_dataset_owners(["ds_a", "ds_b", "ds_missing"])
+    assert {dataset_id: owner.session_id for dataset_id, owner in owners.items()} == {
+        "ds_a": "sess_abc",
+        "ds_b": "sess_other",
+    }
+
+    assert metastore.list_expired_datasets(datetime.now(UTC) - timedelta(days=1), limit=10) == []
+    expired = metastore.list_expired_datasets(datetime.now(UTC) + timedelta(seconds=1), limit=1)
+    assert [record.dataset_id for record in expired] == ["ds_a"]
+    after = (expired[0].created_at, expired[0].dataset_id)
+    expired = metastore.list_expired_datasets(
+        datetime.now(UTC) + timedelta(seconds=1), limit=10, after=after
+    )
+    assert [record.dataset_id for record in expired] == ["ds_b"]
+
+    metastore.get_dataset_metadata("ds_b")
+    assert sorted(metastore.delete_datasets_metadata(["ds_a", "ds_b", "ds_missing"])) == [
+        "ds_a",
+        "ds_b",
+    ]
+    assert metastore.get_dataset_metadata("ds_b") is None
+
+
+def test_threads_use_their_own_connections(metastore: SQLiteMetastoreService) -> None:
+    metastore.insert_dataset_metadata(build_record("ds_a"))
+    metastore.descriptor_cache.clear()
+    results = []
+
+    def read() -> None:
+        results.append(metastore.get_dataset_preview_source("ds_a").dataset_id)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["ds_a"] * 4
+
+
+def test_backend_is_chosen_by_database_url() -> None:
+    assert isinstance(build_metastore_service(None), SQLiteMetastoreService)
+    assert isinstance(build_metastore_service("postgresql://demo"), MetastoreService)
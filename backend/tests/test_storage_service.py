@@ -0,0 +1,168 @@
+import asyncio
+import io
+import threading
+from unittest.mock import Mock
+
+from app.services.storage_service import S3StorageService, run_storage_io
+
+
+def build_storage() -> S3StorageService:
+    return S3StorageService(
+        endpoint="http://localhost:19000",
+        access_key="minioadmin",
+        secret_key="minioadmin",
+        bucket="thinkabit-raw",
+        secure=False,
+        auto_create_bucket=False,
+        max_pool_connections=48,
+        connect_timeout=2,
+        read_timeout=15,
+        max_attempts=5,
+        retry_mode="adaptive",
+        tcp_keepalive=True,
+    )
+
+
+def test_client_uses_tuned_botocore_config() -> None:
+    config = build_storage()._client.meta.config
+
+    assert config.max_pool_connections == 48
+    assert config.connect_timeout == 2
+    assert config.read_timeout == 15
+    assert config.retries == {"total_max_attempts": 5, "mode": "adaptive"}
+    assert config.tcp_keepalive is True
+
+
+def test_async_calls_run_concurrently_off_the_event_loop() -> None:
+    storage = build_storage()
+    storage._bucket_ready = True
+    barrier = threading.Barrier(3, timeout=2)
+    loop_thread = threading.get_ident()
+    seen_threads = []
+
+    def get_object(**kwargs: object) -> dict[str, object]:
+        seen_threads.append(threading.get_ident())
+        barrier.wait()
+        body = Mock()
+        body.read.return_value = kwargs["Key"].encode()
+        return {"Body": body}
+
+    storage._client = Mock()
+    storage._client.get_object.side_effect = get_object
+
+    async def fetch_all() -> list[bytes]:
+        return await asyncio.gather(
+            *(run_storage_io(storage.get_object, key=f"raw/{index}.csv") for index in range(3))
+        )
+
+    # All three calls must be in flight at once to get past the barrier.
+    assert asyncio.run(fetch_all()) == [b"raw/0.csv", b"raw/1.csv", b"raw/2.csv"]
+    assert loop_thread not in seen_threads
+
+
+def test_delete_objects_batches_keys_and_reports_failures() -> None:
+    storage = build_storage()
+    storage._bucket_ready = True
+    storage.object_cache = Mock()
+    storage._client = Mock()
+    storage._client.delete_objects.side_effect = [
+        {"Errors": [{"Key": "raw/7", "Code": "AccessDenied"}]},
+        {},
+    ]
+    keys = [f"raw/{index}" for index in range(1500)]
+
+    failed = storage.delete_objects(keys=keys)
+
+    assert failed == ["raw/7"]
+    calls = storage._client.delete_objects.call_args_list
+    assert [len(call.kwargs["Delete"]["Objects"]) for call in calls] == [1000, 500]
+    assert calls[0].kwargs["Delete"]["Quiet"] is True
+    assert storage.object_cache.discard.call_count == 1499
+
+
+def test_text_objects_are_compressed_and_read_back_transparently() -> None:
+    storage = S3StorageService(
+        endpoint="http://localhost:19000",
+        access_key="minioadmin",
+        secret_key="minioadmin",
+        bucket="thinkabit-raw",
+        secure=False,
+        auto_create_bucket=False,
+        compression="zstd",
+    )
+    storage._bucket_ready = True
+    storage._client = Mock()
+    storage._client.put_object.return_value = {"ETag": '"etag"'}
+    csv_bytes = b"name,score\n" + b"Alice,90\nBob,85\n" * 2000
+
+    storage.put_object(file_bytes=csv_bytes, key="raw/sample.csv", content_type="text/csv")
+    storage.put_object(
+        file_bytes=b"PK\x03\x04" * 1000,
+        key="raw/book.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+    csv_call, xlsx_call = storage._client.put_object.call_args_list
+    stored = csv_call.kwargs["Body"]
+    assert len(stored) * 5 < len(csv_bytes)
+    assert csv_call.kwargs["Metadata"] == {"thinkabit-encoding": "zstd"}
+    assert xlsx_call.kwargs["Metadata"] == {}
+    assert storage.compression_stats()["objects"] == 1
+
+    def get_object(**kwargs: object) -> dict[str, object]:
+        return {"Body": io.BytesIO(stored), "Metadata": {"thinkabit-encoding": "zstd"}}
+
+    storage._client.get_object.side_effect = get_object
+    assert storage.get_object(key="raw/sample.csv") == csv_bytes
+    assert storage.get_object_range(key="raw/sample.csv", start=0, end=9) == b"name,score"
+
+    class Body(io.BytesIO):
+        def iter_chunks(self, chunk_size: int):
+            while chunk := self.read(7):
+                yield chunk
+
+    storage._client.get_object.side_effect = lambda **kwargs: {
+        "Body": Body(stored),
+        "Metadata": {"thinkabit-encoding": "zstd"},
+    }
+    assert b"".join(storage.iter_object(key="raw/sample.csv")) == csv_bytes
+
+
+def test_uncompressed_objects_stay_readable_with_compression_on() -> None:
+    storage = build_storage()
+    storage.compression = "gzip"
+    storage._bucket_ready = True
+    storage._client = Mock()
+    storage._client.get_object.return_value = {"Body": io.BytesIO(b"a,b\n1,2\n"), "Metadata": {}}
+
+    assert storage.get_object(key="raw/legacy.csv") == b"a,b\n1,2\n"
+
+
+def test_range_and_stream_reads_of_uncompressed_objects() -> None:
+    storage = build_storage()
+    storage._bucket_ready = True
+    storage._client = Mock()
+    csv_bytes = b"name,score\nAlice,90\nBob,85\n"
+
+    class Body(io.BytesIO):
+        def iter_chunks(self, chunk_size: int):
+            while chunk := self.read(chunk_size):
+                yield chunk
+
+    def get_object(**kwargs: object) -> dict[str, object]:
+        byte_range = str(kwargs.get("Range", "bytes=0-")).removeprefix("bytes=")
+        first, _, last = byte_range.partition("-")
+        end = int(last) + 1 if last else None
+        return {"Body": Body(csv_bytes[int(first) : end]), "Metadata": {}}
+
+    storage._client.get_object.side_effect = get_object
+
+    assert storage.get_object_range(key="raw/sample.csv", start=11, end=18) == b"Alice,90"
+    assert storage.get_object_range(key="raw/sample.csv", start=20) == b"Bob,85\n"
+    assert [call.kwargs["Range"] for call in storage._client.get_object.call_args_list] == [
+        "bytes=11-18",
+        "bytes=20-",
+    ]
+    chunks = list(storage.iter_object(key="raw/sample.csv", chunk_size=10))
+    assert chunks[0] == b"name,score"
+    assert b"".join(chunks) == csv_bytes
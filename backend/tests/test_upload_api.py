@@ -3,10 +3,15 @@ import zipfile
 from datetime import UTC, datetime
 from unittest.mock import Mock
 
+import pandas as pd
+import pytest
 from fastapi.testclient import TestClient
 
 from app.core.config import MAX_FILE_SIZE_BYTES
 from app.api.v1 import upload as upload_module
+from app.services.local_storage_service import LocalFileStorageService
+from app.services.profile_service import build_dataset_profile
+from app.services.service_container import ServiceContainer
 
 
 def build_valid_xlsx_bytes() -> bytes:
@@ -113,7 +118,9 @@ def test_upload_valid_request_returns_structured_response(client: TestClient) ->
     assert payload["warnings"] == []
 
 
-def test_upload_valid_json_object_of_arrays_parses_successfully(client: TestClient) -> None:
+def test_upload_valid_json_object_of_arrays_parses_successfully(
+    client: TestClient
+) -> None:
     files = {
         "file": (
             "sample.json",
@@ -193,7 +200,9 @@ def test_upload_unsafe_filename_returns_error_schema(client: TestClient) -> None
     assert payload["error"]["code"] == "UNSAFE_FILENAME"
 
 
-def test_upload_mime_extension_mismatch_returns_error_schema(client: TestClient) -> None:
+def test_upload_mime_extension_mismatch_returns_error_schema(
+    client: TestClient
+) -> None:
     files = {"file": ("sample.csv", b"col1,col2\n1,2\n", "application/json")}
     response = client.post("/api/v1/upload", files=files)
 
@@ -270,11 +279,11 @@ def test_upload_non_tabular_json_returns_parse_failed(client: TestClient) -> Non
 
 
 def test_upload_with_storage_enabled_calls_put_object(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_storage = Mock()
-    monkeypatch.setattr(upload_module.upload_service, "storage_enabled", True)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "storage_enabled", True)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     payload_bytes = b"col1,col2\n1,2\n"
     files = {"file": ("sample.csv", payload_bytes, "text/csv")}
@@ -289,13 +298,13 @@ def test_upload_with_storage_enabled_calls_put_object(
 
 
 def test_upload_storage_error_returns_storage_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     failing_storage = Mock()
     failing_storage.put_object.side_effect = RuntimeError("simulated storage failure")
-    monkeypatch.setattr(upload_module.upload_service, "storage_enabled", True)
+    monkeypatch.setattr(services.upload_service, "storage_enabled", True)
     monkeypatch.setattr(
-        upload_module.upload_service, "storage_service", failing_storage
+        services.upload_service, "storage_service", failing_storage
     )
 
     files = {"file": ("sample.csv", b"col1,col2\n1,2\n", "text/csv")}
@@ -308,12 +317,12 @@ def test_upload_storage_error_returns_storage_error(
 
 
 def test_upload_with_metastore_enabled_calls_insert(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
-    mock_metastore = Mock()
-    monkeypatch.setattr(upload_module.upload_service, "storage_enabled", False)
-    monkeypatch.setattr(upload_module.upload_service, "metastore_enabled", True)
-    monkeypatch.setattr(upload_module.upload_service, "metastore_service", mock_metastore)
+    mock_metastore = Mock(write_behind=None)
+    monkeypatch.setattr(services.upload_service, "storage_enabled", False)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     files = {"file": ("sample.csv", b"col1,col2\n1,2\n", "text/csv")}
     response = client.post("/api/v1/upload", files=files)
@@ -335,15 +344,15 @@ def test_upload_with_metastore_enabled_calls_insert(
 
 
 def test_upload_metastore_error_returns_metastore_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
-    failing_metastore = Mock()
+    failing_metastore = Mock(write_behind=None)
     failing_metastore.insert_dataset_metadata.side_effect = RuntimeError(
         "simulated metastore failure"
     )
-    monkeypatch.setattr(upload_module.upload_service, "storage_enabled", False)
-    monkeypatch.setattr(upload_module.upload_service, "metastore_enabled", True)
-    monkeypatch.setattr(upload_module.upload_service, "metastore_service", failing_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_enabled", False)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_service", failing_metastore)
 
     files = {"file": ("sample.csv", b"col1,col2\n1,2\n", "text/csv")}
     response = client.post("/api/v1/upload", files=files)
@@ -438,7 +447,9 @@ def test_upload_session_id_too_long_returns_error_schema(client: TestClient) ->
     assert payload["error"]["code"] == "INVALID_REQUEST"
 
 
-def test_get_dataset_returns_metadata_payload(client: TestClient, monkeypatch) -> None:
+def test_get_dataset_returns_metadata_payload(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
     now = datetime.now(UTC)
     mock_metastore = Mock()
     mock_metastore.get_dataset_metadata.return_value = type(
@@ -458,7 +469,7 @@ def test_get_dataset_returns_metadata_payload(client: TestClient, monkeypatch) -
             "updated_at": now,
         },
     )()
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_test_001")
 
@@ -474,12 +485,81 @@ def test_get_dataset_returns_metadata_payload(client: TestClient, monkeypatch) -
     assert "updated_at" in payload
 
 
+def build_metadata_record(dataset_id: str, created_at: datetime):
+    return type(
+        "Record",
+        (),
+        {
+            "dataset_id": dataset_id,
+            "parse_status": "ready",
+            "session_id": "sess_abc",
+            "original_filename": f"{dataset_id}.csv",
+            "extension": "csv",
+            "mime_type": "text/csv",
+            "size_bytes": 14,
+            "row_count": 1,
+            "column_count": 2,
+            "created_at": created_at,
+            "updated_at": created_at,
+        },
+    )()
+
+
+def test_list_session_datasets_pages_with_keyset_cursor(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    now = datetime.now(UTC)
+    mock_metastore = Mock()
+    mock_metastore.list_session_datasets.return_value = [
+        build_metadata_record("ds_c", now),
+        build_metadata_record("ds_b", now),
+        build_metadata_record("ds_a", now),
+    ]
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    response = client.get("/api/v1/sessions/sess_abc/datasets?limit=2")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [item["dataset_id"] for item in payload["datasets"]] == ["ds_c", "ds_b"]
+    assert "schema" not in payload["datasets"][0]
+    assert payload["next_cursor"] is not None
+    mock_metastore.list_session_datasets.assert_called_once_with(
+        "sess_abc", limit=3, after=None
+    )
+
+    mock_metastore.list_session_datasets.reset_mock()
+    mock_metastore.list_session_datasets.return_value = [build_metadata_record("ds_a", now)]
+    response = client.get(
+        f"/api/v1/sessions/sess_abc/datasets?limit=2&cursor={payload['next_cursor']}"
+    )
+
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None
+    mock_metastore.list_session_datasets.assert_called_once_with(
+        "sess_abc", limit=3, after=(now, "ds_b")
+    )
+
+
+def test_list_session_datasets_rejects_malformed_cursor(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    response = client.get("/api/v1/sessions/sess_abc/datasets?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+    mock_metastore.list_session_datasets.assert_not_called()
+
+
 def test_get_dataset_not_found_returns_dataset_not_found(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_metadata.return_value = None
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_missing")
 
@@ -490,13 +570,13 @@ def test_get_dataset_not_found_returns_dataset_not_found(
 
 
 def test_get_dataset_metastore_error_returns_metastore_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_metadata.side_effect = RuntimeError(
         "simulated read failure"
     )
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_test_002")
 
@@ -507,7 +587,7 @@ def test_get_dataset_metastore_error_returns_metastore_error(
 
 
 def test_get_dataset_schema_returns_schema_payload(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_schema.return_value = type(
@@ -515,13 +595,14 @@ def test_get_dataset_schema_returns_schema_payload(
         (),
         {
             "dataset_id": "ds_test_003",
+            "parse_status": "ready",
             "schema_json": [
                 {"name": "name", "dtype": "string", "null_count": 0},
                 {"name": "score", "dtype": "int", "null_count": 1},
             ],
         },
     )()
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_test_003/schema")
 
@@ -536,12 +617,29 @@ def test_get_dataset_schema_returns_schema_payload(
     }
 
 
+def test_get_dataset_schema_of_unparsed_dataset_is_not_cached(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_schema.return_value = type(
+        "SchemaRecord",
+        (),
+        {"dataset_id": "ds_test_003", "parse_status": "pending", "schema_json": []},
+    )()
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    response = client.get("/api/v1/datasets/ds_test_003/schema")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+
+
 def test_get_dataset_schema_not_found_returns_dataset_not_found(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_schema.return_value = None
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_missing/schema")
 
@@ -552,13 +650,13 @@ def test_get_dataset_schema_not_found_returns_dataset_not_found(
 
 
 def test_get_dataset_schema_metastore_error_returns_metastore_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_schema.side_effect = RuntimeError(
         "simulated schema read failure"
     )
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_test_004/schema")
 
@@ -569,7 +667,7 @@ def test_get_dataset_schema_metastore_error_returns_metastore_error(
 
 
 def test_delete_dataset_returns_success_payload(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -577,14 +675,15 @@ def test_delete_dataset_returns_success_payload(
         (),
         {
             "dataset_id": "ds_test_delete_001",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_test_delete_001/sample.csv",
         },
     )()
     mock_metastore.delete_dataset_metadata.return_value = True
     mock_storage = Mock()
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.delete("/api/v1/datasets/ds_test_delete_001")
 
@@ -602,14 +701,84 @@ def test_delete_dataset_returns_success_payload(
     )
 
 
+def build_owner_record(dataset_id: str, session_id: str):
+    return type(
+        "OwnerRecord",
+        (),
+        {
+            "dataset_id": dataset_id,
+            "session_id": session_id,
+            "storage_key_raw": f"raw/demo/{dataset_id}/sample.csv",
+        },
+    )()
+
+
+def test_batch_delete_returns_per_id_results(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_owners.return_value = {
+        "ds_a": build_owner_record("ds_a", "sess_abc"),
+        "ds_b": build_owner_record("ds_b", "sess_abc"),
+        "ds_other": build_owner_record("ds_other", "sess_other"),
+    }
+    mock_metastore.delete_datasets_metadata.return_value = ["ds_a"]
+    mock_storage = Mock()
+    mock_storage.delete_objects.return_value = ["raw/demo/ds_b/sample.csv"]
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    response = client.post(
+        "/api/v1/datasets:batchDelete",
+        json={
+            "session_id": "sess_abc",
+            "dataset_ids": ["ds_a", "ds_b", "ds_other", "ds_missing", "ds_a"],
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["deleted_count"] == 1
+    assert [(item["dataset_id"], item["status"]) for item in payload["results"]] == [
+        ("ds_a", "deleted"),
+        ("ds_b", "failed"),
+        ("ds_other", "forbidden"),
+        ("ds_missing", "not_found"),
+    ]
+    mock_metastore.get_dataset_owners.assert_called_once_with(
+        ["ds_a", "ds_b", "ds_other", "ds_missing"]
+    )
+    mock_storage.delete_objects.assert_called_once_with(
+        keys=["raw/demo/ds_a/sample.csv", "raw/demo/ds_b/sample.csv"]
+    )
+    mock_metastore.delete_datasets_metadata.assert_called_once_with(["ds_a"])
+
+
+def test_batch_delete_rejects_too_many_ids(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(upload_module, "BATCH_DELETE_MAX_IDS", 2)
+
+    response = client.post(
+        "/api/v1/datasets:batchDelete",
+        json={"session_id": "sess_abc", "dataset_ids": ["ds_a", "ds_b", "ds_c"]},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_REQUEST"
+    mock_metastore.get_dataset_owners.assert_not_called()
+
+
 def test_delete_dataset_not_found_returns_dataset_not_found(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = None
     mock_storage = Mock()
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.delete("/api/v1/datasets/ds_missing")
 
@@ -622,15 +791,15 @@ def test_delete_dataset_not_found_returns_dataset_not_found(
 
 
 def test_delete_dataset_metastore_lookup_error_returns_metastore_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.side_effect = RuntimeError(
         "simulated lookup failure"
     )
     mock_storage = Mock()
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.delete("/api/v1/datasets/ds_test_delete_002")
 
@@ -643,7 +812,7 @@ def test_delete_dataset_metastore_lookup_error_returns_metastore_error(
 
 
 def test_delete_dataset_storage_error_returns_storage_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -651,14 +820,15 @@ def test_delete_dataset_storage_error_returns_storage_error(
         (),
         {
             "dataset_id": "ds_test_delete_003",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_test_delete_003/sample.csv",
         },
     )()
     mock_storage = Mock()
     mock_storage.delete_object.side_effect = RuntimeError("simulated storage failure")
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.delete("/api/v1/datasets/ds_test_delete_003")
 
@@ -670,7 +840,7 @@ def test_delete_dataset_storage_error_returns_storage_error(
 
 
 def test_delete_dataset_metastore_delete_error_returns_metastore_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -678,6 +848,7 @@ def test_delete_dataset_metastore_delete_error_returns_metastore_error(
         (),
         {
             "dataset_id": "ds_test_delete_004",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_test_delete_004/sample.csv",
         },
@@ -686,8 +857,8 @@ def test_delete_dataset_metastore_delete_error_returns_metastore_error(
         "simulated delete failure"
     )
     mock_storage = Mock()
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.delete("/api/v1/datasets/ds_test_delete_004")
 
@@ -699,7 +870,7 @@ def test_delete_dataset_metastore_delete_error_returns_metastore_error(
 
 
 def test_delete_dataset_zero_rows_deleted_returns_metastore_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -707,14 +878,15 @@ def test_delete_dataset_zero_rows_deleted_returns_metastore_error(
         (),
         {
             "dataset_id": "ds_test_delete_005",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_test_delete_005/sample.csv",
         },
     )()
     mock_metastore.delete_dataset_metadata.return_value = False
     mock_storage = Mock()
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.delete("/api/v1/datasets/ds_test_delete_005")
 
@@ -725,7 +897,7 @@ def test_delete_dataset_zero_rows_deleted_returns_metastore_error(
 
 
 def test_get_dataset_preview_returns_default_paginated_rows(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -733,14 +905,15 @@ def test_get_dataset_preview_returns_default_paginated_rows(
         (),
         {
             "dataset_id": "ds_preview_001",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_preview_001/sample.csv",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.return_value = b"name,score\nAlice,90\nBob,85\n"
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_preview_001/preview")
 
@@ -758,7 +931,7 @@ def test_get_dataset_preview_returns_default_paginated_rows(
 
 
 def test_get_dataset_content_returns_full_csv_rows(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -766,14 +939,15 @@ def test_get_dataset_content_returns_full_csv_rows(
         (),
         {
             "dataset_id": "ds_content_001",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_content_001/sample.csv",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.return_value = b"name,score\nAlice,90\nBob,85\nCara,88\n"
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_content_001/content")
 
@@ -790,7 +964,7 @@ def test_get_dataset_content_returns_full_csv_rows(
 
 
 def test_get_dataset_content_returns_full_json_rows(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -798,6 +972,7 @@ def test_get_dataset_content_returns_full_json_rows(
         (),
         {
             "dataset_id": "ds_content_002",
+            "parse_status": "ready",
             "extension": "json",
             "storage_key_raw": "raw/demo/ds_content_002/sample.json",
         },
@@ -806,8 +981,8 @@ def test_get_dataset_content_returns_full_json_rows(
     mock_storage.get_object.return_value = (
         b'[{"name":"Alice","score":90},{"name":"Bob","score":85}]'
     )
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_content_002/content")
 
@@ -823,7 +998,7 @@ def test_get_dataset_content_returns_full_json_rows(
 
 
 def test_get_dataset_content_returns_empty_rows_for_empty_dataframe(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -831,14 +1006,15 @@ def test_get_dataset_content_returns_empty_rows_for_empty_dataframe(
         (),
         {
             "dataset_id": "ds_content_003",
+            "parse_status": "ready",
             "extension": "json",
             "storage_key_raw": "raw/demo/ds_content_003/sample.json",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.return_value = b'{"name":[],"score":[]}'
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_content_003/content")
 
@@ -851,7 +1027,7 @@ def test_get_dataset_content_returns_empty_rows_for_empty_dataframe(
 
 
 def test_get_dataset_preview_applies_limit_and_offset(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -859,14 +1035,15 @@ def test_get_dataset_preview_applies_limit_and_offset(
         (),
         {
             "dataset_id": "ds_preview_002",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_preview_002/sample.csv",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.return_value = b"name,score\nAlice,90\nBob,85\nCara,88\n"
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_preview_002/preview?limit=1&offset=1")
 
@@ -883,7 +1060,7 @@ def test_get_dataset_preview_applies_limit_and_offset(
 
 
 def test_get_dataset_preview_offset_beyond_range_returns_empty_rows(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -891,14 +1068,15 @@ def test_get_dataset_preview_offset_beyond_range_returns_empty_rows(
         (),
         {
             "dataset_id": "ds_preview_003",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_preview_003/sample.csv",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.return_value = b"name,score\nAlice,90\n"
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_preview_003/preview?offset=5")
 
@@ -913,11 +1091,11 @@ def test_get_dataset_preview_offset_beyond_range_returns_empty_rows(
 
 
 def test_get_dataset_preview_not_found_returns_dataset_not_found(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = None
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_missing/preview")
 
@@ -928,11 +1106,11 @@ def test_get_dataset_preview_not_found_returns_dataset_not_found(
 
 
 def test_get_dataset_content_not_found_returns_dataset_not_found(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = None
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_missing/content")
 
@@ -943,13 +1121,13 @@ def test_get_dataset_content_not_found_returns_dataset_not_found(
 
 
 def test_get_dataset_preview_metastore_error_returns_metastore_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.side_effect = RuntimeError(
         "simulated preview read failure"
     )
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_preview_004/preview")
 
@@ -960,13 +1138,13 @@ def test_get_dataset_preview_metastore_error_returns_metastore_error(
 
 
 def test_get_dataset_content_metastore_error_returns_metastore_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.side_effect = RuntimeError(
         "simulated content read failure"
     )
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
 
     response = client.get("/api/v1/datasets/ds_content_004/content")
 
@@ -977,7 +1155,7 @@ def test_get_dataset_content_metastore_error_returns_metastore_error(
 
 
 def test_get_dataset_preview_storage_error_returns_storage_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -985,14 +1163,15 @@ def test_get_dataset_preview_storage_error_returns_storage_error(
         (),
         {
             "dataset_id": "ds_preview_005",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_preview_005/sample.csv",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.side_effect = RuntimeError("simulated storage failure")
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_preview_005/preview")
 
@@ -1003,7 +1182,7 @@ def test_get_dataset_preview_storage_error_returns_storage_error(
 
 
 def test_get_dataset_content_storage_error_returns_storage_error(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -1011,14 +1190,15 @@ def test_get_dataset_content_storage_error_returns_storage_error(
         (),
         {
             "dataset_id": "ds_content_005",
+            "parse_status": "ready",
             "extension": "csv",
             "storage_key_raw": "raw/demo/ds_content_005/sample.csv",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.side_effect = RuntimeError("simulated storage failure")
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_content_005/content")
 
@@ -1029,7 +1209,7 @@ def test_get_dataset_content_storage_error_returns_storage_error(
 
 
 def test_get_dataset_preview_parse_failure_returns_parse_failed(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -1037,14 +1217,15 @@ def test_get_dataset_preview_parse_failure_returns_parse_failed(
         (),
         {
             "dataset_id": "ds_preview_006",
+            "parse_status": "ready",
             "extension": "json",
             "storage_key_raw": "raw/demo/ds_preview_006/sample.json",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.return_value = b'{"a":1,"b":2}'
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_preview_006/preview")
 
@@ -1055,7 +1236,7 @@ def test_get_dataset_preview_parse_failure_returns_parse_failed(
 
 
 def test_get_dataset_content_parse_failure_returns_parse_failed(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -1063,14 +1244,15 @@ def test_get_dataset_content_parse_failure_returns_parse_failed(
         (),
         {
             "dataset_id": "ds_content_006",
+            "parse_status": "ready",
             "extension": "json",
             "storage_key_raw": "raw/demo/ds_content_006/sample.json",
         },
     )()
     mock_storage = Mock()
     mock_storage.get_object.return_value = b'{"a":1,"b":2}'
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
 
     response = client.get("/api/v1/datasets/ds_content_006/content")
 
@@ -1106,7 +1288,7 @@ def test_get_dataset_preview_invalid_pagination_returns_invalid_request(
 
 
 def test_get_dataset_preview_serializes_null_and_datetime_values(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -1114,6 +1296,7 @@ def test_get_dataset_preview_serializes_null_and_datetime_values(
         (),
         {
             "dataset_id": "ds_preview_008",
+            "parse_status": "ready",
             "extension": "json",
             "storage_key_raw": "raw/demo/ds_preview_008/sample.json",
         },
@@ -1122,9 +1305,9 @@ def test_get_dataset_preview_serializes_null_and_datetime_values(
     mock_storage.get_object.return_value = (
         b'[{"created_at":"2025-01-02T03:04:05Z","score":null}]'
     )
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
-    original_parse_json = upload_module.upload_service._parse_json_to_dataframe
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+    original_parse_json = services.upload_service._parse_json_to_dataframe
 
     def parse_json_with_dates(content: bytes):
         dataframe = original_parse_json(content)
@@ -1134,7 +1317,7 @@ def test_get_dataset_preview_serializes_null_and_datetime_values(
         return dataframe
 
     monkeypatch.setattr(
-        upload_module.upload_service,
+        services.upload_service,
         "_parse_json_to_dataframe",
         parse_json_with_dates,
     )
@@ -1154,7 +1337,7 @@ def test_get_dataset_preview_serializes_null_and_datetime_values(
 
 
 def test_get_dataset_content_serializes_null_and_datetime_values(
-    client: TestClient, monkeypatch
+    client: TestClient, monkeypatch, services: ServiceContainer
 ) -> None:
     mock_metastore = Mock()
     mock_metastore.get_dataset_preview_source.return_value = type(
@@ -1162,6 +1345,7 @@ def test_get_dataset_content_serializes_null_and_datetime_values(
         (),
         {
             "dataset_id": "ds_content_008",
+            "parse_status": "ready",
             "extension": "json",
             "storage_key_raw": "raw/demo/ds_content_008/sample.json",
         },
@@ -1170,9 +1354,9 @@ def test_get_dataset_content_serializes_null_and_datetime_values(
     mock_storage.get_object.return_value = (
         b'[{"created_at":"2025-01-02T03:04:05Z","score":null}]'
     )
-    monkeypatch.setattr(upload_module, "metastore_service", mock_metastore)
-    monkeypatch.setattr(upload_module.upload_service, "storage_service", mock_storage)
-    original_parse_json = upload_module.upload_service._parse_json_to_dataframe
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+    original_parse_json = services.upload_service._parse_json_to_dataframe
 
     def parse_json_with_dates(content: bytes):
         dataframe = original_parse_json(content)
@@ -1182,7 +1366,7 @@ def test_get_dataset_content_serializes_null_and_datetime_values(
         return dataframe
 
     monkeypatch.setattr(
-        upload_module.upload_service,
+        services.upload_service,
         "_parse_json_to_dataframe",
         parse_json_with_dates,
     )
@@ -1197,3 +1381,721 @@ def test_get_dataset_content_serializes_null_and_datetime_values(
             {"created_at": "2025-01-02T03:04:05Z", "score": None},
         ],
     }
+
+
+def test_get_dataset_preview_returns_etag_and_not_modified_skips_storage(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_preview_etag_001",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_preview_etag_001/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = b"name,score\nAlice,90\n"
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    first = client.get("/api/v1/datasets/ds_preview_etag_001/preview")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("private")
+
+    second = client.get(
+        "/api/v1/datasets/ds_preview_etag_001/preview",
+        headers={"If-None-Match": etag},
+    )
+    other_page = client.get(
+        "/api/v1/datasets/ds_preview_etag_001/preview?offset=1",
+        headers={"If-None-Match": etag},
+    )
+
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+    assert other_page.status_code == 200
+    assert mock_storage.get_object.call_count == 1
+
+
+def test_get_dataset_returns_not_modified_for_matching_etag(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    now = datetime.now(UTC)
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_metadata.return_value = type(
+        "Record",
+        (),
+        {
+            "dataset_id": "ds_test_etag_001",
+            "parse_status": "ready",
+            "session_id": "sess_abc",
+            "original_filename": "sample.csv",
+            "extension": "csv",
+            "mime_type": "text/csv",
+            "size_bytes": 14,
+            "row_count": 1,
+            "column_count": 2,
+            "created_at": now,
+            "updated_at": now,
+        },
+    )()
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    first = client.get("/api/v1/datasets/ds_test_etag_001")
+    second = client.get(
+        "/api/v1/datasets/ds_test_etag_001",
+        headers={"If-None-Match": f'"stale", W/{first.headers["etag"]}'},
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+
+
+def test_get_dataset_content_applies_column_projection_and_filters(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_content_query_001",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_content_query_001/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = (
+        b"name,score,city\nAlice,90,NY\nBob,85,LA\nCara,,SF\nDan,70,NY\n"
+    )
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    projected = client.get(
+        "/api/v1/datasets/ds_content_query_001/content",
+        params={"columns": "name,score", "filter": ["score:>=:80", "city:in:NY,LA"]},
+    )
+    nulls = client.get(
+        "/api/v1/datasets/ds_content_query_001/preview",
+        params={"columns": "name", "filter": "score:is_null"},
+    )
+
+    assert projected.status_code == 200
+    assert projected.json()["rows"] == [
+        {"name": "Alice", "score": 90.0},
+        {"name": "Bob", "score": 85.0},
+    ]
+    assert nulls.json()["rows"] == [{"name": "Cara"}]
+    assert mock_storage.get_object.call_count == 1
+
+
+def test_get_dataset_preview_invalid_query_returns_invalid_query(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_preview_query_002",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_preview_query_002/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = b"name,score\nAlice,90\n"
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    unknown_column = client.get(
+        "/api/v1/datasets/ds_preview_query_002/preview?columns=missing"
+    )
+    bad_operator = client.get(
+        "/api/v1/datasets/ds_preview_query_002/preview?filter=score:~:1"
+    )
+    bad_value = client.get(
+        "/api/v1/datasets/ds_preview_query_002/preview?filter=score:>:high"
+    )
+
+    for response in (unknown_column, bad_operator, bad_value):
+        assert response.status_code == 400
+        assert_error_schema(response.json())
+        assert response.json()["error"]["code"] == "INVALID_QUERY"
+
+
+def test_get_dataset_preview_sorts_and_walks_keyset_cursor(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_preview_sort_001",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_preview_sort_001/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = (
+        b"name,score\nAlice,90\nBob,85\nCara,\nDan,95\nEve,85\n"
+    )
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    names: list[str] = []
+    cursors: list[str] = []
+    params = {"sort_by": "score", "order": "desc", "limit": 2, "columns": "name"}
+    cursor = None
+    for _ in range(3):
+        response = client.get(
+            "/api/v1/datasets/ds_preview_sort_001/preview",
+            params={**params, **({"cursor": cursor} if cursor else {})},
+        )
+        assert response.status_code == 200
+        payload = response.json()
+        names.extend(row["name"] for row in payload["rows"])
+        cursor = payload.get("next_cursor")
+        if cursor is None:
+            break
+        cursors.append(cursor)
+
+    assert names == ["Dan", "Alice", "Bob", "Eve", "Cara"]
+    assert cursor is None
+    assert mock_storage.get_object.call_count == 1
+
+    mismatched = client.get(
+        "/api/v1/datasets/ds_preview_sort_001/preview",
+        params={"sort_by": "name", "cursor": cursors[0]},
+    )
+    assert len(cursors) == 2
+    assert mismatched.status_code == 400
+    assert mismatched.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+def test_get_dataset_preview_sorts_mixed_type_columns(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_preview_sort_002",
+            "parse_status": "ready",
+            "extension": "json",
+            "storage_key_raw": "raw/demo/ds_preview_sort_002/sample.json",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = b'[{"code":10},{"code":"b"},{"code":"a"}]'
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    response = client.get(
+        "/api/v1/datasets/ds_preview_sort_002/preview", params={"sort_by": "code"}
+    )
+
+    assert response.status_code == 200
+    assert [row["code"] for row in response.json()["rows"]] == [10, "a", "b"]
+
+
+def test_aggregate_dataset_groups_and_caps_results(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_aggregate_001",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_aggregate_001/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = (
+        b"city,status,amount\nNY,shipped,10\nNY,shipped,30\nLA,shipped,5\n"
+        b"LA,pending,7\nSF,shipped,\n"
+    )
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(upload_module, "AGGREGATE_MAX_GROUPS", 2)
+
+    response = client.post(
+        "/api/v1/datasets/ds_aggregate_001/aggregate",
+        json={
+            "group_by": ["city"],
+            "measures": [
+                {"func": "count"},
+                {"func": "sum", "column": "amount", "alias": "total"},
+                {"func": "nunique", "column": "status"},
+            ],
+            "filter": ["status:=:shipped"],
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["group_count"] == 3
+    assert payload["truncated"] is True
+    assert payload["rows"] == [
+        {"city": "LA", "count": 1, "total": 5.0, "nunique_status": 1},
+        {"city": "NY", "count": 2, "total": 40.0, "nunique_status": 1},
+    ]
+
+
+def test_aggregate_dataset_rejects_non_numeric_sum(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_aggregate_002",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_aggregate_002/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = b"city,amount\nNY,10\n"
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    response = client.post(
+        "/api/v1/datasets/ds_aggregate_002/aggregate",
+        json={"measures": [{"func": "sum", "column": "city"}]},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_QUERY"
+
+
+def test_upload_stores_column_profile_with_metadata(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock(write_behind=None)
+    monkeypatch.setattr(services.upload_service, "storage_enabled", False)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    files = {
+        "file": ("sample.csv", b"name,score\nAlice,90\nBob,80\nAlice,\n", "text/csv")
+    }
+    response = client.post("/api/v1/upload", files=files)
+
+    assert response.status_code == 201
+    profile = mock_metastore.insert_dataset_metadata.call_args.args[0].profile_json
+    assert profile["row_count"] == 3
+    name_profile, score_profile = profile["columns"]
+    assert name_profile["dtype"] == "string"
+    assert name_profile["distinct_count"] == 2
+    assert name_profile["top_values"][0] == {"value": "Alice", "count": 2}
+    assert score_profile["null_count"] == 1
+    assert score_profile["min"] == 80.0
+    assert score_profile["max"] == 90.0
+    assert score_profile["quantiles"]["p50"] == 85.0
+    assert sum(score_profile["histogram"]["counts"]) == 2
+
+
+def test_upload_profiles_json_with_nested_objects(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock(write_behind=None)
+    monkeypatch.setattr(services.upload_service, "storage_enabled", False)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    files = {
+        "file": (
+            "nested.json",
+            b'[{"a":1,"b":{"x":1}},{"a":2,"b":{"y":2}},{"a":3,"b":{"x":1}}]',
+            "application/json",
+        )
+    }
+    response = client.post("/api/v1/upload", files=files)
+
+    assert response.status_code == 201
+    profile = mock_metastore.insert_dataset_metadata.call_args.args[0].profile_json
+    nested_profile = profile["columns"][1]
+    assert nested_profile["name"] == "b"
+    assert nested_profile["distinct_count"] == 2
+    assert nested_profile["top_values"][0] == {"value": '{"x": 1}', "count": 2}
+
+
+def test_upload_succeeds_without_profile_when_profiling_fails(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock(write_behind=None)
+    monkeypatch.setattr(services.upload_service, "storage_enabled", False)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(
+        services.upload_service,
+        "build_profile",
+        Mock(side_effect=TypeError("unhashable type: 'dict'")),
+    )
+
+    files = {"file": ("sample.csv", b"name,score\nAlice,90\n", "text/csv")}
+    response = client.post("/api/v1/upload", files=files)
+
+    assert response.status_code == 201
+    assert mock_metastore.insert_dataset_metadata.call_args.args[0].profile_json is None
+
+
+def test_get_dataset_stats_serves_stored_profile_without_storage(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_profile.return_value = type(
+        "ProfileRecord",
+        (),
+        {
+            "dataset_id": "ds_stats_001",
+            "profile_json": {
+                "version": 1,
+                "row_count": 2,
+                "columns": [
+                    {
+                        "name": "score",
+                        "dtype": "int",
+                        "count": 2,
+                        "null_count": 0,
+                        "distinct_count": 2,
+                        "min": 85.0,
+                        "max": 90.0,
+                        "mean": 87.5,
+                        "std": 3.5,
+                        "quantiles": {"p50": 87.5},
+                        "histogram": {"edges": [85.0, 90.0], "counts": [2]},
+                        "top_values": [{"value": 90, "count": 1}],
+                    }
+                ],
+            },
+        },
+    )()
+    mock_storage = Mock()
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    response = client.get("/api/v1/datasets/ds_stats_001/stats")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["row_count"] == 2
+    assert payload["columns"][0]["mean"] == 87.5
+    mock_storage.get_object.assert_not_called()
+
+
+def test_get_dataset_stats_answers_extra_quantiles_from_sketches(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    frame = pd.DataFrame({"score": [float(value) for value in range(1, 101)]})
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_profile.return_value = type(
+        "ProfileRecord",
+        (),
+        {
+            "dataset_id": "ds_stats_002",
+            "profile_json": build_dataset_profile(frame, {"score": "float"}),
+        },
+    )()
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    response = client.get("/api/v1/datasets/ds_stats_002/stats?quantile=0.99")
+
+    assert response.status_code == 200
+    column = response.json()["columns"][0]
+    assert column["distinct_count"] == 100
+    assert column["quantiles"]["q0.99"] == pytest.approx(99.01)
+    assert column["quantiles"]["p50"] == pytest.approx(50.5)
+    assert "sketches" not in column
+
+    response = client.get("/api/v1/datasets/ds_stats_002/stats?quantile=1.5")
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_REQUEST"
+
+
+def test_query_dataset_runs_read_only_sql_with_row_cap(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_query_001",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_query_001/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = (
+        b"city,status,amount\nNY,shipped,10\nNY,shipped,30\nLA,shipped,5\n"
+        b"LA,pending,7\nSF,shipped,\n"
+    )
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    response = client.post(
+        "/api/v1/datasets/ds_query_001/query",
+        json={
+            "sql": (
+                "SELECT city, AVG(amount) AS avg_amount FROM dataset "
+                "WHERE status = 'shipped' GROUP BY city ORDER BY city"
+            ),
+            "max_rows": 2,
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["columns"] == ["city", "avg_amount"]
+    assert payload["rows"] == [
+        {"city": "LA", "avg_amount": 5.0},
+        {"city": "NY", "avg_amount": 20.0},
+    ]
+    assert payload["row_count"] == 2
+    assert payload["truncated"] is True
+
+    for sql in (
+        "DELETE FROM dataset",
+        "SELECT 1; DROP TABLE dataset",
+        "PRAGMA table_info(dataset)",
+        "SHOW TABLES",
+        "SELECT * FROM read_csv('/etc/passwd')",
+        "COPY (SELECT * FROM dataset) TO '/tmp/dataset.csv'",
+    ):
+        response = client.post(
+            "/api/v1/datasets/ds_query_001/query", json={"sql": sql}
+        )
+        assert response.status_code == 400
+        assert response.json()["error"]["code"] == "INVALID_QUERY"
+
+    response = client.post(
+        "/api/v1/datasets/ds_query_001/query",
+        json={"sql": "SELECT COUNT(*) AS n FROM dataset"},
+    )
+    assert response.json()["rows"] == [{"n": 5}]
+    assert mock_storage.get_object.call_count == 1
+
+
+def test_query_dataset_enforces_time_limit(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_query_002",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_query_002/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = b"value\n1\n2\n"
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(upload_module, "SQL_QUERY_TIMEOUT_MS", 50)
+
+    response = client.post(
+        "/api/v1/datasets/ds_query_002/query",
+        json={
+            "sql": (
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+                "SELECT COUNT(*) FROM n"
+            )
+        },
+    )
+
+    assert response.status_code == 408
+    assert response.json()["error"]["code"] == "QUERY_TIMEOUT"
+
+
+def test_query_dataset_returns_blobs_as_text_under_a_memory_limit(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_query_003",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_query_003/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = b"value\n1\n"
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    response = client.post(
+        "/api/v1/datasets/ds_query_003/query",
+        json={
+            "sql": (
+                "SELECT '\\xFFa\\x5C'::BLOB AS raw, ['\\x00'::BLOB] AS raws, "
+                "current_setting('memory_limit') AS memory_limit FROM dataset"
+            )
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == [
+        {"raw": "\\xFFa\\x5C", "raws": ["\\x00"], "memory_limit": "244.1 MiB"}
+    ]
+
+
+def test_upload_warms_frame_cache_for_first_preview(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_storage = Mock()
+    monkeypatch.setattr(services.upload_service, "storage_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", False)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    files = {"file": ("sample.csv", b"name,score\nAlice,90\nBob,85\n", "text/csv")}
+    upload = client.post("/api/v1/upload", files=files).json()
+
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": upload["dataset_id"],
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": upload["storage"]["object_key"],
+        },
+    )()
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    response = client.get(f"/api/v1/datasets/{upload['dataset_id']}/preview?limit=1")
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == [{"name": "Alice", "score": 90}]
+    mock_storage.get_object.assert_not_called()
+
+
+def test_upload_removes_stored_object_when_metadata_write_fails(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_storage = Mock()
+    failing_metastore = Mock(write_behind=None)
+    failing_metastore.insert_dataset_metadata.side_effect = RuntimeError(
+        "simulated metastore failure"
+    )
+    monkeypatch.setattr(services.upload_service, "storage_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", True)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", failing_metastore)
+    monkeypatch.setattr(services.upload_service, "async_metastore_service", None)
+
+    files = {"file": ("sample.csv", b"col1,col2\n1,2\n", "text/csv")}
+    response = client.post("/api/v1/upload", files=files)
+
+    assert response.status_code == 500
+    assert response.json()["error"]["code"] == "METASTORE_ERROR"
+    stored_key = mock_storage.put_object.call_args.kwargs["key"]
+    mock_storage.delete_object.assert_called_once_with(key=stored_key)
+
+
+def test_upload_removes_metadata_when_storage_write_fails(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    failing_storage = Mock()
+    failing_storage.put_object.side_effect = RuntimeError("simulated storage failure")
+    mock_metastore = Mock(write_behind=None)
+    monkeypatch.setattr(services.upload_service, "storage_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", True)
+    monkeypatch.setattr(services.upload_service, "storage_service", failing_storage)
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "async_metastore_service", None)
+
+    files = {"file": ("sample.csv", b"col1,col2\n1,2\n", "text/csv")}
+    response = client.post("/api/v1/upload", files=files)
+
+    assert response.status_code == 500
+    assert response.json()["error"]["code"] == "STORAGE_ERROR"
+    record = mock_metastore.insert_dataset_metadata.call_args.args[0]
+    mock_metastore.delete_dataset_metadata.assert_called_once_with(record.dataset_id)
+
+
+def test_upload_and_preview_through_local_storage(
+    client: TestClient, monkeypatch, tmp_path, services: ServiceContainer
+) -> None:
+    storage = LocalFileStorageService(root=tmp_path, bucket="thinkabit-raw")
+    monkeypatch.setattr(services.upload_service, "storage_enabled", True)
+    monkeypatch.setattr(services.upload_service, "metastore_enabled", False)
+    monkeypatch.setattr(services.upload_service, "storage_service", storage)
+
+    files = {"file": ("sample.csv", b"name,score\nAlice,90\nBob,85\n", "text/csv")}
+    upload = client.post("/api/v1/upload", files=files).json()
+    services.upload_service.frame_cache.clear()
+
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": upload["dataset_id"],
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": upload["storage"]["object_key"],
+        },
+    )()
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+
+    response = client.get(f"/api/v1/datasets/{upload['dataset_id']}/preview?limit=1")
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == [{"name": "Alice", "score": 90}]
+
+
+def test_compressed_content_revalidates_with_its_coded_etag(
+    client: TestClient, monkeypatch, services: ServiceContainer
+) -> None:
+    mock_metastore = Mock()
+    mock_metastore.get_dataset_preview_source.return_value = type(
+        "PreviewRecord",
+        (),
+        {
+            "dataset_id": "ds_coded_etag_001",
+            "parse_status": "ready",
+            "extension": "csv",
+            "storage_key_raw": "raw/demo/ds_coded_etag_001/sample.csv",
+        },
+    )()
+    mock_storage = Mock()
+    mock_storage.get_object.return_value = b"name,score\n" + b"Alice,90\n" * 2000
+    monkeypatch.setattr(services.upload_service, "metastore_service", mock_metastore)
+    monkeypatch.setattr(services.upload_service, "storage_service", mock_storage)
+
+    first = client.get(
+        "/api/v1/datasets/ds_coded_etag_001/content", headers={"Accept-Encoding": "gzip"}
+    )
+    second = client.get(
+        "/api/v1/datasets/ds_coded_etag_001/content",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]},
+    )
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"].endswith('-gzip"')
+    assert second.status_code == 304
+    assert second.headers["etag"] == first.headers["etag"]